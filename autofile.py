@@ -0,0 +1,396 @@
+"""
+AutoFile Manager - mode command line (tanpa menu interaktif)
+Jalankan: python -m autofile <perintah> [opsi]
+
+Contoh:
+    python -m autofile backup ~/dokumen /mnt/backup --incremental --workers 4
+    python -m autofile sync ~/foto /mnt/foto --twoway --filter "-.git"
+    python -m autofile clean /var/log/app --days 30 --ext .log --yes
+    python -m autofile clean ~/Downloads --quota 10G --key atime --dry-run
+    python -m autofile rename ~/foto --template "{exif_date:%Y%m%d}_{counter:03}" --yes
+    python -m autofile retention /mnt/backup --daily 7 --weekly 4 --yes
+    python -m autofile restore /mnt/backup/foto_backup_20250101_020000_000000.snapshot ~/foto_lama
+    python -m autofile jobs nightly.toml --max-jobs 8
+
+Cocok untuk cron: tidak memakai menu (msvcrt), perintah yang menghapus atau
+me-rename file butuh --yes (jalan tanpa bertanya) atau --dry-run (hanya
+tampilkan rencana) jika tidak dijalankan di terminal. backup dan sync juga
+punya --dry-run untuk melihat rencana copy/update/pindah/hapus. Exit code 0 jika
+berhasil, 1 jika gagal.
+"""
+
+import sys
+import time
+import argparse
+from modules.backup import run_backup
+from modules.sync import run_sync
+from modules.cleaner import run_clean, run_clean_quota, QUOTA_KEYS
+from modules.renamer import (
+    run_rename_with_pattern,
+    run_rename_custom_name,
+    run_rename_template,
+    run_undo_rename,
+)
+from modules.retention import run_retention
+from modules.dedup import restore_snapshot
+from modules.jobs import load_jobs, run_jobs, STATUS_OK
+from utils.confirm import ASK, ASSUME_YES, DRY_RUN
+from utils.events import EventEmitter, ConsoleSink, ProgressSink, JsonLinesSink
+from utils.metrics import MetricsSink, serve_metrics
+from utils.filters import parse_size
+from utils.utils import print_info, print_error, Colors
+
+
+def _size(text):
+    """Tipe argparse untuk ukuran seperti '500M' atau '1.5G'"""
+    try:
+        return parse_size(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _positive(text):
+    """Tipe argparse untuk bilangan bulat >= 1"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bukan bilangan bulat: '{text}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"minimal 1: {value}")
+    return value
+
+
+def _add_workers(parser):
+    parser.add_argument(
+        "--workers", type=int, default=1, help="jumlah thread paralel (default 1)"
+    )
+
+
+def _add_filter(parser):
+    parser.add_argument(
+        "--filter",
+        dest="filters",
+        help="aturan filter, misal \"-node_modules -.git size:..1G\"",
+    )
+
+
+def _add_dry_run(parser):
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="hanya tampilkan rencana, tidak ada file yang diubah",
+    )
+
+
+def _add_confirm(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "-y", "--yes", action="store_true", help="jalankan tanpa konfirmasi"
+    )
+    _add_dry_run(group)
+
+
+def _add_output(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--progress", action="store_true", help="satu baris progress, bukan baris per file"
+    )
+    group.add_argument("-q", "--quiet", action="store_true", help="tanpa output per file")
+    parser.add_argument(
+        "--events", dest="events_file", help="tulis semua event ke file JSON-lines"
+    )
+    parser.add_argument(
+        "--metrics", dest="metrics_file", help="tulis metrik Prometheus ke file di akhir run"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, help="sajikan metrik di http://127.0.0.1:PORT/metrics selama run"
+    )
+
+
+def _build_events(args):
+    """EventEmitter sesuai opsi --progress/--quiet/--events/--metrics"""
+    if "progress" not in args:
+        return EventEmitter([ConsoleSink()])
+    sinks = []
+    if args.progress:
+        sinks.append(ProgressSink())
+    elif not args.quiet:
+        sinks.append(ConsoleSink())
+    if args.events_file:
+        sinks.append(JsonLinesSink(args.events_file))
+    if args.metrics_file or args.metrics_port:
+        metrics = MetricsSink(args.metrics_file, labels={"command": args.command})
+        if args.metrics_port:
+            serve_metrics(metrics, args.metrics_port)
+        sinks.append(metrics)
+    return EventEmitter(sinks)
+
+
+def cmd_backup(args, confirm, events):
+    return run_backup(
+        args.src,
+        args.dst,
+        incremental=args.incremental,
+        timestamp=args.timestamp,
+        workers=args.workers,
+        verify=args.verify,
+        dedup=args.dedup,
+        link_dest=args.link_dest,
+        delta_min_size=args.delta_min_size,
+        filters=args.filters,
+        events=events,
+        chunking=args.chunking,
+        dry_run=args.dry_run,
+    )
+
+
+def cmd_sync(args, confirm, events):
+    return run_sync(
+        args.folder1,
+        args.folder2,
+        twoway=args.twoway,
+        delta_min_size=args.delta_min_size,
+        filters=args.filters,
+        events=events,
+        dry_run=args.dry_run,
+    )
+
+
+def cmd_clean(args, confirm, events):
+    if args.quota is not None:
+        return run_clean_quota(
+            args.folder,
+            args.quota,
+            key=args.key,
+            ext=args.ext,
+            workers=args.workers,
+            min_free=args.min_free,
+            filters=args.filters,
+            confirm=confirm,
+            events=events,
+        )
+    return run_clean(
+        args.folder,
+        args.days,
+        ext=args.ext,
+        workers=args.workers,
+        filters=args.filters,
+        confirm=confirm,
+        events=events,
+    )
+
+
+def cmd_rename(args, confirm, events):
+    common = dict(
+        start=args.start,
+        recursive=args.recursive,
+        numbering=args.numbering,
+        workers=args.workers,
+        confirm=confirm,
+        events=events,
+    )
+    if args.template:
+        return run_rename_template(args.folder, args.template, **common)
+    if args.name:
+        return run_rename_custom_name(args.folder, args.name, **common)
+    return run_rename_with_pattern(
+        args.folder,
+        prefix=args.prefix,
+        suffix=args.suffix,
+        replace=args.replace,
+        remove_ts=args.remove_ts,
+        **common,
+    )
+
+
+def cmd_undo(args, confirm, events):
+    return run_undo_rename(
+        args.folder,
+        recursive=args.recursive,
+        workers=args.workers,
+        confirm=confirm,
+        events=events,
+    )
+
+
+def cmd_retention(args, confirm, events):
+    return run_retention(
+        args.folder,
+        keep_last=args.keep_last,
+        daily=args.daily,
+        weekly=args.weekly,
+        monthly=args.monthly,
+        max_size=args.max_size,
+        name=args.name,
+        workers=args.workers,
+        confirm=confirm,
+    )
+
+
+def cmd_restore(args, confirm, events):
+    return restore_snapshot(args.snapshot, args.target)
+
+
+def cmd_jobs(args, confirm, events):
+    try:
+        jobs = load_jobs(args.file)
+    except (OSError, ValueError) as e:
+        print_error(f"File job tidak valid: {e}")
+        return False
+
+    if args.check:
+        print_info(f"📋 {len(jobs)} job valid, urutan jalan:")
+        for job in jobs:
+            after = f" (setelah {', '.join(job.after)})" if job.after else ""
+            print(f"  {Colors.CYAN}• {job.name}{Colors.RESET} [{job.type}]{after}")
+        return True
+
+    report = run_jobs(
+        jobs, max_jobs=args.max_jobs, per_device=args.per_device, events=events
+    )
+    return all(result["status"] == STATUS_OK for result in report)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="autofile",
+        description="AutoFile Manager: backup, sync, clean dan rename tanpa menu interaktif",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="perintah", required=True)
+
+    # --- backup ---
+    p = commands.add_parser("backup", help="backup folder")
+    p.add_argument("src", help="folder sumber")
+    p.add_argument("dst", help="folder tujuan")
+    p.add_argument("--incremental", action="store_true", help="hanya file yang berubah")
+    p.add_argument("--timestamp", action="store_true", help="snapshot bertimestamp")
+    p.add_argument("--verify", action="store_true", help="cek checksum setelah copy")
+    p.add_argument("--dedup", action="store_true", help="snapshot dedup hemat ruang")
+    p.add_argument("--chunking", action="store_true", help="dengan --dedup: simpan file per chunk berbasis isi")
+    p.add_argument(
+        "--link-dest",
+        action="store_true",
+        help="hard-link file yang tidak berubah dari snapshot sebelumnya",
+    )
+    p.add_argument("--delta-min-size", type=_size, help="delta transfer untuk file >= ukuran ini")
+    _add_filter(p)
+    _add_workers(p)
+    _add_dry_run(p)
+    _add_output(p)
+    p.set_defaults(func=cmd_backup)
+
+    # --- sync ---
+    p = commands.add_parser("sync", help="sinkronisasi dua folder")
+    p.add_argument("folder1")
+    p.add_argument("folder2")
+    p.add_argument("--twoway", action="store_true", help="sinkronisasi dua arah")
+    p.add_argument("--delta-min-size", type=_size, help="delta transfer untuk file >= ukuran ini")
+    _add_filter(p)
+    _add_dry_run(p)
+    _add_output(p)
+    p.set_defaults(func=cmd_sync)
+
+    # --- clean ---
+    p = commands.add_parser("clean", help="hapus file lama / bebaskan ruang")
+    p.add_argument("folder")
+    mode = p.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--days", type=int, help="hapus file lebih tua dari N hari")
+    mode.add_argument("--quota", type=_size, help="bebaskan ruang sebesar ini, misal 10G")
+    p.add_argument("--key", choices=sorted(QUOTA_KEYS), default="mtime", help="urutan hapus mode kuota")
+    p.add_argument("--min-free", action="store_true", help="--quota adalah sisa ruang kosong yang diinginkan")
+    p.add_argument("--ext", help="filter ekstensi, misal .log")
+    _add_filter(p)
+    _add_workers(p)
+    _add_confirm(p)
+    _add_output(p)
+    p.set_defaults(func=cmd_clean)
+
+    # --- rename ---
+    p = commands.add_parser("rename", help="rename file massal")
+    p.add_argument("folder")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--name", help="ganti semua nama menjadi NAME_<nomor>")
+    mode.add_argument("--template", help="template metadata, misal \"{mtime:%%Y%%m%%d}_{counter:03}\"")
+    p.add_argument("--prefix", help="teks di depan nama")
+    p.add_argument("--suffix", help="teks di belakang nama")
+    p.add_argument("--replace", help="hapus teks dari nama lama")
+    p.add_argument("--remove-ts", action="store_true", help="hapus timestamp dari nama")
+    p.add_argument("--start", type=int, default=1, help="nomor awal (default 1)")
+    p.add_argument("-r", "--recursive", action="store_true", help="ikut semua subfolder")
+    p.add_argument("--numbering", choices=["dir", "global"], default="dir", help="nomor per folder atau lanjut antar folder")
+    _add_workers(p)
+    _add_confirm(p)
+    _add_output(p)
+    p.set_defaults(func=cmd_rename)
+
+    # --- undo ---
+    p = commands.add_parser("undo", help="batalkan rename terakhir")
+    p.add_argument("folder")
+    p.add_argument("-r", "--recursive", action="store_true", help="ikut semua subfolder")
+    _add_workers(p)
+    _add_confirm(p)
+    _add_output(p)
+    p.set_defaults(func=cmd_undo)
+
+    # --- retention ---
+    p = commands.add_parser("retention", help="rapikan snapshot backup lama")
+    p.add_argument("folder")
+    p.add_argument("--keep-last", type=int, default=0, help="simpan N snapshot terbaru")
+    p.add_argument("--daily", type=int, default=0, help="1 snapshot per hari, N hari terakhir")
+    p.add_argument("--weekly", type=int, default=0, help="1 snapshot per minggu, N minggu terakhir")
+    p.add_argument("--monthly", type=int, default=0, help="1 snapshot per bulan, N bulan terakhir")
+    p.add_argument("--max-size", type=_size, help="batas total ukuran snapshot")
+    p.add_argument("--name", help="hanya snapshot dari folder sumber ini")
+    _add_workers(p)
+    _add_confirm(p)
+    p.set_defaults(func=cmd_retention)
+
+    # --- restore ---
+    p = commands.add_parser("restore", help="kembalikan isi snapshot dedup")
+    p.add_argument("snapshot", help="file .snapshot")
+    p.add_argument("target", help="folder tujuan restore")
+    p.set_defaults(func=cmd_restore)
+
+    # --- jobs ---
+    p = commands.add_parser("jobs", help="jalankan banyak job dari file job (JSON/TOML/YAML)")
+    p.add_argument("file", help="file job, lihat modules.jobs.load_jobs")
+    p.add_argument("--max-jobs", type=_positive, default=4, help="job maksimal bersamaan (default 4)")
+    p.add_argument("--per-device", type=_positive, default=1, help="job maksimal per disk (default 1)")
+    p.add_argument("--check", action="store_true", help="hanya validasi file dan tampilkan urutan job")
+    _add_output(p)
+    p.set_defaults(func=cmd_jobs)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "rename" and (args.name or args.template) and (
+        args.prefix or args.suffix or args.replace or args.remove_ts
+    ):
+        parser.error("--prefix/--suffix/--replace/--remove-ts tidak bisa dipakai dengan --name/--template")
+
+    if getattr(args, "yes", False):
+        confirm = ASSUME_YES
+    elif getattr(args, "dry_run", False):
+        confirm = DRY_RUN
+    else:
+        confirm = ASK
+        if "yes" in args and not sys.stdin.isatty():
+            parser.error("tidak ada terminal untuk konfirmasi, pakai --yes atau --dry-run")
+
+    events = _build_events(args)
+    start = time.perf_counter()
+    try:
+        ok = args.func(args, confirm, events)
+    finally:
+        events.close()
+    print_info(f"⏱️  Selesai dalam {time.perf_counter() - start:.2f} detik")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Benchmark cara copy file di utils.copier
+Jalankan: python benchmarks/bench_copy.py [folder_sumber] [folder_tujuan] [ukuran_mb]
+
+Folder sumber & tujuan boleh di filesystem berbeda untuk menguji copy
+antar-filesystem. Default keduanya di folder temporary.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.copier import COPY_METHODS, copy_file
+from utils.utils import print_header, print_info, print_warning, Colors
+
+REPEAT = 3
+
+
+def bench(src, dst_dir, label, copier):
+    """Jalankan copier beberapa kali dan kembalikan waktu tercepat"""
+    best = None
+    for i in range(REPEAT):
+        dst = os.path.join(dst_dir, f"bench_{label}_{i}.bin")
+        start = time.perf_counter()
+        copier(src, dst)
+        elapsed = time.perf_counter() - start
+        os.remove(dst)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    src_dir = sys.argv[1] if len(sys.argv) > 1 else tempfile.gettempdir()
+    dst_dir = sys.argv[2] if len(sys.argv) > 2 else src_dir
+    size_mb = int(sys.argv[3]) if len(sys.argv) > 3 else 256
+
+    print_header("⏱️  Benchmark Copy File")
+    print_info(f"Sumber: {src_dir}")
+    print_info(f"Tujuan: {dst_dir}")
+    print_info(f"Ukuran file: {size_mb} MB\n")
+
+    src = os.path.join(src_dir, "bench_source.bin")
+    with open(src, "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+
+    try:
+        results = [("shutil.copy2", bench(src, dst_dir, "copy2", shutil.copy2))]
+        for method in COPY_METHODS:
+            try:
+                elapsed = bench(
+                    src, dst_dir, method, lambda s, d: copy_file(s, d, method=method)
+                )
+                results.append((method, elapsed))
+            except OSError as e:
+                print_warning(f"{method}: tidak didukung ({e.strerror})")
+        results.append(("auto", bench(src, dst_dir, "auto", copy_file)))
+    finally:
+        os.remove(src)
+
+    baseline = results[0][1]
+    print(f"\n{Colors.BOLD_CYAN}{'Cara':<18}{'Waktu':>10}{'MB/s':>12}{'vs copy2':>10}{Colors.RESET}")
+    for name, elapsed in results:
+        speed = size_mb / elapsed if elapsed else float("inf")
+        print(f"{name:<18}{elapsed:>9.3f}s{speed:>12.1f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
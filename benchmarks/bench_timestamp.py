@@ -0,0 +1,104 @@
+"""
+Benchmark remove_timestamp di modules.renamer
+Jalankan: python benchmarks/bench_timestamp.py [jumlah_nama]
+
+Membandingkan regex gabungan yang sudah dikompilasi dengan cara lama
+(lima re.sub terpisah per nama file) pada nama file sintetis.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.renamer import remove_timestamp
+from utils.utils import print_header, print_info, Colors
+
+REPEAT = 3
+
+# Cara lama: lima pola, masing-masing re.sub sendiri
+LEGACY_PATTERNS = [
+    r"_\d{8}_\d{6}",
+    r"\d{8}_\d{6}",
+    r"\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}",
+    r"\d{8}_\d{4}",
+    r"\d{4}-\d{2}-\d{2} \d{2}\.\d{2}\.\d{2}",
+]
+
+
+def legacy_remove_timestamp(filename):
+    name, ext = os.path.splitext(filename)
+    original_name = name
+    for pattern in LEGACY_PATTERNS:
+        name = re.sub(pattern, "", name)
+    if not name.strip():
+        name = "foto"
+    return name + ext, original_name != name
+
+
+def synthetic_names(count, seed=8):
+    """Campuran nama kamera, WhatsApp, ISO, epoch dan nama biasa"""
+    rng = random.Random(seed)
+    templates = [
+        "IMG_{d}_{t}.jpg",
+        "PXL_{d}_{t}123.jpg",
+        "IMG-{d}-WA{n:04d}.jpg",
+        "Foto_{iso}_{h}-{m}-{s}.jpg",
+        "Screenshot_{d}-{t}.png",
+        "log_{epoch}.txt",
+        "dokumen_{n}.pdf",
+        "laporan_akhir_v{n}.docx",
+    ]
+    names = []
+    for _ in range(count):
+        year, month, day = rng.randint(2015, 2025), rng.randint(1, 12), rng.randint(1, 28)
+        h, m, s = rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59)
+        names.append(
+            rng.choice(templates).format(
+                d=f"{year}{month:02d}{day:02d}",
+                t=f"{h:02d}{m:02d}{s:02d}",
+                iso=f"{year}-{month:02d}-{day:02d}",
+                h=f"{h:02d}",
+                m=f"{m:02d}",
+                s=f"{s:02d}",
+                n=rng.randint(1, 9999),
+                epoch=rng.randint(1_400_000_000, 1_700_000_000),
+            )
+        )
+    return names
+
+
+def bench(names, func):
+    """Jalankan func untuk semua nama beberapa kali dan kembalikan waktu tercepat"""
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for name in names:
+            func(name)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print_header("⏱️  Benchmark Hapus Timestamp")
+    print_info(f"Jumlah nama file: {count:,}\n")
+
+    names = synthetic_names(count)
+    results = [
+        ("5x re.sub (lama)", bench(names, legacy_remove_timestamp)),
+        ("regex gabungan", bench(names, remove_timestamp)),
+    ]
+
+    baseline = results[0][1]
+    print(f"{Colors.BOLD_CYAN}{'Cara':<20}{'Waktu':>10}{'nama/s':>14}{'vs lama':>10}{Colors.RESET}")
+    for label, elapsed in results:
+        print(f"{label:<20}{elapsed:>9.3f}s{count / elapsed:>14,.0f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
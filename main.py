@@ -1,8 +1,15 @@
 from menu import choose_menu
 from modules.backup import run_backup
 from modules.sync import run_sync
-from modules.cleaner import run_clean
-from modules.renamer import run_rename_custom_name, run_rename_with_pattern
+from modules.cleaner import run_clean, run_clean_quota
+from modules.renamer import (
+    run_rename_custom_name,
+    run_rename_with_pattern,
+    run_undo_rename,
+    run_rename_template,
+)
+from utils.rename_engine import load_history
+from utils.template import TEMPLATE_FIELDS
 from utils.utils import *
 import os
 
@@ -69,7 +76,10 @@ def interactive_backup():
         f"{Colors.YELLOW}         Incremental: Hanya copy file baru/berubah (hemat waktu){Colors.RESET}"
     )
     print(
-        f"{Colors.YELLOW}         Timestamp: Tambah tanggal-waktu di nama folder backup{Colors.RESET}\n"
+        f"{Colors.YELLOW}         Timestamp: Tambah tanggal-waktu di nama folder backup{Colors.RESET}"
+    )
+    print(
+        f"{Colors.YELLOW}         Dedup: Snapshot bertimestamp, file yang sama hanya disimpan sekali{Colors.RESET}\n"
     )
 
     # Input dan validasi source
@@ -90,8 +100,19 @@ def interactive_backup():
     print(f"   Dari: {Colors.GREEN}{os.path.abspath(src)}{Colors.RESET}")
     print(f"   Ke:   {Colors.GREEN}{os.path.abspath(dst)}{Colors.RESET}\n")
 
-    incremental = get_yes_no("⚡ Incremental backup?")
-    timestamp = get_yes_no("🕐 Tambahkan timestamp?")
+    link_dest = False
+    chunking = False
+    dedup = get_yes_no("🧬 Mode dedup (snapshot hemat ruang)?", default=False)
+    if dedup:
+        incremental, timestamp = False, True
+        chunking = get_yes_no("✂️  Potong file besar per chunk (hemat untuk file yang sering berubah)?", default=False)
+    else:
+        incremental = get_yes_no("⚡ Incremental backup?")
+        timestamp = get_yes_no("🕐 Tambahkan timestamp?")
+        if timestamp:
+            link_dest = get_yes_no("🔗 Hard-link file yang tidak berubah dari snapshot sebelumnya?")
+
+    filters = get_input("🔍 Filter (opsional, misal: -node_modules -.git): ") or None
 
     # Konfirmasi final
     print()
@@ -102,7 +123,16 @@ def interactive_backup():
         return
 
     print()
-    run_backup(src, dst, incremental, timestamp)
+    run_backup(
+        src,
+        dst,
+        incremental,
+        timestamp,
+        dedup=dedup,
+        link_dest=link_dest,
+        filters=filters,
+        chunking=chunking,
+    )
 
     print_info("\nTekan ENTER untuk kembali ke menu...")
     input()
@@ -144,6 +174,8 @@ def interactive_sync():
     else:
         print_info("\n→  One-way sync: Folder 2 akan disamakan dengan Folder 1")
 
+    filters = get_input("🔍 Filter (opsional, misal: -node_modules -.git): ") or None
+
     # Konfirmasi final
     print()
     confirm = get_yes_no("✅ Lanjutkan sinkronisasi?")
@@ -153,7 +185,7 @@ def interactive_sync():
         return
 
     print()
-    run_sync(folder1, folder2, twoway)
+    run_sync(folder1, folder2, twoway, filters=filters)
 
     print_info("\nTekan ENTER untuk kembali ke menu...")
     input()
@@ -192,6 +224,28 @@ def interactive_clean():
         else:
             print_error(f"❌ {result}")
 
+    # Mode kuota: bebaskan X GB, file paling lama dihapus lebih dulu
+    if get_yes_no("💽 Mode kuota (bebaskan X GB, file terlama dulu)?", default=False):
+        while True:
+            gb_input = get_input("🎯 Ruang yang ingin dibebaskan (GB): ")
+            try:
+                target_gb = float(gb_input)
+                if target_gb <= 0:
+                    print_error("❌ Ukuran harus lebih dari 0!")
+                    continue
+                break
+            except ValueError:
+                print_error("❌ Input harus berupa angka!")
+
+        ext = get_input("🔍 Filter ekstensi (opsional, misal: .txt): ") or None
+
+        print()
+        run_clean_quota(folder, int(target_gb * 1024**3), ext=ext)
+
+        print_info("\nTekan ENTER untuk kembali ke menu...")
+        input()
+        return
+
     # Input hari
     while True:
         days_input = get_input("📅 Hapus file lebih tua dari (hari) [default: 7]: ")
@@ -263,9 +317,57 @@ def interactive_rename():
     except Exception:
         pass
 
-    option_rename = get_yes_no("✏️  Ingin menambahkan prefix/suffix/ganti teks?")
+    # Tawarkan undo jika folder punya riwayat rename
+    if load_history(folder) and get_yes_no(
+        "↩️  Batalkan rename terakhir di folder ini?", default=False
+    ):
+        print()
+        run_undo_rename(folder)
+        print_info("\nTekan ENTER untuk kembali ke menu...")
+        input()
+        return
+
+    recursive = get_yes_no("📁 Termasuk file di semua subfolder?", default=False)
+    numbering = "dir"
+    if recursive and get_yes_no("🔢 Nomor lanjut antar folder (bukan mulai ulang)?", default=False):
+        numbering = "global"
 
-    if not option_rename:
+    use_template = get_yes_no(
+        "🧩 Pakai template nama dari metadata (tanggal, ukuran, hash)?", default=False
+    )
+    option_rename = not use_template and get_yes_no(
+        "✏️  Ingin menambahkan prefix/suffix/ganti teks?"
+    )
+
+    if use_template:
+        # Mode: Template (nama dari metadata file)
+        print(f"\n{Colors.BOLD_YELLOW}📝 Mode: Template{Colors.RESET}")
+        print(f"\n{Colors.BOLD_CYAN}💡 Field yang tersedia:{Colors.RESET}")
+        for field, description in TEMPLATE_FIELDS.items():
+            print(f"{Colors.YELLOW}  • {{{field}}}: {description}{Colors.RESET}")
+        print(
+            f"{Colors.YELLOW}   Contoh: {{exif_date:%Y-%m-%d}}_{{counter:03}}{{ext}} → 2023-01-15_001.jpg{Colors.RESET}\n"
+        )
+
+        template = get_input("🧩 Template: ")
+        if not template:
+            print_error("❌ Template tidak boleh kosong!")
+            input("\nTekan ENTER untuk kembali...")
+            return
+
+        start_input_template = get_input("🔢 Nomor awal [default: 1]: ")
+        start_template = int(start_input_template) if start_input_template else 1
+
+        print()
+        run_rename_template(
+            folder,
+            template,
+            start=start_template,
+            recursive=recursive,
+            numbering=numbering,
+        )
+
+    elif not option_rename:
         # Mode: Custom Name (ganti semua nama)
         print(f"\n{Colors.BOLD_YELLOW}📝 Mode: Custom Name{Colors.RESET}")
         print(
@@ -302,7 +404,13 @@ def interactive_rename():
             return
 
         print()
-        run_rename_custom_name(folder, replace_new_name, start=start_custom)
+        run_rename_custom_name(
+            folder,
+            replace_new_name,
+            start=start_custom,
+            recursive=recursive,
+            numbering=numbering,
+        )
 
     else:
         # Mode: Pattern (prefix/suffix/replace)
@@ -375,6 +483,8 @@ def interactive_rename():
             replace=replace,
             start=start,
             remove_ts=delete_ts,
+            recursive=recursive,
+            numbering=numbering,
         )
 
     print_info("\nTekan ENTER untuk kembali ke menu...")
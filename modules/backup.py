@@ -1,19 +1,125 @@
 import os
-import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from pathlib import Path
 from utils.utils import (
     log,
     ensure_folder,
+    file_digest,
     print_success,
     print_error,
-    print_warning,
     print_info,
     Colors,
 )
+from utils.workers import run_workers, make_counter
+from utils.manifest import load_manifest, save_manifest
+from utils.walker import scan_tree, is_dir_entry
+from utils.filters import compile_filter
+from utils.delta import copy_with_delta
+from utils.events import (
+    console_events,
+    FILE_COPIED,
+    FILE_LINKED,
+    FILE_SKIPPED,
+    ERROR,
+    PHASE_SCAN,
+    PHASE_COMPARE,
+)
+from modules.dedup import run_dedup_backup
+
+
+def _walk_jobs(src, dst, filters=None, dry_run=False):
+    """
+    Scan folder sumber dan hasilkan job (entry, src_file, dst_file) untuk worker
+
+    Struktur folder di tujuan dibuat di sini (satu thread) sebelum file-file
+    di dalamnya dikirim ke worker (kecuali dry-run).
+    """
+    for entry in scan_tree(src, dirs=True, filters=filters):
+        dst_path = os.path.join(dst, entry.relpath)
+
+        # Buat struktur folder di tujuan
+        if is_dir_entry(entry):
+            if not dry_run:
+                ensure_folder(dst_path)
+            continue
+
+        yield entry, os.path.join(src, entry.relpath), dst_path
+
+
+def _link_unchanged(entry, old_file, dst_file, old_manifest, dry_run=False):
+    """
+    Hard-link file dari snapshot sebelumnya jika tidak berubah
+
+    Returns:
+        True jika berhasil di-link (dry-run: jika bisa di-link), False jika
+        file harus dicopy
+    """
+    if old_manifest is not None:
+        old = old_manifest.get(entry.relpath)
+        if not old or old[:3] != (entry.size, entry.mtime_ns, entry.inode):
+            return False
+    else:
+        # Snapshot lama tanpa manifest: bandingkan ukuran & mtime (ikut dicopy saat backup)
+        try:
+            old_st = os.stat(old_file)
+        except OSError:
+            return False
+        if old_st.st_size != entry.size or old_st.st_mtime_ns != entry.mtime_ns:
+            return False
+
+    if dry_run:
+        return True
+
+    try:
+        os.link(old_file, dst_file)
+        return True
+    except OSError:
+        # Beda filesystem, batas jumlah link, dsb: fallback ke copy biasa
+        return False
+
+
+def _same_digest(src_file, dst_file, hasher=None):
+    """Bandingkan checksum dua file, memakai process pool jika tersedia"""
+    if hasher is None:
+        return file_digest(src_file) == file_digest(dst_file)
+
+    src_hash = hasher.submit(file_digest, src_file)
+    dst_hash = hasher.submit(file_digest, dst_file)
+    return src_hash.result() == dst_hash.result()
 
 
-def run_backup(src, dst, incremental=False, timestamp=False):
+def _previous_snapshot(backup_root, folder_name, current):
+    """
+    Cari folder snapshot bertimestamp terakhir sebelum snapshot saat ini
+
+    Returns:
+        Path folder snapshot sebelumnya atau None
+    """
+    prefix = f"{folder_name}_backup_"
+    candidates = sorted(
+        entry.name
+        for entry in os.scandir(backup_root)
+        if entry.is_dir() and entry.name.startswith(prefix) and entry.name < current
+    )
+    return os.path.join(backup_root, candidates[-1]) if candidates else None
+
+
+def run_backup(
+    src,
+    dst,
+    incremental=False,
+    timestamp=False,
+    workers=1,
+    verify=False,
+    dedup=False,
+    link_dest=False,
+    delta_min_size=None,
+    filters=None,
+    events=None,
+    chunking=False,
+    dry_run=False,
+):
     """
     Backup folder dari source ke destination
 
@@ -22,6 +128,25 @@ def run_backup(src, dst, incremental=False, timestamp=False):
         dst: Folder tujuan
         incremental: Jika True, hanya backup file yang berubah
         timestamp: Jika True, tambahkan timestamp ke nama folder backup
+        workers: Jumlah thread untuk copy paralel (default 1 = serial)
+        verify: Jika True, cocokkan checksum sumber & hasil copy setelah dicopy
+        dedup: Jika True, simpan sebagai snapshot dedup (lihat modules.dedup);
+               incremental & timestamp diabaikan karena selalu berupa snapshot baru
+        link_dest: Jika True (bersama timestamp), file yang tidak berubah sejak
+                   snapshot sebelumnya di-hard-link, bukan dicopy (seperti rsync --link-dest)
+        delta_min_size: File berubah >= ukuran ini (byte) yang sudah ada di tujuan
+                        diperbarui dengan delta transfer (hanya blok yang berubah ditulis)
+        filters: Aturan filter (lihat utils.filters), misal
+                 '-node_modules -.git -__pycache__ size:..1G'
+        events: EventEmitter untuk event per file (default: cetak ke console)
+        chunking: Bersama dedup, file dipotong dengan content-defined chunking
+                  sehingga perubahan kecil di file besar hanya menyimpan chunk baru
+        dry_run: Jika True, hanya tampilkan file yang akan dicopy/di-link;
+                 tidak ada file, folder maupun manifest yang ditulis
+
+    Setiap backup menulis manifest (.autofile_manifest.db) di folder tujuan.
+    Incremental backup berikutnya hanya stat file sumber lalu membandingkannya
+    dengan manifest, tanpa membaca metadata folder tujuan.
     """
     try:
         # Validasi folder sumber
@@ -33,82 +158,192 @@ def run_backup(src, dst, incremental=False, timestamp=False):
             print_error(f"❌ Path sumber bukan folder: {src}")
             return False
 
+        filters = compile_filter(filters)
+        events = events or console_events()
+
         # Buat folder tujuan jika belum ada
-        ensure_folder(dst)
+        if not dry_run:
+            ensure_folder(dst)
+
+        if dedup:
+            return run_dedup_backup(
+                src,
+                dst,
+                chunking=chunking,
+                workers=workers,
+                filters=filters,
+                dry_run=dry_run,
+                events=events,
+            )
 
         # Tambahkan timestamp jika diminta
+        link_from = None
         if timestamp:
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
             folder_name = os.path.basename(os.path.normpath(src))
-            dst = os.path.join(dst, f"{folder_name}_backup_{ts}")
-            ensure_folder(dst)
+            snapshot = f"{folder_name}_backup_{ts}"
+
+            if link_dest:
+                link_from = _previous_snapshot(dst, folder_name, snapshot)
+
+            dst = os.path.join(dst, snapshot)
+            if not dry_run:
+                ensure_folder(dst)
 
         log(f"🔄 Memulai backup dari '{src}' ke '{dst}'")
+        if dry_run:
+            print_info("🔎 Dry-run: hanya menampilkan rencana, tidak ada file yang ditulis")
 
         if incremental:
             print_info("⚡ Mode: Incremental Backup (hanya file baru/berubah)")
         else:
             print_info("📦 Mode: Full Backup (semua file)")
 
+        if filters:
+            print_info(f"🔍 Filter: {filters}")
+
+        if link_from:
+            print_info(f"🔗 Hard-link dari snapshot: {os.path.basename(link_from)}")
+
+        if workers > 1:
+            print_info(f"🧵 Worker paralel: {workers}")
+
         # Counter statistik
-        stats = {"copied": 0, "skipped": 0, "failed": 0, "total_size": 0}
+        stats = {"copied": 0, "linked": 0, "skipped": 0, "failed": 0, "total_size": 0}
+        add_stat = make_counter(stats)
+
+        # Manifest snapshot sebelumnya (None = bandingkan langsung lewat stat)
+        link_manifest = load_manifest(link_from) if link_from else None
+
+        # Manifest run sebelumnya: cukup stat sisi sumber, tujuan tidak disentuh
+        previous = load_manifest(dst) if incremental else None
+        if previous is not None:
+            print_info(f"📒 Manifest ditemukan: {len(previous)} file tercatat")
+        manifest = {}
+
+        # Verifikasi checksum dijalankan di process pool agar tidak berebut GIL
+        hasher = ProcessPoolExecutor(max_workers=workers) if verify and workers > 1 else None
+
+        def backup_file(job):
+            entry, src_file, dst_file = job
+            file = os.path.basename(entry.relpath)
+            rel_file = entry.relpath
+            start = time.perf_counter()
+            try:
+                state = (entry.size, entry.mtime_ns, entry.inode, None)
+
+                # Cek apakah perlu dicopy
+                if previous is not None:
+                    # Bandingkan dengan manifest (ukuran, mtime, inode)
+                    if previous.get(rel_file, (None,) * 3)[:3] == state[:3]:
+                        manifest[rel_file] = state
+                        add_stat("skipped")
+                        events.phase(PHASE_COMPARE, start, rel_file)
+                        events.emit(FILE_SKIPPED, rel_file, entry.size)
+                        return
+                elif incremental and os.path.exists(dst_file):
+                    # Belum ada manifest: bandingkan langsung dengan file tujuan
+                    dst_st = os.stat(dst_file)
+                    if (
+                        entry.mtime_ns <= dst_st.st_mtime_ns
+                        and entry.size == dst_st.st_size
+                    ):
+                        manifest[rel_file] = state
+                        add_stat("skipped")
+                        events.phase(PHASE_COMPARE, start, rel_file)
+                        events.emit(FILE_SKIPPED, rel_file, entry.size)
+                        return
+
+                events.phase(PHASE_COMPARE, start, rel_file)
+                start = time.perf_counter()
+
+                if link_from and _link_unchanged(
+                    entry,
+                    os.path.join(link_from, rel_file),
+                    dst_file,
+                    link_manifest,
+                    dry_run,
+                ):
+                    manifest[rel_file] = state
+                    add_stat("linked")
+                    message = f"  📝 Akan di-link: {rel_file}" if dry_run else None
+                    events.emit(
+                        FILE_LINKED,
+                        rel_file,
+                        entry.size,
+                        message,
+                        seconds=time.perf_counter() - start,
+                    )
+                    return
+
+                if dry_run:
+                    add_stat("copied")
+                    add_stat("total_size", entry.size)
+                    events.emit(FILE_COPIED, rel_file, entry.size, f"  📝 Akan dicopy: {rel_file}")
+                    return
+
+                # Copy file dengan metadata
+                copy_with_delta(src_file, dst_file, entry.size, delta_min_size)
+                file_size = entry.size
+
+                if verify and not _same_digest(src_file, dst_file, hasher):
+                    events.emit(ERROR, rel_file, message=f"  ⚠️  Checksum tidak cocok: {file}")
+                    add_stat("failed")
+                    return
+
+                manifest[rel_file] = state
+                add_stat("copied")
+                add_stat("total_size", file_size)
+
+                # Pesan console hanya untuk file besar (>1MB)
+                message = None
+                if file_size > 1024 * 1024:
+                    size_mb = file_size / (1024 * 1024)
+                    message = f"  ✓ {file} ({size_mb:.2f} MB)"
+                events.emit(
+                    FILE_COPIED,
+                    rel_file,
+                    file_size,
+                    message,
+                    seconds=time.perf_counter() - start,
+                )
+
+            except PermissionError:
+                events.emit(ERROR, rel_file, message=f"  ⚠️  Akses ditolak: {file}")
+                add_stat("failed")
+            except Exception as e:
+                events.emit(ERROR, rel_file, message=f"  ⚠️  Gagal backup {file}: {str(e)}")
+                add_stat("failed")
 
         # Scan semua file di folder sumber
         print_info("\n📊 Memindai file...")
 
-        for root, dirs, files in os.walk(src):
-            # Hitung relative path
-            rel_path = os.path.relpath(root, src)
-            dst_dir = os.path.join(dst, rel_path) if rel_path != "." else dst
-
-            # Buat struktur folder di tujuan
-            ensure_folder(dst_dir)
-
-            for file in files:
-                src_file = os.path.join(root, file)
-                dst_file = os.path.join(dst_dir, file)
-
-                try:
-                    # Cek apakah perlu dicopy
-                    should_copy = True
-
-                    if incremental and os.path.exists(dst_file):
-                        # Bandingkan waktu modifikasi dan ukuran
-                        src_mtime = os.path.getmtime(src_file)
-                        dst_mtime = os.path.getmtime(dst_file)
-                        src_size = os.path.getsize(src_file)
-                        dst_size = os.path.getsize(dst_file)
-
-                        if src_mtime <= dst_mtime and src_size == dst_size:
-                            should_copy = False
-                            stats["skipped"] += 1
-
-                    if should_copy:
-                        # Copy file dengan metadata
-                        shutil.copy2(src_file, dst_file)
-                        file_size = os.path.getsize(src_file)
-                        stats["copied"] += 1
-                        stats["total_size"] += file_size
-
-                        # Tampilkan progress untuk file besar (>1MB)
-                        if file_size > 1024 * 1024:
-                            size_mb = file_size / (1024 * 1024)
-                            print(f"  ✓ {file} ({size_mb:.2f} MB)")
-
-                except PermissionError:
-                    print_warning(f"  ⚠️  Akses ditolak: {file}")
-                    stats["failed"] += 1
-                except Exception as e:
-                    print_warning(f"  ⚠️  Gagal backup {file}: {str(e)}")
-                    stats["failed"] += 1
+        try:
+            jobs = events.timed_iter(PHASE_SCAN, _walk_jobs(src, dst, filters, dry_run))
+            run_workers(jobs, backup_file, workers=workers)
+        finally:
+            if hasher:
+                hasher.shutdown()
+
+        # Simpan manifest untuk incremental backup berikutnya
+        if not dry_run:
+            save_manifest(dst, manifest)
 
         # Tampilkan hasil
         print()
-        print_success("✅ Backup selesai!")
-        print_info(f"\n📈 Statistik Backup:")
+        if dry_run:
+            print_success("✅ Dry-run selesai, tidak ada file yang diubah")
+        else:
+            print_success("✅ Backup selesai!")
+        print_info("\n📈 Statistik Backup:")
+        done = "akan" if dry_run else "berhasil"
         print(
-            f"  • File berhasil dicopy: {Colors.GREEN}{stats['copied']}{Colors.RESET}"
+            f"  • File {done} dicopy: {Colors.GREEN}{stats['copied']}{Colors.RESET}"
         )
+        if link_from:
+            print(
+                f"  • File {done} di-hard-link: {Colors.GREEN}{stats['linked']}{Colors.RESET}"
+            )
         print(f"  • File dilewati: {Colors.YELLOW}{stats['skipped']}{Colors.RESET}")
         print(f"  • File gagal: {Colors.RED}{stats['failed']}{Colors.RESET}")
 
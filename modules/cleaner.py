@@ -1,5 +1,9 @@
 import os
 import time
+import heapq
+import shutil
+import struct
+import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
 from utils.utils import (
@@ -9,11 +13,40 @@ from utils.utils import (
     print_warning,
     print_info,
     Colors,
-    get_yes_no,
 )
+from utils.confirm import ASK
+from utils.events import (
+    console_events,
+    NULL_EVENTS,
+    FILE_DELETED,
+    ERROR,
+    PROGRESS,
+    PHASE_SCAN,
+)
+from utils.walker import scan_tree, is_dir_entry
+from utils.filters import compile_filter
+from utils.workers import run_workers, make_counter
+
+# Jumlah contoh file yang ditampilkan sebelum konfirmasi
+PREVIEW_LIMIT = 10
+
+# Jumlah file yang dihapus per batch (progress ditampilkan per batch)
+DELETE_BATCH_SIZE = 1000
 
+# Format record kandidat di spool: ukuran, mtime_ns, panjang path
+_RECORD = struct.Struct("<QqI")
 
-def run_clean(folder, days, ext=None):
+# Skor urutan hapus mode kuota: skor lebih kecil dihapus lebih dulu
+QUOTA_KEYS = {
+    "mtime": lambda entry: entry.mtime_ns,
+    "atime": lambda entry: entry.atime_ns,
+    "size": lambda entry: -entry.size,
+}
+
+
+def run_clean(
+    folder, days, ext=None, workers=1, filters=None, confirm=None, events=None
+):
     """
     Membersihkan file lama dari folder
 
@@ -21,6 +54,15 @@ def run_clean(folder, days, ext=None):
         folder: Folder yang akan dibersihkan
         days: Hapus file yang lebih tua dari X hari
         ext: Filter ekstensi file (opsional), misal: '.txt' atau '.log'
+        workers: Jumlah thread untuk menghapus file paralel (per folder)
+        filters: Aturan filter tambahan (lihat utils.filters), misal
+                 '-.git size:1M..'; ext digabung sebagai aturan 'ext:'
+        confirm: ConfirmPolicy untuk konfirmasi hapus (default: tanya user)
+        events: EventEmitter untuk event hapus/progress (default: cetak ke console)
+
+    Kandidat tidak disimpan di memori: hasil scan ditulis ke file sementara
+    dan dihapus per batch, total & contoh file dihitung sambil scan.
+    Pemakaian memori tetap datar berapa pun jumlah file.
     """
     try:
         # Validasi folder
@@ -35,152 +77,401 @@ def run_clean(folder, days, ext=None):
         log(f"🧹 Membersihkan folder: '{folder}'")
         print_info(f"🗑️  Menghapus file lebih tua dari {days} hari")
 
-        if ext:
-            print_info(f"🔍 Filter ekstensi: {ext}")
+        filters = compile_filter(filters, [f"ext:{ext}"] if ext else None)
+        if filters:
+            print_info(f"🔍 Filter: {filters}")
 
         # Hitung tanggal cutoff
         cutoff_date = datetime.now() - timedelta(days=days)
         cutoff_timestamp = cutoff_date.timestamp()
 
         # Counter statistik
-        stats = {"scanned": 0, "matched": 0, "deleted": 0, "failed": 0, "total_size": 0}
-
-        files_to_delete = []
+        stats = {
+            "scanned": 0,
+            "matched": 0,
+            "deleted": 0,
+            "failed": 0,
+            "total_size": 0,
+            "freed_size": 0,
+        }
+
+        # Kandidat ditulis ke file sementara, di memori hanya contoh top-N tertua
+        spool = tempfile.TemporaryFile()
+        oldest = []
 
         print_info("\n📊 Memindai file...")
 
-        # Scan semua file
-        for root, dirs, files in os.walk(folder):
-            for file in files:
+        # Scan semua file (satu stat per file lewat scandir)
+        cutoff_ns = int(cutoff_timestamp * 1_000_000_000)
+        now = time.time()
+
+        def on_scan_error(path, error):
+            name = os.path.basename(path)
+            if isinstance(error, PermissionError):
+                print_warning(f"  ⚠️  Akses ditolak: {name}")
+            else:
+                print_warning(f"  ⚠️  Error scan {name}: {str(error)}")
+            stats["failed"] += 1
+
+        events = events or console_events()
+        try:
+            entries = events.timed_iter(
+                PHASE_SCAN, scan_tree(folder, onerror=on_scan_error, filters=filters)
+            )
+            for entry in entries:
                 stats["scanned"] += 1
-                file_path = os.path.join(root, file)
-
-                try:
-                    # Cek ekstensi jika ada filter
-                    if ext and not file.lower().endswith(ext.lower()):
-                        continue
-
-                    # Cek waktu modifikasi
-                    file_mtime = os.path.getmtime(file_path)
-
-                    if file_mtime < cutoff_timestamp:
-                        file_size = os.path.getsize(file_path)
-                        file_age_days = (time.time() - file_mtime) / (60 * 60 * 24)
-
-                        files_to_delete.append(
-                            {
-                                "path": file_path,
-                                "name": file,
-                                "size": file_size,
-                                "age_days": file_age_days,
-                                "modified": datetime.fromtimestamp(file_mtime),
-                            }
-                        )
-
-                        stats["matched"] += 1
-                        stats["total_size"] += file_size
-
-                except PermissionError:
-                    print_warning(f"  ⚠️  Akses ditolak: {file}")
-                    stats["failed"] += 1
-                except Exception as e:
-                    print_warning(f"  ⚠️  Error scan {file}: {str(e)}")
-                    stats["failed"] += 1
-
-        # Tampilkan hasil scan
-        print()
-        print_info(f"📈 Hasil Pemindaian:")
-        print(f"  • Total file dipindai: {Colors.CYAN}{stats['scanned']}{Colors.RESET}")
-        print(f"  • File yang cocok: {Colors.YELLOW}{stats['matched']}{Colors.RESET}")
-
-        if stats["matched"] == 0:
-            print_success("\n✅ Tidak ada file yang perlu dihapus!")
-            return True
 
-        # Tampilkan ukuran total
-        size_mb = stats["total_size"] / (1024 * 1024)
-        if size_mb > 1024:
-            size_gb = size_mb / 1024
-            print(f"  • Total ukuran: {Colors.RED}{size_gb:.2f} GB{Colors.RESET}")
-        else:
-            print(f"  • Total ukuran: {Colors.RED}{size_mb:.2f} MB{Colors.RESET}")
+                # Cek waktu modifikasi
+                if entry.mtime_ns < cutoff_ns:
+                    _spool_write(spool, entry.relpath, entry.size, entry.mtime_ns)
+                    _keep_oldest(oldest, entry.relpath, entry.size, entry.mtime_ns)
 
-        # Tampilkan beberapa contoh file
-        print(f"\n{Colors.BOLD_YELLOW}📄 Contoh file yang akan dihapus:{Colors.RESET}")
-        for i, file_info in enumerate(files_to_delete[:10]):
-            size_kb = file_info["size"] / 1024
-            age = int(file_info["age_days"])
-            modified = file_info["modified"].strftime("%Y-%m-%d %H:%M")
+                    stats["matched"] += 1
+                    stats["total_size"] += entry.size
 
-            if size_kb > 1024:
-                size_str = f"{size_kb/1024:.2f} MB"
-            else:
-                size_str = f"{size_kb:.2f} KB"
+            return _review_and_delete(
+                folder, spool, oldest, stats, now, workers, confirm, events
+            )
+        finally:
+            spool.close()
 
-            print(f"  {i+1}. {file_info['name']}")
-            print(f"     📅 {modified} ({age} hari) • 💾 {size_str}")
+    except Exception as e:
+        print_error(f"❌ Error saat pembersihan: {str(e)}")
+        return False
 
-        if len(files_to_delete) > 10:
-            print(f"  ... dan {len(files_to_delete) - 10} file lainnya")
 
-        # Konfirmasi penghapusan
-        print()
-        confirm = get_yes_no(f"⚠️  Hapus {stats['matched']} file?", default=False)
+def run_clean_quota(
+    folder,
+    target_bytes,
+    key="mtime",
+    ext=None,
+    workers=1,
+    min_free=False,
+    filters=None,
+    confirm=None,
+    events=None,
+):
+    """
+    Membersihkan file sampai ruang sebesar target terbebaskan
+
+    Args:
+        folder: Folder yang akan dibersihkan
+        target_bytes: Jumlah byte yang ingin dibebaskan
+        key: Urutan penghapusan: 'mtime' (paling lama diubah), 'atime'
+             (paling lama tidak diakses) atau 'size' (paling besar)
+        ext: Filter ekstensi file (opsional)
+        workers: Jumlah thread untuk menghapus file paralel (per folder)
+        min_free: Jika True, target_bytes adalah sisa ruang kosong yang
+                  diinginkan di volume (dikurangi ruang kosong saat ini)
+        filters: Aturan filter tambahan (lihat utils.filters)
+        confirm: ConfirmPolicy untuk konfirmasi hapus (default: tanya user)
+        events: EventEmitter untuk event hapus/progress (default: cetak ke console)
+
+    Kandidat disimpan di heap yang hanya berisi file terpilih: setiap file
+    baru masuk heap, lalu kandidat "paling layak disimpan" dikeluarkan selama
+    sisanya masih memenuhi target. Hasilnya himpunan file minimal sesuai
+    urutan key, tanpa mengurutkan atau menyimpan seluruh isi folder.
+    """
+    try:
+        if not os.path.exists(folder):
+            print_error(f"❌ Folder tidak ditemukan: {folder}")
+            return False
 
-        if not confirm:
-            print_warning("\n❌ Pembersihan dibatalkan")
+        if not os.path.isdir(folder):
+            print_error(f"❌ Path bukan folder: {folder}")
             return False
 
-        # Hapus file
-        print()
-        print_info("🗑️  Menghapus file...")
+        if key not in QUOTA_KEYS:
+            print_error(f"❌ Key tidak dikenal: {key} (pilih {', '.join(QUOTA_KEYS)})")
+            return False
 
-        for file_info in files_to_delete:
-            try:
-                os.remove(file_info["path"])
-                stats["deleted"] += 1
+        log(f"🧹 Membersihkan folder: '{folder}'")
 
-                # Tampilkan progress setiap 50 file
-                if stats["deleted"] % 50 == 0:
-                    print(f"  🗑️  Dihapus: {stats['deleted']}/{stats['matched']}")
+        if min_free:
+            free = shutil.disk_usage(folder).free
+            print_info(f"💽 Ruang kosong saat ini: {free / (1024 ** 3):.2f} GB")
+            target_bytes -= free
 
-            except PermissionError:
-                print_warning(f"  ⚠️  Akses ditolak: {file_info['name']}")
-                stats["failed"] += 1
-            except Exception as e:
-                print_warning(f"  ⚠️  Gagal hapus {file_info['name']}: {str(e)}")
-                stats["failed"] += 1
+        if target_bytes <= 0:
+            print_success("\n✅ Ruang kosong sudah memenuhi target!")
+            return True
 
-        # Tampilkan hasil akhir
-        print()
-        print_success("✅ Pembersihan selesai!")
-        print_info(f"\n📈 Statistik Pembersihan:")
-        print(
-            f"  • File berhasil dihapus: {Colors.GREEN}{stats['deleted']}{Colors.RESET}"
+        print_info(
+            f"🎯 Target dibebaskan: {target_bytes / (1024 ** 3):.2f} GB "
+            f"(urut berdasarkan {key})"
         )
-        print(f"  • File gagal dihapus: {Colors.RED}{stats['failed']}{Colors.RESET}")
+        filters = compile_filter(filters, [f"ext:{ext}"] if ext else None)
+        if filters:
+            print_info(f"🔍 Filter: {filters}")
+
+        stats = {
+            "scanned": 0,
+            "matched": 0,
+            "deleted": 0,
+            "failed": 0,
+            "total_size": 0,
+            "freed_size": 0,
+        }
+
+        def on_scan_error(path, error):
+            name = os.path.basename(path)
+            if isinstance(error, PermissionError):
+                print_warning(f"  ⚠️  Akses ditolak: {name}")
+            else:
+                print_warning(f"  ⚠️  Error scan {name}: {str(error)}")
+            stats["failed"] += 1
+
+        score_of = QUOTA_KEYS[key]
+        now = time.time()
+
+        # Max-heap (skor dinegasikan): puncaknya kandidat yang paling layak disimpan
+        selected = []
+        selected_size = 0
 
-        if stats["deleted"] > 0:
-            freed_mb = (stats["deleted"] / stats["matched"]) * (
-                stats["total_size"] / (1024 * 1024)
+        print_info("\n📊 Memindai file...")
+        events = events or console_events()
+        entries = events.timed_iter(
+            PHASE_SCAN, scan_tree(folder, onerror=on_scan_error, filters=filters)
+        )
+        for entry in entries:
+            stats["scanned"] += 1
+            heapq.heappush(
+                selected, (-score_of(entry), entry.relpath, entry.size, entry.mtime_ns)
+            )
+            selected_size += entry.size
+            while selected_size - selected[0][2] >= target_bytes:
+                selected_size -= heapq.heappop(selected)[2]
+
+        stats["matched"] = len(selected)
+        stats["total_size"] = selected_size
+        if selected_size < target_bytes:
+            print_warning(
+                f"\n⚠️  Semua file hanya {selected_size / (1024 ** 3):.2f} GB, "
+                "target tidak bisa dipenuhi"
             )
-            if freed_mb > 1024:
-                freed_gb = freed_mb / 1024
-                print(
-                    f"  • Ruang dibebaskan: {Colors.BOLD_GREEN}{freed_gb:.2f} GB{Colors.RESET}"
-                )
-            else:
-                print(
-                    f"  • Ruang dibebaskan: {Colors.BOLD_GREEN}{freed_mb:.2f} MB{Colors.RESET}"
-                )
 
-        return True
+        # Urutan hapus: skor terkecil dulu, tiap batch dikelompokkan per folder
+        selected.sort(reverse=True)
+        spool = tempfile.TemporaryFile()
+        oldest = []
+        try:
+            for start in range(0, len(selected), DELETE_BATCH_SIZE):
+                batch = selected[start : start + DELETE_BATCH_SIZE]
+                batch.sort(key=lambda item: os.path.dirname(item[1]))
+                for _, rel_path, size, mtime_ns in batch:
+                    _spool_write(spool, rel_path, size, mtime_ns)
+                    _keep_oldest(oldest, rel_path, size, mtime_ns)
+            del selected
+
+            return _review_and_delete(
+                folder, spool, oldest, stats, now, workers, confirm, events
+            )
+        finally:
+            spool.close()
 
     except Exception as e:
         print_error(f"❌ Error saat pembersihan: {str(e)}")
         return False
 
 
+def _spool_write(spool, rel_path, size, mtime_ns):
+    """Tulis satu kandidat ke spool dalam format biner ringkas"""
+    path_bytes = os.fsencode(rel_path)
+    spool.write(_RECORD.pack(size, mtime_ns, len(path_bytes)))
+    spool.write(path_bytes)
+
+
+def _spool_read(spool):
+    """Baca ulang semua kandidat dari spool: yield (relpath, size, mtime_ns)"""
+    spool.seek(0)
+    while True:
+        header = spool.read(_RECORD.size)
+        if not header:
+            return
+        size, mtime_ns, length = _RECORD.unpack(header)
+        yield os.fsdecode(spool.read(length)), size, mtime_ns
+
+
+def _keep_oldest(heap, rel_path, size, mtime_ns):
+    """Simpan PREVIEW_LIMIT file tertua memakai heap berukuran tetap"""
+    item = (-mtime_ns, rel_path, size)
+    if len(heap) < PREVIEW_LIMIT:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+def _iter_dir_batches(records, limit):
+    """
+    Kelompokkan kandidat per folder induk: yield (parent, [(nama, ukuran), ...])
+
+    Scan menghasilkan file satu folder secara berurutan, jadi cukup memotong
+    setiap kali folder induk berganti (atau batch sudah penuh).
+    """
+    parent = None
+    batch = []
+    for rel_path, size, _ in records:
+        head, name = os.path.split(rel_path)
+        if batch and (head != parent or len(batch) >= limit):
+            yield parent, batch
+            batch = []
+        parent = head
+        batch.append((name, size))
+    if batch:
+        yield parent, batch
+
+
+def _delete_in_dir(dir_path, records, add_stat, events=NULL_EVENTS, rel_dir=""):
+    """
+    Hapus beberapa file dalam satu folder (rel_dir = path folder untuk event)
+
+    Memakai unlinkat relatif terhadap file descriptor folder (dir_fd) jika
+    didukung OS, jadi path tidak di-resolve ulang untuk setiap file.
+    """
+    dir_fd = None
+    if os.unlink in os.supports_dir_fd:
+        try:
+            dir_fd = os.open(dir_path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        except OSError:
+            dir_fd = None
+
+    try:
+        for name, size in records:
+            start = time.perf_counter()
+            try:
+                if dir_fd is not None:
+                    os.unlink(name, dir_fd=dir_fd)
+                else:
+                    os.remove(os.path.join(dir_path, name))
+                add_stat("deleted")
+                add_stat("freed_size", size)
+                events.emit(
+                    FILE_DELETED,
+                    os.path.join(rel_dir, name),
+                    size,
+                    seconds=time.perf_counter() - start,
+                )
+
+            except PermissionError:
+                events.emit(
+                    ERROR, os.path.join(rel_dir, name), message=f"  ⚠️  Akses ditolak: {name}"
+                )
+                add_stat("failed")
+            except Exception as e:
+                events.emit(
+                    ERROR,
+                    os.path.join(rel_dir, name),
+                    message=f"  ⚠️  Gagal hapus {name}: {str(e)}",
+                )
+                add_stat("failed")
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+def _review_and_delete(
+    folder, spool, oldest, stats, now, workers=1, confirm=None, events=None
+):
+    """Tampilkan hasil scan, minta konfirmasi, lalu hapus kandidat per batch"""
+    # Tampilkan hasil scan
+    print()
+    print_info("📈 Hasil Pemindaian:")
+    print(f"  • Total file dipindai: {Colors.CYAN}{stats['scanned']}{Colors.RESET}")
+    print(f"  • File yang cocok: {Colors.YELLOW}{stats['matched']}{Colors.RESET}")
+
+    if stats["matched"] == 0:
+        print_success("\n✅ Tidak ada file yang perlu dihapus!")
+        return True
+
+    # Tampilkan ukuran total
+    size_mb = stats["total_size"] / (1024 * 1024)
+    if size_mb > 1024:
+        size_gb = size_mb / 1024
+        print(f"  • Total ukuran: {Colors.RED}{size_gb:.2f} GB{Colors.RESET}")
+    else:
+        print(f"  • Total ukuran: {Colors.RED}{size_mb:.2f} MB{Colors.RESET}")
+
+    # Tampilkan beberapa contoh file (yang paling tua)
+    print(f"\n{Colors.BOLD_YELLOW}📄 Contoh file yang akan dihapus (paling lama):{Colors.RESET}")
+    for i, (neg_mtime, rel_path, size) in enumerate(sorted(oldest, reverse=True)):
+        file_mtime = -neg_mtime / 1_000_000_000
+        size_kb = size / 1024
+        age = int((now - file_mtime) / (60 * 60 * 24))
+        modified = datetime.fromtimestamp(file_mtime).strftime("%Y-%m-%d %H:%M")
+
+        if size_kb > 1024:
+            size_str = f"{size_kb/1024:.2f} MB"
+        else:
+            size_str = f"{size_kb:.2f} KB"
+
+        print(f"  {i+1}. {os.path.basename(rel_path)}")
+        print(f"     📅 {modified} ({age} hari) • 💾 {size_str}")
+
+    if stats["matched"] > len(oldest):
+        print(f"  ... dan {stats['matched'] - len(oldest)} file lainnya")
+
+    # Konfirmasi penghapusan
+    print()
+    confirm = confirm or ASK
+    if not confirm(f"⚠️  Hapus {stats['matched']} file?", default=False):
+        if confirm.dry_run:
+            return True
+        print_warning("\n❌ Pembersihan dibatalkan")
+        return False
+
+    # Hapus file per batch, dikelompokkan per folder
+    print()
+    print_info("🗑️  Menghapus file...")
+    if workers > 1:
+        print_info(f"🧵 Worker paralel: {workers}")
+
+    add_stat = make_counter(stats)
+    events = events or console_events()
+
+    def delete_batch(batch):
+        parent, records = batch
+        _delete_in_dir(os.path.join(folder, parent), records, add_stat, events, parent)
+        events.emit(
+            PROGRESS,
+            done=stats["deleted"],
+            total=stats["matched"],
+            message=f"  🗑️  Dihapus: {stats['deleted']}/{stats['matched']}",
+        )
+
+    start = time.perf_counter()
+    run_workers(
+        _iter_dir_batches(_spool_read(spool), DELETE_BATCH_SIZE),
+        delete_batch,
+        workers=workers,
+    )
+    elapsed = time.perf_counter() - start
+
+    # Tampilkan hasil akhir
+    print()
+    print_success("✅ Pembersihan selesai!")
+    print_info("\n📈 Statistik Pembersihan:")
+    print(f"  • File berhasil dihapus: {Colors.GREEN}{stats['deleted']}{Colors.RESET}")
+    print(f"  • File gagal dihapus: {Colors.RED}{stats['failed']}{Colors.RESET}")
+    if elapsed > 0:
+        print(
+            f"  • Kecepatan hapus: {Colors.CYAN}{stats['deleted'] / elapsed:.0f} file/detik{Colors.RESET}"
+        )
+
+    if stats["deleted"] > 0:
+        freed_mb = stats["freed_size"] / (1024 * 1024)
+        if freed_mb > 1024:
+            freed_gb = freed_mb / 1024
+            print(
+                f"  • Ruang dibebaskan: {Colors.BOLD_GREEN}{freed_gb:.2f} GB{Colors.RESET}"
+            )
+        else:
+            print(
+                f"  • Ruang dibebaskan: {Colors.BOLD_GREEN}{freed_mb:.2f} MB{Colors.RESET}"
+            )
+
+    return True
+
+
 def clean_empty_folders(folder):
     """
     Menghapus folder kosong (utility function)
@@ -191,18 +482,25 @@ def clean_empty_folders(folder):
     try:
         deleted = 0
 
-        # Walk bottom-up agar folder parent dicek setelah children
-        for root, dirs, files in os.walk(folder, topdown=False):
-            for dir_name in dirs:
-                dir_path = os.path.join(root, dir_name)
-                try:
-                    # Cek apakah folder kosong
-                    if not os.listdir(dir_path):
-                        os.rmdir(dir_path)
-                        deleted += 1
-                        print(f"  🗑️  Folder kosong dihapus: {dir_name}")
-                except Exception:
-                    pass
+        # Scan bottom-up agar folder parent dicek setelah children.
+        # Folder dianggap kosong jika tidak ada file/subfolder tersisa di dalamnya.
+        non_empty = set()
+
+        for entry in scan_tree(folder, dirs=True, topdown=False):
+            parent = os.path.dirname(entry.relpath)
+
+            if not is_dir_entry(entry) or entry.relpath in non_empty:
+                non_empty.discard(entry.relpath)
+                non_empty.add(parent)
+                continue
+
+            try:
+                os.rmdir(os.path.join(folder, entry.relpath))
+                deleted += 1
+                print(f"  🗑️  Folder kosong dihapus: {os.path.basename(entry.relpath)}")
+            except Exception:
+                # Masih ada isi (misal file internal) atau tidak punya akses
+                non_empty.add(parent)
 
         if deleted > 0:
             print_success(f"\n✅ {deleted} folder kosong berhasil dihapus")
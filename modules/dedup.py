@@ -0,0 +1,414 @@
+import os
+import glob
+import hashlib
+import time
+import tempfile
+from datetime import datetime
+from utils.utils import (
+    log,
+    ensure_folder,
+    print_success,
+    print_error,
+    print_warning,
+    print_info,
+    Colors,
+)
+from utils.manifest import load_manifest, save_manifest
+from utils.walker import scan_tree
+from utils.filters import compile_filter
+from utils.workers import run_workers, make_counter
+from utils.events import (
+    console_events,
+    FILE_COPIED,
+    FILE_SKIPPED,
+    ERROR,
+    PHASE_SCAN,
+    PHASE_COMPARE,
+)
+
+STORE_NAME = ".autofile_store"
+SNAPSHOT_EXT = ".snapshot"
+
+# Parameter content-defined chunking (rata-rata ~1 MB per chunk)
+CHUNK_MIN = 256 * 1024
+CHUNK_MAX = 4 * 1024 * 1024
+CHUNK_WINDOW = 16
+
+# Batas chunk dicari per potongan buffer sebesar ini
+_CHUNK_SCAN = 1024 * 1024
+
+# Tiga tabel permutasi byte, dibuat deterministik agar batas chunk stabil
+_TABLES = tuple(
+    bytes(
+        sorted(
+            range(256),
+            key=lambda b, lane=lane: hashlib.blake2b(bytes([lane, b]), digest_size=8).digest(),
+        )
+    )
+    for lane in range(3)
+)
+
+
+def _object_path(store, digest):
+    """Lokasi blob di store: objects/ab/cdef..."""
+    return os.path.join(store, "objects", digest[:2], digest[2:])
+
+
+def _reuse_object(path):
+    """
+    Pakai ulang blob yang sudah ada: mtime diperbarui agar GC retensi yang
+    berjalan bersamaan tidak menghapusnya (lihat retention._gc_store)
+
+    Returns:
+        True jika blob ada dan berhasil di-touch
+    """
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _write_object(store, data):
+    """
+    Simpan satu blob ke store jika belum ada
+
+    Returns:
+        (digest, True jika blob baru ditulis)
+    """
+    digest = hashlib.blake2b(data).hexdigest()
+    path = _object_path(store, digest)
+    if _reuse_object(path):
+        return digest, False
+
+    ensure_folder(os.path.dirname(path))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return digest, True
+
+
+def _store_whole_file(store, src_file):
+    """
+    Simpan isi file sebagai satu blob (file dibaca sekali sambil di-hash)
+
+    Returns:
+        (list digest, jumlah byte baru yang ditulis)
+    """
+    objects_dir = os.path.join(store, "objects")
+    fd, tmp_path = tempfile.mkstemp(dir=objects_dir, prefix=".tmp_")
+    digest = hashlib.blake2b()
+    try:
+        with os.fdopen(fd, "wb") as out, open(src_file, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+                out.write(block)
+
+        digest = digest.hexdigest()
+        path = _object_path(store, digest)
+        if _reuse_object(path):
+            os.remove(tmp_path)
+            return [digest], 0
+
+        ensure_folder(os.path.dirname(path))
+        os.replace(tmp_path, path)
+        return [digest], os.path.getsize(path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _boundary_marks(segment):
+    """
+    Satu byte per posisi: 0 jika jendela CHUNK_WINDOW byte mulai posisi itu batas chunk
+
+    Setiap byte dipetakan lewat tiga tabel (bytes.translate), lalu di-XOR
+    dengan byte-byte sesudahnya dalam jendela memakai shift bilangan bulat
+    besar. Semua operasi berjalan per buffer di C, bukan per byte di Python.
+    Batas terjadi jika ketiga hasil nol (8 + 8 + 4 bit), peluang 2^-20 per posisi.
+    """
+    size = len(segment)
+    lanes = []
+    for table in _TABLES:
+        value = int.from_bytes(segment.translate(table), "little")
+        shift = 8
+        while shift < CHUNK_WINDOW * 8:
+            value ^= value >> shift
+            shift *= 2
+        lanes.append(value)
+    low_bits = int.from_bytes(b"\x0f" * size, "little")
+    return (lanes[0] | lanes[1] | (lanes[2] & low_bits)).to_bytes(size, "little")
+
+
+def _find_cut(data):
+    """Cari batas chunk berikutnya (ditentukan isi jendela, jadi tahan geser)"""
+    size = len(data)
+    if size <= CHUNK_MIN:
+        return size
+
+    end = min(size, CHUNK_MAX)
+    start = CHUNK_MIN - CHUNK_WINDOW
+    while start + CHUNK_WINDOW <= end:
+        stop = min(start + _CHUNK_SCAN, end)
+        marks = _boundary_marks(bytes(data[start:stop]))
+        # Hanya posisi yang jendelanya utuh di dalam potongan ini
+        index = marks.find(0, 0, stop - start - CHUNK_WINDOW + 1)
+        if index >= 0:
+            return start + index + CHUNK_WINDOW
+        start = stop - CHUNK_WINDOW + 1
+
+    return end
+
+
+def iter_chunks(f):
+    """
+    Potong isi file menjadi chunk berbasis konten (content-defined chunking)
+
+    Karena batas chunk ditentukan oleh isi, sisipan di tengah file hanya
+    mengubah chunk di sekitar sisipan, bukan semua chunk sesudahnya.
+    """
+    data = b""
+    eof = False
+    while True:
+        if not eof and len(data) < CHUNK_MAX:
+            more = f.read(CHUNK_MAX)
+            if more:
+                data += more
+            else:
+                eof = True
+
+        if not data:
+            return
+
+        cut = _find_cut(data)
+        yield data[:cut]
+        data = data[cut:]
+
+
+def _store_chunked(store, src_file):
+    """
+    Simpan isi file sebagai beberapa chunk
+
+    Returns:
+        (list digest, jumlah byte baru yang ditulis)
+    """
+    digests = []
+    written = 0
+    with open(src_file, "rb") as f:
+        for chunk in iter_chunks(f):
+            digest, is_new = _write_object(store, chunk)
+            digests.append(digest)
+            if is_new:
+                written += len(chunk)
+    return digests, written
+
+
+def _latest_snapshot(dst, folder_name):
+    """Cari snapshot terakhir dari folder yang sama di dst (atau None)"""
+    pattern = f"{glob.escape(folder_name)}_backup_*{SNAPSHOT_EXT}"
+    pattern = os.path.join(glob.escape(dst), pattern)
+    snapshots = sorted(glob.glob(pattern))
+    return snapshots[-1] if snapshots else None
+
+
+def run_dedup_backup(
+    src, dst, chunking=False, workers=1, filters=None, dry_run=False, events=None
+):
+    """
+    Backup dengan deduplikasi: isi file disimpan di store berbasis hash
+
+    Setiap backup menghasilkan snapshot ringan '<nama>_backup_<ts>.snapshot'
+    di dst yang mencatat daftar blob per file. Blob disimpan sekali di
+    '.autofile_store', jadi file yang sama di banyak snapshot tidak dobel.
+
+    Args:
+        src: Folder sumber
+        dst: Folder tujuan (berisi store dan snapshot)
+        chunking: Jika True, file dipotong dengan content-defined chunking
+                  sehingga perubahan kecil di file besar hanya menyimpan chunk yang berubah
+        workers: Jumlah thread untuk menyimpan file paralel
+        filters: Aturan filter file (lihat utils.filters)
+        dry_run: Jika True, hanya tampilkan file yang akan dibaca & disimpan
+                 (berubah sejak snapshot terakhir); store dan snapshot tidak ditulis
+        events: EventEmitter untuk event per file (default: cetak ke console)
+    """
+    try:
+        # Validasi folder sumber
+        if not os.path.isdir(src):
+            print_error(f"❌ Folder sumber tidak ditemukan: {src}")
+            return False
+
+        filters = compile_filter(filters)
+
+        store = os.path.join(dst, STORE_NAME)
+        if not dry_run:
+            ensure_folder(os.path.join(store, "objects"))
+
+        # Resolusi mikrodetik: dua backup dalam detik yang sama tidak saling menimpa
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        folder_name = os.path.basename(os.path.normpath(src))
+        snapshot_name = f"{folder_name}_backup_{ts}{SNAPSHOT_EXT}"
+
+        log(f"🔄 Memulai backup dedup dari '{src}' ke '{dst}'")
+        print_info("🧬 Mode: Dedup Backup (hanya data baru yang disimpan)")
+        if chunking:
+            print_info("✂️  Chunking berbasis konten: aktif")
+        if filters:
+            print_info(f"🔍 Filter: {filters}")
+
+        # Snapshot sebelumnya: file yang metadata-nya sama tidak perlu dibaca ulang
+        previous = {}
+        latest = _latest_snapshot(dst, folder_name)
+        if latest:
+            previous = load_manifest(dst, os.path.basename(latest)) or {}
+            print_info(f"📒 Snapshot sebelumnya: {os.path.basename(latest)}")
+
+        stats = {
+            "stored": 0,
+            "reused": 0,
+            "failed": 0,
+            "total_size": 0,
+            "new_size": 0,
+        }
+        add_stat = make_counter(stats)
+        entries = {}
+
+        # Dry-run tidak men-touch blob, cukup cek masih ada
+        reuse = os.path.exists if dry_run else _reuse_object
+        events = events or console_events()
+
+        def store_file(entry):
+            file = os.path.basename(entry.relpath)
+            rel_file = entry.relpath
+            start = time.perf_counter()
+            try:
+                state = (entry.size, entry.mtime_ns, entry.inode)
+                old = previous.get(entry.relpath)
+                # Blob entry lama di-touch juga; jika ada yang hilang, file disimpan ulang
+                if old and old[:3] == state and all(
+                    reuse(_object_path(store, digest)) for digest in old[3].split()
+                ):
+                    entries[entry.relpath] = old
+                    add_stat("reused")
+                    add_stat("total_size", entry.size)
+                    events.phase(PHASE_COMPARE, start, rel_file)
+                    events.emit(FILE_SKIPPED, rel_file, entry.size)
+                    return
+
+                events.phase(PHASE_COMPARE, start, rel_file)
+                start = time.perf_counter()
+
+                if dry_run:
+                    add_stat("stored")
+                    add_stat("total_size", entry.size)
+                    events.emit(
+                        FILE_COPIED, rel_file, entry.size, f"  📝 Akan disimpan: {rel_file}"
+                    )
+                    return
+
+                src_file = os.path.join(src, entry.relpath)
+                if chunking:
+                    digests, written = _store_chunked(store, src_file)
+                else:
+                    digests, written = _store_whole_file(store, src_file)
+
+                entries[entry.relpath] = (*state, " ".join(digests))
+                add_stat("stored")
+                add_stat("total_size", entry.size)
+                add_stat("new_size", written)
+
+                # Pesan console hanya untuk file besar (>1MB)
+                message = None
+                if entry.size > 1024 * 1024:
+                    message = f"  ✓ {file} ({entry.size / (1024 * 1024):.2f} MB)"
+                events.emit(
+                    FILE_COPIED,
+                    rel_file,
+                    entry.size,
+                    message,
+                    seconds=time.perf_counter() - start,
+                )
+
+            except PermissionError:
+                events.emit(ERROR, rel_file, message=f"  ⚠️  Akses ditolak: {file}")
+                add_stat("failed")
+            except Exception as e:
+                events.emit(ERROR, rel_file, message=f"  ⚠️  Gagal backup {file}: {str(e)}")
+                add_stat("failed")
+
+        print_info("\n📊 Memindai file...")
+        jobs = events.timed_iter(PHASE_SCAN, scan_tree(src, filters=filters))
+        run_workers(jobs, store_file, workers=workers)
+
+        # Tampilkan hasil
+        print()
+        if dry_run:
+            print_success("✅ Dry-run selesai, store dan snapshot tidak ditulis")
+            print(f"  • File akan dibaca & disimpan: {Colors.GREEN}{stats['stored']}{Colors.RESET}")
+            print(f"  • File tidak berubah: {Colors.YELLOW}{stats['reused']}{Colors.RESET}")
+            return True
+
+        save_manifest(dst, entries, snapshot_name)
+        print_success("✅ Backup dedup selesai!")
+        print_info("\n📈 Statistik Backup:")
+        print(f"  • File dibaca & disimpan: {Colors.GREEN}{stats['stored']}{Colors.RESET}")
+        print(f"  • File tidak berubah: {Colors.YELLOW}{stats['reused']}{Colors.RESET}")
+        print(f"  • File gagal: {Colors.RED}{stats['failed']}{Colors.RESET}")
+        total_mb = stats["total_size"] / (1024 * 1024)
+        new_mb = stats["new_size"] / (1024 * 1024)
+        print(f"  • Ukuran snapshot: {Colors.CYAN}{total_mb:.2f} MB{Colors.RESET}")
+        print(f"  • Data baru ditulis: {Colors.CYAN}{new_mb:.2f} MB{Colors.RESET}")
+        print(f"  • Snapshot: {Colors.BOLD_CYAN}{os.path.join(dst, snapshot_name)}{Colors.RESET}")
+
+        return True
+
+    except Exception as e:
+        print_error(f"❌ Error saat backup dedup: {str(e)}")
+        return False
+
+
+def restore_snapshot(snapshot, target):
+    """
+    Mengembalikan isi snapshot dedup ke folder target
+
+    Args:
+        snapshot: Path file .snapshot
+        target: Folder tujuan restore (dibuat jika belum ada)
+    """
+    try:
+        folder = os.path.dirname(os.path.abspath(snapshot))
+        store = os.path.join(folder, STORE_NAME)
+        entries = load_manifest(folder, os.path.basename(snapshot))
+        if entries is None:
+            print_error(f"❌ Snapshot tidak valid: {snapshot}")
+            return False
+
+        log(f"♻️  Restore '{snapshot}' ke '{target}'")
+        restored = 0
+        failed = 0
+
+        for rel_path, (size, mtime_ns, inode, digests) in entries.items():
+            dst_file = os.path.join(target, rel_path)
+            try:
+                ensure_folder(os.path.dirname(dst_file))
+                with open(dst_file, "wb") as out:
+                    for digest in digests.split():
+                        with open(_object_path(store, digest), "rb") as blob:
+                            for block in iter(lambda: blob.read(1024 * 1024), b""):
+                                out.write(block)
+                os.utime(dst_file, ns=(mtime_ns, mtime_ns))
+                restored += 1
+            except Exception as e:
+                print_warning(f"  ⚠️  Gagal restore {rel_path}: {str(e)}")
+                failed += 1
+
+        print_success(f"✅ {restored} file berhasil di-restore")
+        if failed:
+            print_error(f"{failed} file gagal di-restore")
+        return failed == 0
+
+    except Exception as e:
+        print_error(f"❌ Error saat restore: {str(e)}")
+        return False
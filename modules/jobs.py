@@ -0,0 +1,375 @@
+import os
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.utils import log, print_success, print_error, print_warning, print_info, Colors
+from utils.filters import parse_size
+from utils.confirm import ASSUME_YES
+from modules.backup import run_backup
+from modules.sync import run_sync
+from modules.cleaner import run_clean, run_clean_quota
+from modules.retention import run_retention
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Status hasil job
+STATUS_OK = "ok"
+STATUS_FAILED = "gagal"
+STATUS_SKIPPED = "dilewati"
+
+# Tipe job: (fungsi, argumen path wajib, argumen wajib lain, argumen opsional)
+# Argumen path dipakai juga untuk menentukan device (st_dev) job.
+JOB_TYPES = {
+    "backup": (
+        run_backup,
+        ("src", "dst"),
+        (),
+        {
+            "incremental",
+            "timestamp",
+            "workers",
+            "verify",
+            "dedup",
+            "chunking",
+            "link_dest",
+            "delta_min_size",
+            "filters",
+        },
+    ),
+    "sync": (
+        run_sync,
+        ("folder1", "folder2"),
+        (),
+        {"twoway", "delta_min_size", "filters"},
+    ),
+    "clean": (
+        run_clean,
+        ("folder",),
+        ("days",),
+        {"ext", "workers", "filters"},
+    ),
+    "clean_quota": (
+        run_clean_quota,
+        ("folder",),
+        ("target_bytes",),
+        {"key", "ext", "workers", "min_free", "filters"},
+    ),
+    "retention": (
+        run_retention,
+        ("folder",),
+        (),
+        {"keep_last", "daily", "weekly", "monthly", "max_size", "name", "workers"},
+    ),
+}
+
+# Fungsi yang meminta konfirmasi (diberi ConfirmPolicy scheduler)
+_CONFIRM_TYPES = {"clean", "clean_quota", "retention"}
+
+# Fungsi yang mengirim event per file (diberi EventEmitter scheduler)
+_EVENT_TYPES = {"backup", "sync", "clean", "clean_quota"}
+
+# Argumen ukuran yang boleh ditulis sebagai teks, misal "10G"
+_SIZE_ARGS = {"delta_min_size", "target_bytes", "max_size"}
+
+# Kunci job yang bukan argumen fungsi
+_JOB_KEYS = {"name", "type", "after"}
+
+
+class Job:
+    """
+    Satu job dari file job
+
+    Attributes:
+        name: Nama unik job
+        type: Tipe job (lihat JOB_TYPES)
+        kwargs: Argumen untuk fungsi job
+        after: Nama job yang harus selesai (berhasil) lebih dulu
+        devices: Set st_dev yang disentuh job
+    """
+
+    def __init__(self, name, job_type, kwargs, after):
+        self.name = name
+        self.type = job_type
+        self.kwargs = kwargs
+        self.after = after
+        self.devices = {_device(kwargs[key]) for key in JOB_TYPES[job_type][1]}
+
+    def run(self, confirm, events=None):
+        func = JOB_TYPES[self.type][0]
+        kwargs = dict(self.kwargs)
+        if self.type in _CONFIRM_TYPES:
+            kwargs["confirm"] = confirm
+        if events is not None and self.type in _EVENT_TYPES:
+            kwargs["events"] = events
+        return func(**kwargs)
+
+
+def _device(path):
+    """st_dev dari path, atau dari folder induk terdekat jika belum ada"""
+    path = os.path.abspath(os.path.expanduser(path))
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return os.stat(path).st_dev
+
+
+def _read_spec(path):
+    """Baca file job JSON / TOML / YAML sesuai ekstensinya"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    if ext == ".toml":
+        if tomllib is None:
+            raise ValueError("File TOML butuh Python 3.11+ atau paket 'tomli'")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    if ext in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError("File YAML butuh paket 'pyyaml' (pip install pyyaml)")
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    raise ValueError(f"Format file job tidak dikenal: '{ext}' (pakai .json/.toml/.yaml)")
+
+
+def _build_job(index, spec, defaults):
+    name = spec.get("name") or f"job{index + 1}"
+    job_type = spec.get("type")
+    if job_type not in JOB_TYPES:
+        raise ValueError(
+            f"Job '{name}': tipe tidak dikenal '{job_type}' (pilihan: {', '.join(JOB_TYPES)})"
+        )
+    _, path_args, required_args, optional_args = JOB_TYPES[job_type]
+    allowed = set(path_args) | set(required_args) | optional_args
+
+    unknown = set(spec) - allowed - _JOB_KEYS
+    if unknown:
+        raise ValueError(f"Job '{name}': opsi tidak dikenal: {', '.join(sorted(unknown))}")
+
+    # Default hanya berlaku untuk opsi yang dikenal tipe job ini
+    kwargs = {key: value for key, value in defaults.items() if key in allowed}
+    kwargs.update((key, value) for key, value in spec.items() if key not in _JOB_KEYS)
+
+    missing = [key for key in (*path_args, *required_args) if key not in kwargs]
+    if missing:
+        raise ValueError(f"Job '{name}': opsi wajib belum diisi: {', '.join(missing)}")
+
+    for key in _SIZE_ARGS & set(kwargs):
+        if isinstance(kwargs[key], str):
+            kwargs[key] = parse_size(kwargs[key])
+    for key in path_args:
+        kwargs[key] = os.path.expanduser(kwargs[key])
+
+    after = spec.get("after") or []
+    if isinstance(after, str):
+        after = [after]
+    return Job(name, job_type, kwargs, list(after))
+
+
+def _order_jobs(jobs):
+    """Urutkan job sesuai dependensi (topological sort); error jika ada siklus"""
+    by_name = {}
+    for job in jobs:
+        if job.name in by_name:
+            raise ValueError(f"Nama job dipakai lebih dari sekali: '{job.name}'")
+        by_name[job.name] = job
+    for job in jobs:
+        for dep in job.after:
+            if dep not in by_name:
+                raise ValueError(f"Job '{job.name}': dependensi tidak ditemukan: '{dep}'")
+
+    waiting = {job.name: len(set(job.after)) for job in jobs}
+    dependents = {job.name: [] for job in jobs}
+    for job in jobs:
+        for dep in set(job.after):
+            dependents[dep].append(job.name)
+
+    ready = [job.name for job in jobs if waiting[job.name] == 0]
+    ordered = []
+    while ready:
+        name = ready.pop(0)
+        ordered.append(by_name[name])
+        for child in dependents[name]:
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                ready.append(child)
+
+    if len(ordered) != len(jobs):
+        cycle = sorted(name for name, count in waiting.items() if count > 0)
+        raise ValueError(f"Dependensi job membentuk siklus: {', '.join(cycle)}")
+    return ordered
+
+
+def load_jobs(path):
+    """
+    Baca file job (JSON, TOML atau YAML)
+
+    Format (contoh TOML):
+        [defaults]
+        workers = 4
+
+        [[jobs]]
+        name = "backup-foto"
+        type = "backup"
+        src = "~/foto"
+        dst = "/mnt/backup"
+        incremental = true
+
+        [[jobs]]
+        name = "bersih-foto"
+        type = "retention"
+        folder = "/mnt/backup"
+        daily = 7
+        after = ["backup-foto"]
+
+    Opsi job sama dengan argumen fungsi modul (run_backup, run_sync,
+    run_clean, run_clean_quota, run_retention). Opsi di [defaults] dipakai
+    oleh semua job yang mengenal opsi tersebut.
+
+    Returns:
+        List Job, sudah urut sesuai dependensi
+
+    Raises:
+        ValueError jika file job tidak valid
+    """
+    spec = _read_spec(path)
+    if not isinstance(spec, dict):
+        raise ValueError("File job harus berisi 'jobs' (dan opsional 'defaults')")
+    defaults = spec.get("defaults") or {}
+    job_specs = spec.get("jobs") or []
+    if not job_specs:
+        raise ValueError("File job tidak berisi job apa pun")
+    return _order_jobs(
+        [_build_job(i, job_spec, defaults) for i, job_spec in enumerate(job_specs)]
+    )
+
+
+def run_jobs(jobs, max_jobs=4, per_device=1, confirm=ASSUME_YES, events=None):
+    """
+    Menjalankan banyak job bersamaan dengan batas per device
+
+    Args:
+        jobs: List Job dari load_jobs
+        max_jobs: Jumlah job maksimal yang berjalan bersamaan
+        per_device: Jumlah job maksimal yang menyentuh device (disk) yang sama
+        confirm: ConfirmPolicy untuk job clean/retention (default: tanpa bertanya)
+        events: EventEmitter bersama untuk semua job (default: cetak ke console)
+
+    Job baru dimulai jika semua dependensinya berhasil dan semua device-nya
+    masih punya slot, jadi dua job di disk yang sama tidak saling berebut.
+    Job yang dependensinya gagal ikut dilewati.
+
+    Returns:
+        List dict hasil per job: name, type, status, seconds, error
+
+    Raises:
+        ValueError jika max_jobs atau per_device kurang dari 1
+    """
+    if max_jobs < 1 or per_device < 1:
+        raise ValueError("max_jobs dan per_device minimal 1")
+
+    results = {}
+    pending = list(jobs)
+    running = {}
+    device_load = Counter()
+
+    log(f"📋 Menjalankan {len(jobs)} job (maks {max_jobs} bersamaan, {per_device} per device)")
+
+    def execute(job):
+        start = time.perf_counter()
+        error = None
+        try:
+            ok = job.run(confirm, events)
+        except Exception as e:
+            ok, error = False, str(e)
+        return ok, time.perf_counter() - start, error
+
+    with ThreadPoolExecutor(max_workers=max_jobs) as executor:
+        while pending or running:
+            for job in list(pending):
+                states = [results[dep]["status"] for dep in job.after if dep in results]
+                if any(state != STATUS_OK for state in states):
+                    pending.remove(job)
+                    results[job.name] = _result(job, STATUS_SKIPPED, 0, "dependensi gagal")
+                    print_warning(f"⏭️  Job dilewati: {job.name} (dependensi gagal)")
+                    continue
+                if len(states) < len(job.after) or len(running) >= max_jobs:
+                    continue
+                if any(device_load[dev] >= per_device for dev in job.devices):
+                    continue
+
+                pending.remove(job)
+                device_load.update(job.devices)
+                print_info(f"▶️  Mulai job: {job.name} ({job.type})")
+                running[executor.submit(execute, job)] = job
+
+            if not running:
+                # Tidak ada yang bisa dimulai lagi: sisa job dilaporkan dilewati
+                for job in pending:
+                    results[job.name] = _result(job, STATUS_SKIPPED, 0, "tidak bisa dijadwalkan")
+                    print_warning(f"⏭️  Job dilewati: {job.name} (tidak bisa dijadwalkan)")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                device_load.subtract(job.devices)
+                ok, seconds, error = future.result()
+                status = STATUS_OK if ok else STATUS_FAILED
+                results[job.name] = _result(job, status, seconds, error)
+                if ok:
+                    print_success(f"Job selesai: {job.name} ({seconds:.1f} detik)")
+                else:
+                    print_error(f"Job gagal: {job.name}" + (f" ({error})" if error else ""))
+
+    report = [results[job.name] for job in jobs]
+    print_job_report(report)
+    return report
+
+
+def _result(job, status, seconds, error=None):
+    return {
+        "name": job.name,
+        "type": job.type,
+        "status": status,
+        "seconds": seconds,
+        "error": error,
+    }
+
+
+def print_job_report(report):
+    """Tampilkan ringkasan semua job"""
+    colors = {
+        STATUS_OK: Colors.GREEN,
+        STATUS_FAILED: Colors.RED,
+        STATUS_SKIPPED: Colors.YELLOW,
+    }
+    print(f"\n{Colors.BOLD_CYAN}{'═' * 50}{Colors.RESET}")
+    print_info("📊 Laporan Job:")
+    for result in report:
+        color = colors[result["status"]]
+        print(
+            f"  {color}{result['status']:<9}{Colors.RESET}"
+            f"{result['name']:<24}{result['type']:<12}{result['seconds']:>8.1f}s"
+        )
+    counts = Counter(result["status"] for result in report)
+    print(
+        f"\n  • Berhasil: {Colors.GREEN}{counts[STATUS_OK]}{Colors.RESET}"
+        f"  • Gagal: {Colors.RED}{counts[STATUS_FAILED]}{Colors.RESET}"
+        f"  • Dilewati: {Colors.YELLOW}{counts[STATUS_SKIPPED]}{Colors.RESET}"
+    )
+    print(f"{Colors.BOLD_CYAN}{'═' * 50}{Colors.RESET}\n")
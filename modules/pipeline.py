@@ -0,0 +1,410 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from utils.utils import ensure_folder
+from utils.walker import scan_tree, is_dir_entry
+from utils.filters import compile_filter
+from utils.workers import make_counter
+from utils.manifest import load_manifest, save_manifest
+from utils.sigcache import SignatureCache
+from utils.delta import copy_with_delta
+from utils.copier import copy_file
+from utils.events import NULL_EVENTS
+from modules.sync import ONEWAY_STATE_PREFIX, _state_name, _apply_move, source_cache
+from modules.cleaner import _delete_in_dir
+
+# Jumlah entry hasil scan per langkah producer / compare (satu lompatan ke executor)
+SCAN_BATCH_SIZE = 256
+
+# Kapasitas default queue antar tahap, per worker
+QUEUE_PER_WORKER = 4
+
+_DONE = object()
+
+
+def _next_batch(entries, size):
+    """Ambil sampai size entry berikutnya dari iterator (jalan di executor)"""
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+async def _run_pipeline(scan, compare, act, workers, queue_size, executor):
+    """
+    Jalankan pipeline scan → compare → act dengan backpressure
+
+    Args:
+        scan: Fungsi tanpa argumen yang mengembalikan iterator entry
+        compare: compare(batch) -> list job; dijalankan di executor per batch,
+                 satu batch dalam satu waktu (boleh memakai state tanpa lock)
+        act: act(job) dijalankan di executor oleh `workers` task paralel
+        workers: Jumlah job act yang berjalan bersamaan
+        queue_size: Kapasitas queue antar tahap; tahap sebelumnya menunggu
+                    jika queue penuh
+        executor: Executor untuk kerja blocking
+
+    Jika dibatalkan (task.cancel()), semua tahap berhenti mengambil pekerjaan
+    baru; job yang sedang berjalan di thread dibiarkan selesai.
+    """
+    loop = asyncio.get_running_loop()
+    scanned = asyncio.Queue(maxsize=queue_size)
+    jobs = asyncio.Queue(maxsize=queue_size * workers)
+
+    async def producer():
+        entries = scan()
+        while True:
+            batch = await loop.run_in_executor(
+                executor, _next_batch, entries, SCAN_BATCH_SIZE
+            )
+            if not batch:
+                break
+            await scanned.put(batch)
+        await scanned.put(_DONE)
+
+    async def comparer():
+        while True:
+            batch = await scanned.get()
+            if batch is _DONE:
+                break
+            for job in await loop.run_in_executor(executor, compare, batch):
+                await jobs.put(job)
+        for _ in range(workers):
+            await jobs.put(_DONE)
+
+    async def actor():
+        while True:
+            job = await jobs.get()
+            if job is _DONE:
+                break
+            await loop.run_in_executor(executor, act, job)
+
+    tasks = [asyncio.ensure_future(producer()), asyncio.ensure_future(comparer())]
+    tasks += [asyncio.ensure_future(actor()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def _with_executor(executor, workers, run):
+    """Jalankan run(executor) dengan executor milik pemanggil atau executor baru"""
+    if executor is not None:
+        return await run(executor)
+    # +1 thread untuk producer/compare agar tidak menunggu slot copy
+    own = ThreadPoolExecutor(max_workers=workers + 1)
+    try:
+        return await run(own)
+    finally:
+        own.shutdown(wait=False)
+
+
+def _result(stats, errors, start):
+    result = dict(stats)
+    result["errors"] = errors
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+async def async_backup(
+    src,
+    dst,
+    incremental=False,
+    workers=4,
+    delta_min_size=None,
+    filters=None,
+    queue_size=None,
+    executor=None,
+):
+    """
+    Versi asyncio dari run_backup (mode full / incremental)
+
+    Pipeline: scan sumber → bandingkan dengan manifest → copy di thread pool.
+    Tidak mencetak apa pun; hasil dikembalikan sebagai dict. Manifest file
+    yang sudah selesai tetap disimpan walau run dibatalkan, jadi backup
+    incremental berikutnya melanjutkan dari situ.
+
+    Args:
+        src: Folder sumber
+        dst: Folder tujuan
+        incremental: Jika True, hanya backup file yang berubah
+        workers: Jumlah copy yang berjalan bersamaan
+        delta_min_size: Lihat run_backup
+        filters: Aturan filter (lihat utils.filters)
+        queue_size: Kapasitas queue antar tahap (default workers * 4)
+        executor: Executor milik pemanggil (opsional)
+
+    Returns:
+        Dict: copied, skipped, failed, total_size, errors [(relpath, pesan)], elapsed
+
+    Raises:
+        FileNotFoundError jika folder sumber tidak ada
+        asyncio.CancelledError jika dibatalkan
+    """
+    if not os.path.isdir(src):
+        raise FileNotFoundError(f"Folder sumber tidak ditemukan: {src}")
+    filters = compile_filter(filters)
+    ensure_folder(dst)
+
+    start = time.perf_counter()
+    stats = {"copied": 0, "skipped": 0, "failed": 0, "total_size": 0}
+    add_stat = make_counter(stats)
+    errors = []
+    previous = load_manifest(dst) if incremental else None
+    manifest = {}
+
+    def compare(batch):
+        jobs = []
+        for entry in batch:
+            dst_file = os.path.join(dst, entry.relpath)
+            if is_dir_entry(entry):
+                ensure_folder(dst_file)
+                continue
+
+            state = (entry.size, entry.mtime_ns, entry.inode, None)
+            if previous is not None:
+                unchanged = previous.get(entry.relpath, (None,) * 3)[:3] == state[:3]
+            elif incremental:
+                try:
+                    dst_st = os.stat(dst_file)
+                    unchanged = (
+                        entry.mtime_ns <= dst_st.st_mtime_ns
+                        and entry.size == dst_st.st_size
+                    )
+                except OSError:
+                    unchanged = False
+            else:
+                unchanged = False
+
+            if unchanged:
+                manifest[entry.relpath] = state
+                add_stat("skipped")
+            else:
+                jobs.append((entry, state, dst_file))
+        return jobs
+
+    def copy(job):
+        entry, state, dst_file = job
+        try:
+            copy_with_delta(
+                os.path.join(src, entry.relpath), dst_file, entry.size, delta_min_size
+            )
+            manifest[entry.relpath] = state
+            add_stat("copied")
+            add_stat("total_size", entry.size)
+        except Exception as e:
+            errors.append((entry.relpath, str(e)))
+            add_stat("failed")
+
+    async def run(pool):
+        try:
+            await _run_pipeline(
+                lambda: scan_tree(src, dirs=True, filters=filters),
+                compare,
+                copy,
+                workers,
+                queue_size or workers * QUEUE_PER_WORKER,
+                pool,
+            )
+        finally:
+            # Salinan: setelah dibatalkan, copy yang sedang jalan masih bisa menulis
+            save_manifest(dst, dict(manifest))
+        return _result(stats, errors, start)
+
+    return await _with_executor(executor, workers, run)
+
+
+async def async_sync(
+    folder1,
+    folder2,
+    workers=4,
+    delta_min_size=None,
+    filters=None,
+    queue_size=None,
+    executor=None,
+):
+    """
+    Versi asyncio dari run_sync satu arah (folder1 → folder2)
+
+    Pipeline: scan folder1 → bandingkan dengan folder2 (ukuran, lalu signature
+    dari cache; file yang dipindah di sumber cukup di-rename di tujuan) → copy
+    file baru/berubah di thread pool. Two-way sync tetap lewat run_sync.
+    State sync hanya disimpan jika run selesai.
+
+    Returns:
+        Dict: copied, updated, renamed, identical, failed, errors, elapsed
+
+    Raises:
+        FileNotFoundError jika folder1 tidak ada
+        asyncio.CancelledError jika dibatalkan
+    """
+    if not os.path.isdir(folder1):
+        raise FileNotFoundError(f"Folder tidak ditemukan: {folder1}")
+    filters = compile_filter(filters)
+    ensure_folder(folder2)
+
+    start = time.perf_counter()
+    stats = {"copied": 0, "updated": 0, "renamed": 0, "identical": 0, "failed": 0}
+    add_stat = make_counter(stats)
+    errors = []
+
+    src_cache = source_cache(folder1, folder2)
+    dst_cache = SignatureCache(folder2)
+    state_name = _state_name(ONEWAY_STATE_PREFIX, folder1)
+    previous = load_manifest(folder2, state_name) or {}
+    moved_from = {old[:3]: rel_path for rel_path, old in previous.items()}
+    state = {}
+
+    def compare(batch):
+        jobs = []
+        for entry in batch:
+            dst_file = os.path.join(folder2, entry.relpath)
+            if is_dir_entry(entry):
+                ensure_folder(dst_file)
+                continue
+
+            state[entry.relpath] = (entry.size, entry.mtime_ns, entry.inode, None)
+            try:
+                try:
+                    dst_st = os.stat(dst_file)
+                except FileNotFoundError:
+                    dst_st = None
+
+                if dst_st is None:
+                    if _apply_move(
+                        entry, folder1, folder2, moved_from, dst_cache, NULL_EVENTS
+                    ):
+                        add_stat("renamed")
+                    else:
+                        jobs.append((entry, dst_file, False))
+                    continue
+
+                if entry.size == dst_st.st_size:
+                    same = src_cache.digest(
+                        entry.relpath, entry.size, entry.mtime_ns, entry.inode
+                    ) == dst_cache.digest(
+                        entry.relpath, dst_st.st_size, dst_st.st_mtime_ns, dst_st.st_ino
+                    )
+                else:
+                    same = False
+
+                if not same and entry.mtime_ns > dst_st.st_mtime_ns:
+                    jobs.append((entry, dst_file, True))
+                else:
+                    add_stat("identical")
+            except Exception as e:
+                errors.append((entry.relpath, str(e)))
+                add_stat("failed")
+        return jobs
+
+    def copy(job):
+        entry, dst_file, update = job
+        src_file = os.path.join(folder1, entry.relpath)
+        try:
+            if update:
+                copy_with_delta(src_file, dst_file, entry.size, delta_min_size)
+                add_stat("updated")
+            else:
+                copy_file(src_file, dst_file)
+                add_stat("copied")
+        except Exception as e:
+            errors.append((entry.relpath, str(e)))
+            add_stat("failed")
+
+    async def run(pool):
+        await _run_pipeline(
+            lambda: scan_tree(folder1, dirs=True, filters=filters),
+            compare,
+            copy,
+            workers,
+            queue_size or workers * QUEUE_PER_WORKER,
+            pool,
+        )
+        src_cache.save()
+        dst_cache.save()
+        save_manifest(folder2, state, state_name)
+        return _result(stats, errors, start)
+
+    return await _with_executor(executor, workers, run)
+
+
+async def async_clean(
+    folder,
+    days,
+    ext=None,
+    workers=4,
+    filters=None,
+    dry_run=False,
+    queue_size=None,
+    executor=None,
+):
+    """
+    Versi asyncio dari run_clean tanpa konfirmasi
+
+    Pipeline: scan → pilih file lebih tua dari `days` hari → hapus per folder
+    di thread pool. Tidak pernah bertanya; pakai dry_run=True untuk hanya
+    menghitung kandidat.
+
+    Returns:
+        Dict: scanned, matched, deleted, failed, total_size, freed_size, errors, elapsed
+
+    Raises:
+        FileNotFoundError jika folder tidak ada
+        asyncio.CancelledError jika dibatalkan
+    """
+    if not os.path.isdir(folder):
+        raise FileNotFoundError(f"Folder tidak ditemukan: {folder}")
+    filters = compile_filter(filters, [f"ext:{ext}"] if ext else None)
+
+    start = time.perf_counter()
+    stats = {
+        "scanned": 0,
+        "matched": 0,
+        "deleted": 0,
+        "failed": 0,
+        "total_size": 0,
+        "freed_size": 0,
+    }
+    add_stat = make_counter(stats)
+    errors = []
+    cutoff_ns = int((datetime.now() - timedelta(days=days)).timestamp() * 1_000_000_000)
+
+    def on_scan_error(path, error):
+        errors.append((path, str(error)))
+        add_stat("failed")
+
+    def compare(batch):
+        # Kandidat dikelompokkan per folder agar dihapus dengan satu dir_fd
+        groups = {}
+        for entry in batch:
+            add_stat("scanned")
+            if entry.mtime_ns < cutoff_ns:
+                add_stat("matched")
+                add_stat("total_size", entry.size)
+                parent, name = os.path.split(entry.relpath)
+                groups.setdefault(parent, []).append((name, entry.size))
+        return [] if dry_run else list(groups.items())
+
+    def delete(job):
+        parent, records = job
+        _delete_in_dir(os.path.join(folder, parent), records, add_stat)
+
+    async def run(pool):
+        await _run_pipeline(
+            lambda: scan_tree(folder, onerror=on_scan_error, filters=filters),
+            compare,
+            delete,
+            workers,
+            queue_size or workers * QUEUE_PER_WORKER,
+            pool,
+        )
+        return _result(stats, errors, start)
+
+    return await _with_executor(executor, workers, run)
@@ -1,48 +1,338 @@
 import os
 import sys
 import re
+from itertools import islice
 from utils.utils import print_error, print_warning, print_info, print_success
+from utils.manifest import is_internal
+from utils.workers import run_workers
+from utils.metadata import Image, MetadataCache
+from utils.template import compile_template
+from utils.confirm import ASK
+from utils.events import console_events, FILE_RENAMED
+from utils.rename_engine import (
+    JOURNAL_NAME,
+    HISTORY_NAME,
+    plan_renames,
+    execute_plan,
+    recover,
+    plan_undo,
+    mark_undone,
+)
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from colors import *
 
 
+# Registry format timestamp: (nama, regex). Urutan = prioritas saat dicocokkan,
+# jadi format yang lebih panjang harus didaftarkan sebelum format yang lebih pendek.
+TIMESTAMP_FORMATS = [
+    # WhatsApp: IMG-20230115-WA0001
+    ("whatsapp", r"\d{8}-WA\d{4}"),
+    # WhatsApp desktop: WhatsApp Image 2023-01-15 at 12.34.56 (PM)
+    ("whatsapp_desktop", r"\d{4}-\d{2}-\d{2} at \d{1,2}\.\d{2}\.\d{2}(?: ?[AP]M)?"),
+    # Kamera/Android: IMG_20230115_123456, PXL_20230115_123456789, Screenshot_20230115-123456
+    ("compact", r"\d{8}[_-]\d{6}(?:\d{3})?"),
+    # YYYYMMDD_HHMM
+    ("compact_short", r"\d{8}_\d{4}"),
+    # ISO: 2023-01-15_12-34-56, 2023-01-15 12.34.56, 2023-01-15T12:34:56Z
+    (
+        "iso",
+        r"\d{4}-\d{2}-\d{2}[T _]\d{2}[-:.]\d{2}[-:.]\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?",
+    ),
+    # EXIF: 2023:01:15 12:34:56
+    ("exif", r"\d{4}:\d{2}:\d{2}[ _]\d{2}:\d{2}:\d{2}"),
+    # Unix epoch detik/milidetik (2001-2286): 1673786096, 1673786096123
+    ("epoch", r"(?<!\d)1\d{9}(?:\d{3})?(?!\d)"),
+]
+
+_timestamp_re = None
+
+
+def _compile_timestamp_formats():
+    """Gabungkan semua format jadi satu regex (termasuk pemisah di depannya)"""
+    global _timestamp_re
+    alternatives = "|".join(f"(?:{pattern})" for _, pattern in TIMESTAMP_FORMATS)
+    # Lookahead digit: posisi yang bukan awal angka langsung dilewati tanpa
+    # mencoba semua alternatif satu per satu
+    _timestamp_re = re.compile(f"[_\\- ]?(?=\\d)(?:{alternatives})")
+
+
+def register_timestamp_format(name, pattern, first=False):
+    """
+    Daftarkan format timestamp tambahan untuk remove_timestamp
+
+    Args:
+        name: Nama format (format lama dengan nama sama diganti)
+        pattern: Regex timestamp, harus diawali digit (tanpa pemisah di depan)
+        first: Jika True, dicocokkan sebelum format lain
+    """
+    re.compile(pattern)  # Validasi dulu agar registry tidak rusak
+    TIMESTAMP_FORMATS[:] = [fmt for fmt in TIMESTAMP_FORMATS if fmt[0] != name]
+    if first:
+        TIMESTAMP_FORMATS.insert(0, (name, pattern))
+    else:
+        TIMESTAMP_FORMATS.append((name, pattern))
+    _compile_timestamp_formats()
+
+
+_compile_timestamp_formats()
+
+
 def remove_timestamp(filename):
     """
     Menghapus pola timestamp umum dari nama file.
     Contoh:
     - IMG_20230115_123456.jpg → IMG.jpg
     - Foto_2023-01-15_12-34-56.jpg → Foto.jpg
-    - 20230115_123456.jpg → .jpg (jika hanya timestamp)
-    """
-    # Pola timestamp yang umum ditemukan di foto
-    patterns = [
-        # Pattern 1: IMG_YYYYMMDD_HHMMSS
-        r"_\d{8}_\d{6}",
-        # Pattern 2: YYYYMMDD_HHMMSS
-        r"\d{8}_\d{6}",
-        # Pattern 3: YYYY-MM-DD_HH-MM-SS
-        r"\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}",
-        # Pattern 4: YYYYMMDD_HHMM
-        r"\d{8}_\d{4}",
-        # Pattern 5: YYYY-MM-DD HH.MM.SS
-        r"\d{4}-\d{2}-\d{2} \d{2}\.\d{2}\.\d{2}",
-    ]
+    - IMG-20230115-WA0001.jpg → IMG.jpg
+    - 20230115_123456.jpg → foto.jpg (jika hanya timestamp)
 
+    Semua format di TIMESTAMP_FORMATS dicocokkan dalam satu regex yang
+    sudah dikompilasi, jadi nama file hanya dipindai sekali.
+    """
     name, ext = os.path.splitext(filename)
-    original_name = name
-
-    for pattern in patterns:
-        name = re.sub(pattern, "", name)
+    name, count = _timestamp_re.subn("", name)
 
     # Jika setelah penghapusan nama menjadi kosong, gunakan nama default
     if not name.strip():
         name = "foto"
 
-    return name + ext, original_name != name
+    return name + ext, count > 0
+
+
+def _list_dir(path):
+    """
+    Isi satu folder dengan satu kali scandir (tanpa stat tambahan per file)
+
+    Returns:
+        (list nama file urut, set semua nama di folder, list subfolder urut)
+    """
+    files = []
+    subdirs = []
+    existing = set()
+    with os.scandir(path) as entries:
+        for entry in entries:
+            existing.add(entry.name)
+            if is_internal(entry.name):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+            elif entry.is_file():
+                files.append(entry.name)
+    files.sort()  # Supaya urut dan konsisten
+    subdirs.sort()
+    return files, existing, subdirs
+
+
+def _scan_dirs(folder, recursive=False, dry_run=False):
+    """
+    Scan folder (dan semua subfolder jika recursive), urut per folder
+
+    Rename sebelumnya yang terputus di folder mana pun dikembalikan dulu,
+    kecuali saat dry_run (hanya dilaporkan, tidak ada file yang diubah).
+
+    Yields:
+        (folder relatif, list nama file, set semua nama di folder)
+    """
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        path = os.path.join(folder, rel_dir)
+        try:
+            files, existing, subdirs = _list_dir(path)
+            if JOURNAL_NAME in existing:
+                if dry_run:
+                    print_warning(
+                        f"Ada rename terputus di {rel_dir or folder}, "
+                        "dikembalikan ke nama lama saat rename dijalankan tanpa dry-run."
+                    )
+                else:
+                    _recover_previous(path)
+                    files, existing, subdirs = _list_dir(path)
+        except OSError as e:
+            print_warning(f"Gagal membaca folder {rel_dir or folder}: {str(e)}")
+            continue
+
+        yield rel_dir, files, existing
+
+        if recursive:
+            pending.extend(os.path.join(rel_dir, d) for d in reversed(subdirs))
+
+
+def _pattern_name(filename, counter, prefix=None, suffix=None, replace=None, remove_ts=False):
+    """Nama baru satu file untuk mode PATTERN"""
+    name, ext = os.path.splitext(filename)
+    new_name = name
+
+    # 1. hapus TIMESTAMP
+    if remove_ts:
+        name_after_ts, _ = remove_timestamp(filename)
+        new_name = os.path.splitext(name_after_ts)[0]
+    # 2. HAPUS TEKS
+    if replace:
+        new_name = new_name.replace(replace, "")
+    # 3. TAMBAH PREFIX
+    if prefix:
+        new_name = f"{prefix}{new_name}"
+    # 4. TAMBAH SUFFIX
+    if suffix:
+        new_name = f"{new_name}{suffix}"
+    # 5. AUTO NUMBERING + EKSTENSI
+    return f"{new_name}_{counter}{ext}"
+
+
+def _plan_groups(folder, groups, start, numbering, new_name):
+    """
+    Hitung nama baru sekali dan susun RenamePlan per folder
+
+    Args:
+        groups: List (folder relatif, file, nama yang ada) dari _scan_dirs
+        start: Nomor awal
+        numbering: 'dir' = nomor mulai ulang di tiap folder, 'global' = lanjut
+        new_name: Fungsi new_name(rel_dir, filename, counter) -> nama baru
+
+    Returns:
+        List (folder relatif, RenamePlan)
+    """
+    counter = start
+    plans = []
+    for rel_dir, files, existing in groups:
+        if numbering == "dir":
+            counter = start
+        mapping = []
+        for filename in files:
+            mapping.append((filename, new_name(rel_dir, filename, counter)))
+            counter += 1
+        plans.append(
+            (rel_dir, plan_renames(os.path.join(folder, rel_dir), mapping, existing))
+        )
+    return plans
+
+
+def _iter_renames(plans):
+    """Semua rename dari beberapa plan: yield (path lama, path baru) relatif"""
+    for rel_dir, plan in plans:
+        for old, new in plan.renames:
+            yield os.path.join(rel_dir, old), os.path.join(rel_dir, new)
+
+
+def _print_file_list(groups):
+    """Tampilkan jumlah file dan 5 file pertama"""
+    total = sum(len(files) for _, files, _ in groups)
+    print_info(f"Total file ditemukan: {total}")
+    if len(groups) > 1:
+        print_info(f"Total folder: {len(groups)}")
+
+    print(f"\n{Colors.BOLD_MAGENTA}📋 File yang Akan Direname:{Colors.RESET}")
+    shown = 0
+    for rel_dir, files, _ in groups:
+        for f in files[: 5 - shown]:
+            shown += 1
+            print(f"{Colors.CYAN}  {shown}. {os.path.join(rel_dir, f)}{Colors.RESET}")
+        if shown >= 5:
+            break
+    if total > 5:
+        print(f"{Colors.CYAN}  ... dan {total - 5} file lainnya{Colors.RESET}")
+    return total
+
+
+def _recover_previous(folder):
+    """Kembalikan rename sebelumnya yang terputus di tengah jalan"""
+    recovered = recover(folder)
+    if recovered:
+        print_warning(
+            f"Rename sebelumnya terputus, {recovered} file dikembalikan ke nama lama."
+        )
+
+
+def _check_plans(plans):
+    """Tampilkan konflik nama; False jika rencana tidak bisa dijalankan"""
+    conflicts = [
+        (os.path.join(rel_dir, old), new, reason)
+        for rel_dir, plan in plans
+        for old, new, reason in plan.conflicts
+    ]
+    if not conflicts:
+        return True
+
+    print_error(f"Ditemukan {len(conflicts)} konflik nama, rename dibatalkan:")
+    for old, new, reason in conflicts[:10]:
+        print(f"{Colors.RED}  • {old} → {new}: {reason}{Colors.RESET}")
+    if len(conflicts) > 10:
+        print(f"{Colors.RED}  ... dan {len(conflicts) - 10} konflik lainnya{Colors.RESET}")
+    return False
+
+
+def _execute_and_report(folder, plans, history=True, workers=1, events=None):
+    """
+    Jalankan rencana rename per folder lalu tampilkan ringkasan
+
+    Setiap folder adalah satu transaksi sendiri (journal + rollback), jadi
+    folder-folder yang berbeda bisa dijalankan paralel oleh worker.
+
+    Returns:
+        Set folder relatif yang gagal (sudah dikembalikan ke nama lama)
+    """
+    print(f"\n{Colors.BOLD_CYAN}🚀 Memulai proses rename...{Colors.RESET}\n")
+    if workers > 1 and len(plans) > 1:
+        print_info(f"🧵 Worker paralel: {workers}")
+
+    failed = {}
 
+    def execute_group(group):
+        rel_dir, plan = group
+        try:
+            execute_plan(os.path.join(folder, rel_dir), plan, history)
+        except Exception as e:
+            failed[rel_dir] = e
+
+    run_workers((group for group in plans if group[1].renames), execute_group, workers)
+
+    events = events or console_events()
+    success = 0
+    for rel_dir, plan in plans:
+        if rel_dir in failed:
+            continue
+        for filename, new_filename in _iter_renames([(rel_dir, plan)]):
+            events.emit(
+                FILE_RENAMED,
+                new_filename,
+                message=f"{Colors.GREEN}✓{Colors.RESET} {filename} {Colors.YELLOW}→{Colors.RESET} {Colors.GREEN}{new_filename}{Colors.RESET}",
+            )
+        success += len(plan)
+
+    # Summary
+    print(f"\n{Colors.BOLD_CYAN}{'═' * 50}{Colors.RESET}")
+    print_success(f"Berhasil rename {success} file!")
 
-def run_rename_with_pattern(folder, prefix=None, suffix=None, replace=None, start=1, remove_ts=False):
+    if failed:
+        print_error(f"Gagal rename di {len(failed)} folder (file di folder ini dikembalikan ke nama lama)")
+        for rel_dir, error in sorted(failed.items()):
+            print(f"{Colors.RED}  • {rel_dir or folder}: {str(error)}{Colors.RESET}")
+
+    print(f"{Colors.BOLD_CYAN}{'═' * 50}{Colors.RESET}\n")
+    return set(failed)
+
+
+def _numbering_label(recursive, numbering):
+    if not recursive:
+        return ""
+    return " (per folder)" if numbering == "dir" else " (lanjut antar folder)"
+
+
+def run_rename_with_pattern(
+    folder,
+    prefix=None,
+    suffix=None,
+    replace=None,
+    start=1,
+    remove_ts=False,
+    recursive=False,
+    numbering="dir",
+    workers=1,
+    confirm=None,
+    events=None,
+):
     """
     Melakukan rename massal dengan PATTERN - menambahkan prefix/suffix ke nama file yang sudah ada.
 
@@ -53,6 +343,12 @@ def run_rename_with_pattern(folder, prefix=None, suffix=None, replace=None, star
         replace : HAPUS teks tertentu pada nama file lama (opsional)
         start   : nomor awal jika menggunakan penomoran otomatis
         remove_ts : hapus timestamp dari nama file (opsional)
+        recursive : ikut rename file di semua subfolder
+        numbering : 'dir' = nomor mulai ulang di tiap folder,
+                    'global' = nomor lanjut antar folder (untuk recursive)
+        workers   : jumlah folder yang di-rename bersamaan (untuk recursive)
+        confirm   : ConfirmPolicy untuk konfirmasi (default: tanya user)
+        events    : EventEmitter untuk event per file (default: cetak ke console)
 
     Contoh penggunaan:
         File awal: "foto_lama_001.jpg"
@@ -67,23 +363,18 @@ def run_rename_with_pattern(folder, prefix=None, suffix=None, replace=None, star
     # --- CEK FOLDER ---
     if not os.path.isdir(folder):
         print_error(f"Folder tidak ditemukan: {folder}")
-        return
+        return False
 
-    files = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))]
-    files.sort()  # Supaya urut dan konsisten
-
-    if not files:
+    confirm = confirm or ASK
+    groups = [
+        group for group in _scan_dirs(folder, recursive, confirm.dry_run) if group[1]
+    ]
+    if not groups:
         print_warning("Tidak ada file dalam folder.")
-        return
-
-    print_info(f"Total file ditemukan: {len(files)}")
+        return True
 
     # Preview 5 file pertama
-    print(f"\n{Colors.BOLD_MAGENTA}📋 File yang Akan Direname:{Colors.RESET}")
-    for i, f in enumerate(files[:5], 1):
-        print(f"{Colors.CYAN}  {i}. {f}{Colors.RESET}")
-    if len(files) > 5:
-        print(f"{Colors.CYAN}  ... dan {len(files) - 5} file lainnya{Colors.RESET}")
+    total = _print_file_list(groups)
 
     # Tampilkan aturan yang akan diterapkan
     print(f"\n{Colors.BOLD_YELLOW}⚙️  Aturan Rename (PATTERN):{Colors.RESET}")
@@ -95,116 +386,69 @@ def run_rename_with_pattern(folder, prefix=None, suffix=None, replace=None, star
         print(f"{Colors.GREEN}  ✓ Hapus teks: '{replace}' (dihapus dari nama lama){Colors.RESET}")
     if remove_ts:
         print(f"{Colors.GREEN}  ✓ Hapus timestamp: YA{Colors.RESET}")
-    print(f"{Colors.GREEN}  ✓ Penomoran: dimulai dari {start}{Colors.RESET}")
+    print(f"{Colors.GREEN}  ✓ Penomoran: dimulai dari {start}{_numbering_label(recursive, numbering)}{Colors.RESET}")
 
     if not prefix and not suffix and not replace and not remove_ts:
         print(f"{Colors.YELLOW}  ⚠ Tidak ada perubahan, hanya penomoran yang ditambahkan{Colors.RESET}")
 
+    # Nama baru dihitung sekali, dipakai untuk preview dan eksekusi
+    plans = _plan_groups(
+        folder,
+        groups,
+        start,
+        numbering,
+        lambda rel_dir, filename, counter: _pattern_name(
+            filename, counter, prefix, suffix, replace, remove_ts
+        ),
+    )
+
     # Preview hasil rename
     print(f"\n{Colors.BOLD_MAGENTA}👀 Preview Hasil Rename:{Colors.RESET}")
-    counter = start
-    for filename in files[:3]:
-        name, ext = os.path.splitext(filename)
-        new_name = name
+    for filename, new_filename in islice(_iter_renames(plans), 3):
+        name = os.path.splitext(os.path.basename(filename))[0]
 
         # Tunjukkan step by step
         steps = [f"Nama awal: '{name}'"]
-
-        # 1. HAPUS TIMESTAMP
         if remove_ts:
-            name_after_ts, ts_removed = remove_timestamp(filename)
-            new_name = os.path.splitext(name_after_ts)[0]
+            name_after_ts, ts_removed = remove_timestamp(os.path.basename(filename))
+            name_after_ts = os.path.splitext(name_after_ts)[0]
             if ts_removed:
-                steps.append(f"Setelah hapus timestamp: '{new_name}'")
+                steps.append(f"Setelah hapus timestamp: '{name_after_ts}'")
             else:
-                steps.append(f"Tidak ada timestamp yang dihapus: '{new_name}'")
-
-        # 2. Hapus text
-        if replace:
-            new_name = new_name.replace(replace, "")
-        # 3. tambah prefix
-        if prefix:
-            new_name = f"{prefix}{new_name}"
-        # 4. tambah suffix
-        if suffix:
-            new_name = f"{new_name}{suffix}"
-        # 5. auto numbering
-        new_name = f"{new_name}_{counter}"
-        new_filename = new_name + ext
+                steps.append(f"Tidak ada timestamp yang dihapus: '{name_after_ts}'")
 
         print(f"\n{Colors.CYAN}  File: {filename}{Colors.RESET}")
         for step in steps:
             print(f"{Colors.YELLOW}    → {step}{Colors.RESET}")
         print(f"{Colors.RED}  Hasil: {filename}{Colors.RESET} {Colors.YELLOW}→{Colors.RESET} {Colors.GREEN}{new_filename}{Colors.RESET}")
-        counter += 1
 
-    if len(files) > 3:
-        print(f"\n{Colors.CYAN}  ... dan {len(files) - 3} file lainnya dengan pola yang sama{Colors.RESET}")
+    if total > 3:
+        print(f"\n{Colors.CYAN}  ... dan {total - 3} file lainnya dengan pola yang sama{Colors.RESET}")
+
+    if not _check_plans(plans):
+        return False
 
     # Konfirmasi
     print()
-    confirm = input(f"{Colors.BOLD_YELLOW}Apakah preview sudah sesuai? Lanjutkan? (y/n): {Colors.RESET}").lower()
-    if confirm != "y":
+    if not confirm("Apakah preview sudah sesuai? Lanjutkan?"):
+        if confirm.dry_run:
+            return True
         print_warning("Proses dibatalkan.")
-        return
-
-    print(f"\n{Colors.BOLD_CYAN}🚀 Memulai proses rename...{Colors.RESET}\n")
-
-    counter = start
-    success = 0
-    errors = []
-
-    for filename in files:
-        try:
-            old_path = os.path.join(folder, filename)
-
-            # Pisahkan nama & ekstensi
-            name, ext = os.path.splitext(filename)
-            new_name = name
-
-            # 1. hapus TIMESTAMP
-            if remove_ts:
-                name_after_ts, _ = remove_timestamp(filename)
-                new_name = os.path.splitext(name_after_ts)[0]
-            # 2. HAPUS TEKS
-            if replace:
-                new_name = new_name.replace(replace, "")
-            # 3. TAMBAH PREFIX
-            if prefix:
-                new_name = f"{prefix}{new_name}"
-            # 4. TAMBAH SUFFIX
-            if suffix:
-                new_name = f"{new_name}{suffix}"
-            # 5. AUTO NUMBERING
-            new_name = f"{new_name}_{counter}"
-            # 6. GABUNGKAN EKSTENSI
-            new_filename = new_name + ext
-            new_path = os.path.join(folder, new_filename)
-            # Rename file
-            os.rename(old_path, new_path)
-
-            print(f"{Colors.GREEN}✓{Colors.RESET} {filename} {Colors.YELLOW}→{Colors.RESET} {Colors.GREEN}{new_filename}{Colors.RESET}")
-
-            success += 1
-            counter += 1
-
-        except Exception as e:
-            errors.append((filename, str(e)))
-            print_error(f"Gagal rename {filename}: {str(e)}")
+        return False
 
-    # Summary
-    print(f"\n{Colors.BOLD_CYAN}{'═' * 50}{Colors.RESET}")
-    print_success(f"Berhasil rename {success} file!")
-
-    if errors:
-        print_error(f"Gagal rename {len(errors)} file")
-        for fname, err in errors:
-            print(f"{Colors.RED}  • {fname}: {err}{Colors.RESET}")
-
-    print(f"{Colors.BOLD_CYAN}{'═' * 50}{Colors.RESET}\n")
+    return not _execute_and_report(folder, plans, workers=workers, events=events)
 
 
-def run_rename_custom_name(folder, custom_name, start=1):
+def run_rename_custom_name(
+    folder,
+    custom_name,
+    start=1,
+    recursive=False,
+    numbering="dir",
+    workers=1,
+    confirm=None,
+    events=None,
+):
     """
     Melakukan rename massal dengan CUSTOM NAME - mengganti nama file sepenuhnya.
 
@@ -212,6 +456,12 @@ def run_rename_custom_name(folder, custom_name, start=1):
         folder      : folder target berisi file yang akan di-rename
         custom_name : nama baru untuk semua file (tanpa ekstensi)
         start       : nomor awal untuk penomoran otomatis
+        recursive   : ikut rename file di semua subfolder
+        numbering   : 'dir' = nomor mulai ulang di tiap folder,
+                      'global' = nomor lanjut antar folder (untuk recursive)
+        workers     : jumlah folder yang di-rename bersamaan (untuk recursive)
+        confirm     : ConfirmPolicy untuk konfirmasi (default: tanya user)
+        events      : EventEmitter untuk event per file (default: cetak ke console)
 
     Contoh penggunaan:
         File awal: "foto_lama_001.jpg", "document.pdf", "data.xlsx"
@@ -223,89 +473,256 @@ def run_rename_custom_name(folder, custom_name, start=1):
     # --- CEK FOLDER ---
     if not os.path.isdir(folder):
         print_error(f"Folder tidak ditemukan: {folder}")
-        return
+        return False
 
-    files = [f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))]
-    files.sort()  # Supaya urut dan konsisten
-
-    if not files:
+    confirm = confirm or ASK
+    groups = [
+        group for group in _scan_dirs(folder, recursive, confirm.dry_run) if group[1]
+    ]
+    if not groups:
         print_warning("Tidak ada file dalam folder.")
-        return
-
-    print_info(f"Total file ditemukan: {len(files)}")
+        return True
 
     # Preview 5 file pertama
-    print(f"\n{Colors.BOLD_MAGENTA}📋 File yang Akan Direname:{Colors.RESET}")
-    for i, f in enumerate(files[:5], 1):
-        print(f"{Colors.CYAN}  {i}. {f}{Colors.RESET}")
-    if len(files) > 5:
-        print(f"{Colors.CYAN}  ... dan {len(files) - 5} file lainnya{Colors.RESET}")
+    total = _print_file_list(groups)
 
     # Tampilkan aturan yang akan diterapkan
     print(f"\n{Colors.BOLD_YELLOW}⚙️  Aturan Rename (CUSTOM NAME):{Colors.RESET}")
     print(f"{Colors.GREEN}  ✓ Nama baru: '{custom_name}'{Colors.RESET}")
-    print(f"{Colors.GREEN}  ✓ Penomoran: dimulai dari {start}{Colors.RESET}")
+    print(f"{Colors.GREEN}  ✓ Penomoran: dimulai dari {start}{_numbering_label(recursive, numbering)}{Colors.RESET}")
     print(f"{Colors.YELLOW}  ⚠ Semua nama file lama akan diganti sepenuhnya!{Colors.RESET}")
 
+    # Nama baru dihitung sekali, dipakai untuk preview dan eksekusi
+    plans = _plan_groups(
+        folder,
+        groups,
+        start,
+        numbering,
+        lambda rel_dir, filename, counter: f"{custom_name}_{counter}{os.path.splitext(filename)[1]}",
+    )
+
     # Preview hasil rename
     print(f"\n{Colors.BOLD_MAGENTA}👀 Preview Hasil Rename:{Colors.RESET}")
-    counter = start
-    for filename in files[:3]:
-        _, ext = os.path.splitext(filename)
-        new_filename = f"{custom_name}_{counter}{ext}"
-
+    for filename, new_filename in islice(_iter_renames(plans), 3):
         print(f"{Colors.CYAN}  File: {filename}{Colors.RESET}")
         print(f"{Colors.YELLOW}    → Nama awal: '{filename}'{Colors.RESET}")
         print(f"{Colors.YELLOW}    → Setelah custom name + nomor: '{new_filename}'{Colors.RESET}")
         print(f"{Colors.RED}  Hasil: {filename}{Colors.RESET} {Colors.YELLOW}→{Colors.RESET} {Colors.GREEN}{new_filename}{Colors.RESET}")
-        counter += 1
 
-    if len(files) > 3:
-        print(f"\n{Colors.CYAN}  ... dan {len(files) - 3} file lainnya dengan pola yang sama{Colors.RESET}")
+    if total > 3:
+        print(f"\n{Colors.CYAN}  ... dan {total - 3} file lainnya dengan pola yang sama{Colors.RESET}")
+
+    if not _check_plans(plans):
+        return False
 
     # Konfirmasi
     print()
-    confirm = input(f"{Colors.BOLD_YELLOW}Apakah preview sudah sesuai? Lanjutkan? (y/n): {Colors.RESET}").lower()
-    if confirm != "y":
+    if not confirm("Apakah preview sudah sesuai? Lanjutkan?"):
+        if confirm.dry_run:
+            return True
         print_warning("Proses dibatalkan.")
-        return
+        return False
 
-    print(f"\n{Colors.BOLD_CYAN}🚀 Memulai proses rename...{Colors.RESET}\n")
+    return not _execute_and_report(folder, plans, workers=workers, events=events)
 
-    counter = start
-    success = 0
-    errors = []
 
-    for filename in files:
-        try:
-            old_path = os.path.join(folder, filename)
+def run_rename_template(
+    folder,
+    template,
+    start=1,
+    recursive=False,
+    numbering="dir",
+    workers=1,
+    confirm=None,
+    events=None,
+):
+    """
+    Melakukan rename massal dengan TEMPLATE - nama baru disusun dari metadata file.
 
-            # Pisahkan ekstensi
-            _, ext = os.path.splitext(filename)
+    Parameters:
+        folder    : folder target berisi file yang akan di-rename
+        template  : template nama baru, field: {name} {ext} {parent} {counter}
+                    {size} {mtime} {exif_date} {sha1} (lihat utils.template)
+        start     : nomor awal untuk {counter}
+        recursive : ikut rename file di semua subfolder
+        numbering : 'dir' = nomor mulai ulang di tiap folder,
+                    'global' = nomor lanjut antar folder (untuk recursive)
+        workers   : jumlah folder yang di-rename bersamaan (untuk recursive)
+        confirm   : ConfirmPolicy untuk konfirmasi (default: tanya user)
+        events    : EventEmitter untuk event per file (default: cetak ke console)
+
+    Field mahal (exif_date, sha1) disimpan di cache metadata per folder
+    (berdasarkan inode) setelah rename dijalankan, jadi rename berikutnya tidak
+    membaca ulang isi file yang tidak berubah. Dry-run atau rename yang
+    dibatalkan tidak menulis cache.
 
-            # Buat nama baru dengan custom name + nomor
-            new_filename = f"{custom_name}_{counter}{ext}"
-            new_path = os.path.join(folder, new_filename)
+    Contoh penggunaan:
+        File awal: "IMG_0001.jpg" (diambil 15 Jan 2023)
+        - template = "{exif_date:%Y-%m-%d}_{counter:03}{ext}"
+        Hasil: "2023-01-15_001.jpg"
+    """
 
-            # Rename file
-            os.rename(old_path, new_path)
+    # --- CEK FOLDER ---
+    if not os.path.isdir(folder):
+        print_error(f"Folder tidak ditemukan: {folder}")
+        return False
 
-            print(f"{Colors.GREEN}✓{Colors.RESET} {filename} {Colors.YELLOW}→{Colors.RESET} {Colors.GREEN}{new_filename}{Colors.RESET}")
+    try:
+        tmpl = compile_template(template)
+    except ValueError as e:
+        print_error(f"Template tidak valid: {e}")
+        return False
 
-            success += 1
-            counter += 1
+    confirm = confirm or ASK
+    groups = [
+        group for group in _scan_dirs(folder, recursive, confirm.dry_run) if group[1]
+    ]
+    if not groups:
+        print_warning("Tidak ada file dalam folder.")
+        return True
 
-        except Exception as e:
-            errors.append((filename, str(e)))
-            print_error(f"Gagal rename {filename}: {str(e)}")
+    # Preview 5 file pertama
+    total = _print_file_list(groups)
 
-    # Summary
-    print(f"\n{Colors.BOLD_CYAN}{'═' * 50}{Colors.RESET}")
-    print_success(f"Berhasil rename {success} file!")
+    # Tampilkan aturan yang akan diterapkan
+    print(f"\n{Colors.BOLD_YELLOW}⚙️  Aturan Rename (TEMPLATE):{Colors.RESET}")
+    print(f"{Colors.GREEN}  ✓ Template: '{template}'{Colors.RESET}")
+    if "counter" in tmpl.fields:
+        print(f"{Colors.GREEN}  ✓ Penomoran: dimulai dari {start}{_numbering_label(recursive, numbering)}{Colors.RESET}")
+    if tmpl.add_ext:
+        print(f"{Colors.GREEN}  ✓ Ekstensi asli ditambahkan di akhir{Colors.RESET}")
+    if "exif_date" in tmpl.fields and Image is None:
+        print(f"{Colors.YELLOW}  ⚠ Pillow tidak terinstall, exif_date memakai waktu modifikasi{Colors.RESET}")
+
+    # Nama baru dihitung sekali, dipakai untuk preview dan eksekusi
+    caches = {}
+
+    def new_name(rel_dir, filename, counter):
+        dir_path = os.path.join(folder, rel_dir)
+        cache = None
+        if tmpl.uses_cache:
+            cache = caches.get(rel_dir)
+            if cache is None:
+                cache = caches[rel_dir] = MetadataCache(dir_path)
+        return tmpl.render(dir_path, filename, counter, cache)
+
+    try:
+        plans = _plan_groups(folder, groups, start, numbering, new_name)
+    except Exception as e:
+        print_error(f"Gagal membaca metadata file: {str(e)}")
+        return False
+
+    computed = sum(cache.computed for cache in caches.values())
+    if tmpl.uses_cache:
+        print_info(f"Metadata dihitung: {computed} file, sisanya dari cache")
 
-    if errors:
-        print_error(f"Gagal rename {len(errors)} file")
-        for fname, err in errors:
-            print(f"{Colors.RED}  • {fname}: {err}{Colors.RESET}")
+    # Preview hasil rename
+    print(f"\n{Colors.BOLD_MAGENTA}👀 Preview Hasil Rename:{Colors.RESET}")
+    for filename, new_filename in islice(_iter_renames(plans), 3):
+        print(f"{Colors.RED}  Hasil: {filename}{Colors.RESET} {Colors.YELLOW}→{Colors.RESET} {Colors.GREEN}{new_filename}{Colors.RESET}")
 
-    print(f"{Colors.BOLD_CYAN}{'═' * 50}{Colors.RESET}\n")
\ No newline at end of file
+    if total > 3:
+        print(f"\n{Colors.CYAN}  ... dan {total - 3} file lainnya dengan pola yang sama{Colors.RESET}")
+
+    if not _check_plans(plans):
+        return False
+
+    # Konfirmasi
+    print()
+    if not confirm("Apakah preview sudah sesuai? Lanjutkan?"):
+        if confirm.dry_run:
+            return True
+        print_warning("Proses dibatalkan.")
+        return False
+
+    failed = _execute_and_report(folder, plans, workers=workers, events=events)
+
+    # Cache baru disimpan setelah rename dijalankan: dry-run/batal tidak menulis
+    # apa pun ke folder. Kunci cache inode, jadi tetap berlaku setelah rename.
+    for cache in caches.values():
+        cache.save()
+    return not failed
+
+
+def run_undo_rename(
+    folder, recursive=False, workers=1, confirm=None, events=None
+):
+    """
+    Membatalkan rename massal terakhir di folder berdasarkan riwayat rename.
+
+    Parameters:
+        folder    : folder yang sebelumnya di-rename
+        recursive : undo juga rename terakhir di setiap subfolder
+        workers   : jumlah folder yang diproses bersamaan
+        confirm   : ConfirmPolicy untuk konfirmasi (default: tanya user)
+        events    : EventEmitter untuk event per file (default: cetak ke console)
+
+    File dikembalikan ke nama lama hanya jika inode-nya masih sama dengan
+    yang tercatat, jadi file yang sudah diganti/dihapus sejak rename tidak
+    tersentuh. Undo bisa diulang untuk membatalkan run yang lebih lama.
+    """
+
+    # --- CEK FOLDER ---
+    if not os.path.isdir(folder):
+        print_error(f"Folder tidak ditemukan: {folder}")
+        return False
+
+    confirm = confirm or ASK
+    runs = {}
+    plans = []
+    skipped = []
+    for rel_dir, _, existing in _scan_dirs(folder, recursive, confirm.dry_run):
+        if HISTORY_NAME not in existing:
+            continue
+        run_id, plan, dir_skipped = plan_undo(os.path.join(folder, rel_dir))
+        if run_id is None:
+            continue
+        runs[rel_dir] = run_id
+        plans.append((rel_dir, plan))
+        skipped.extend(
+            (os.path.join(rel_dir, new), old, reason) for new, old, reason in dir_skipped
+        )
+
+    if not runs:
+        print_warning("Tidak ada riwayat rename di folder ini.")
+        return True
+
+    if len(runs) == 1:
+        print_info(f"Rename terakhir: {next(iter(runs.values()))}")
+    else:
+        print_info(f"Folder dengan riwayat rename: {len(runs)}")
+    print_info(f"Total file yang akan dikembalikan: {sum(len(plan) for _, plan in plans)}")
+
+    if skipped:
+        print_warning(f"{len(skipped)} file dilewati:")
+        for new, old, reason in skipped[:10]:
+            print(f"{Colors.YELLOW}  • {new} → {old}: {reason}{Colors.RESET}")
+        if len(skipped) > 10:
+            print(f"{Colors.YELLOW}  ... dan {len(skipped) - 10} file lainnya{Colors.RESET}")
+
+    # Preview
+    total = sum(len(plan) for _, plan in plans)
+    print(f"\n{Colors.BOLD_MAGENTA}👀 Preview Undo:{Colors.RESET}")
+    for new, old in islice(_iter_renames(plans), 5):
+        print(f"{Colors.RED}  {new}{Colors.RESET} {Colors.YELLOW}→{Colors.RESET} {Colors.GREEN}{old}{Colors.RESET}")
+    if total > 5:
+        print(f"{Colors.CYAN}  ... dan {total - 5} file lainnya{Colors.RESET}")
+
+    if not _check_plans(plans):
+        return False
+
+    # Konfirmasi
+    print()
+    if not confirm("Kembalikan nama file?"):
+        if confirm.dry_run:
+            return True
+        print_warning("Proses dibatalkan.")
+        return False
+
+    failed = _execute_and_report(
+        folder, plans, history=False, workers=workers, events=events
+    )
+    for rel_dir, run_id in runs.items():
+        if rel_dir not in failed:
+            mark_undone(os.path.join(folder, rel_dir), run_id)
+    return not failed
@@ -0,0 +1,327 @@
+import os
+import re
+import shutil
+from datetime import datetime
+from utils.utils import (
+    log,
+    print_success,
+    print_error,
+    print_warning,
+    print_info,
+    Colors,
+)
+from utils.walker import scan_tree
+from utils.confirm import ASK
+from utils.workers import run_workers, make_counter
+from utils.manifest import load_manifest
+from modules.dedup import STORE_NAME, SNAPSHOT_EXT, _object_path
+
+# Nama snapshot dari run_backup(timestamp=True) / backup dedup
+SNAPSHOT_PATTERN = re.compile(
+    r"^(?P<name>.+)_backup_(?P<ts>\d{8}_\d{6}(?:_\d{6})?)(?P<ext>"
+    + re.escape(SNAPSHOT_EXT)
+    + ")?$"
+)
+
+
+def _parse_ts(ts):
+    """Timestamp nama snapshot, dengan atau tanpa mikrodetik (snapshot lama)"""
+    fmt = "%Y%m%d_%H%M%S_%f" if len(ts) > 15 else "%Y%m%d_%H%M%S"
+    return datetime.strptime(ts, fmt)
+
+
+def list_snapshots(folder, name=None):
+    """
+    Daftar snapshot di folder backup (satu kali scandir)
+
+    Args:
+        folder: Folder tujuan backup
+        name: Hanya snapshot dari folder sumber dengan nama ini (opsional)
+
+    Returns:
+        List dict {name, path, time, is_dir} urut dari yang terbaru
+    """
+    snapshots = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            match = SNAPSHOT_PATTERN.match(entry.name)
+            if not match or (name and match.group("name") != name):
+                continue
+
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if is_dir == bool(match.group("ext")):
+                continue
+
+            snapshots.append(
+                {
+                    "name": match.group("name"),
+                    "path": entry.path,
+                    "time": _parse_ts(match.group("ts")),
+                    "is_dir": is_dir,
+                }
+            )
+
+    snapshots.sort(key=lambda s: s["time"], reverse=True)
+    return snapshots
+
+
+def _snapshot_sizes(snapshots):
+    """
+    Hitung ukuran setiap snapshot, dari yang terbaru
+
+    File hard-link (snapshot link_dest) dan blob dedup hanya dihitung di
+    snapshot terbaru yang memakainya, jadi ukuran = ruang yang benar-benar
+    dibebaskan bila snapshot lama dihapus.
+    """
+    seen = set()
+    seen_blobs = set()
+    for snapshot in snapshots:
+        size = 0
+        if snapshot["is_dir"]:
+            for entry in scan_tree(snapshot["path"]):
+                if entry.inode not in seen:
+                    seen.add(entry.inode)
+                    size += entry.size
+        else:
+            folder = os.path.dirname(snapshot["path"])
+            store = os.path.join(folder, STORE_NAME)
+            size = os.path.getsize(snapshot["path"])
+            entries = load_manifest(folder, os.path.basename(snapshot["path"])) or {}
+            for values in entries.values():
+                for digest in values[3].split():
+                    if digest in seen_blobs:
+                        continue
+                    seen_blobs.add(digest)
+                    try:
+                        size += os.path.getsize(_object_path(store, digest))
+                    except OSError:
+                        pass
+        snapshot["size"] = size
+
+
+def plan_retention(
+    snapshots, keep_last=0, daily=0, weekly=0, monthly=0, max_size=None
+):
+    """
+    Tentukan snapshot mana yang disimpan dan dihapus (grandfather-father-son)
+
+    Args:
+        snapshots: Hasil list_snapshots (urut terbaru dulu)
+        keep_last: Simpan N snapshot terbaru
+        daily: Simpan snapshot terbaru dari N hari terakhir yang punya snapshot
+        weekly: Simpan snapshot terbaru dari N minggu terakhir
+        monthly: Simpan snapshot terbaru dari N bulan terakhir
+        max_size: Batas total ukuran (byte); snapshot tertua yang tersisa
+                  ikut dihapus sampai total di bawah batas
+
+    Returns:
+        List (snapshot, keep, alasan) dengan urutan sama seperti input
+    """
+    reasons = {id(s): [] for s in snapshots}
+    no_rules = not (keep_last or daily or weekly or monthly)
+
+    for i, snapshot in enumerate(snapshots):
+        if no_rules or i < keep_last:
+            reasons[id(snapshot)].append("terbaru" if not no_rules else "semua")
+
+    rules = [
+        (daily, "harian", lambda t: t.date()),
+        (weekly, "mingguan", lambda t: t.isocalendar()[:2]),
+        (monthly, "bulanan", lambda t: (t.year, t.month)),
+    ]
+    for count, label, bucket_of in rules:
+        buckets = set()
+        for snapshot in snapshots:
+            if len(buckets) >= count:
+                break
+            bucket = bucket_of(snapshot["time"])
+            if bucket not in buckets:
+                buckets.add(bucket)
+                reasons[id(snapshot)].append(label)
+
+    plan = [(s, bool(reasons[id(s)]), ", ".join(reasons[id(s)])) for s in snapshots]
+
+    if max_size is not None:
+        total = 0
+        for i, (snapshot, keep, reason) in enumerate(plan):
+            if not keep:
+                continue
+            total += snapshot["size"]
+            # Snapshot terbaru selalu disimpan
+            if total > max_size and i > 0:
+                plan[i] = (snapshot, False, "melebihi kuota")
+
+    return plan
+
+
+def _gc_store(folder):
+    """
+    Hapus blob di store dedup yang tidak lagi dipakai snapshot mana pun
+
+    Returns:
+        (jumlah blob dihapus, byte dibebaskan)
+    """
+    objects = os.path.join(folder, STORE_NAME, "objects")
+    if not os.path.isdir(objects):
+        return 0, 0
+
+    used = set()
+    newest = None
+    for snapshot in list_snapshots(folder):
+        if snapshot["is_dir"]:
+            continue
+        entries = load_manifest(folder, os.path.basename(snapshot["path"])) or {}
+        for values in entries.values():
+            used.update(values[3].split())
+        mtime = os.path.getmtime(snapshot["path"])
+        newest = mtime if newest is None else max(newest, mtime)
+
+    removed = 0
+    freed = 0
+    for prefix in os.scandir(objects):
+        if not prefix.is_dir():
+            continue
+        for blob in os.scandir(prefix.path):
+            if blob.name.startswith(".tmp_") or prefix.name + blob.name in used:
+                continue
+            # Blob yang lebih baru dari snapshot terakhir mungkin milik backup yang
+            # sedang berjalan (blob yang dipakai ulang di-touch oleh backup dedup)
+            if newest is not None and blob.stat().st_mtime >= newest:
+                continue
+
+            # Pindahkan dulu (atomik) lalu cek ulang: jika backup men-touch blob
+            # tepat sebelum dipindah, kembalikan; jika sesudahnya, backup akan
+            # gagal men-touch dan menulis ulang blob tersebut
+            trash = os.path.join(prefix.path, ".tmp_gc_" + blob.name)
+            try:
+                os.rename(blob.path, trash)
+            except FileNotFoundError:
+                continue
+            st = os.stat(trash)
+            if newest is not None and st.st_mtime >= newest:
+                os.rename(trash, blob.path)
+                continue
+            os.remove(trash)
+            removed += 1
+            freed += st.st_size
+    return removed, freed
+
+
+def run_retention(
+    folder,
+    keep_last=0,
+    daily=0,
+    weekly=0,
+    monthly=0,
+    max_size=None,
+    name=None,
+    workers=1,
+    confirm=None,
+):
+    """
+    Merapikan snapshot backup bertimestamp dengan aturan retensi
+
+    Args:
+        folder: Folder tujuan backup yang berisi snapshot '<nama>_backup_<ts>'
+        keep_last: Simpan N snapshot terbaru
+        daily: Simpan 1 snapshot per hari untuk N hari terakhir
+        weekly: Simpan 1 snapshot per minggu untuk N minggu terakhir
+        monthly: Simpan 1 snapshot per bulan untuk N bulan terakhir
+        max_size: Batas total ukuran snapshot dalam byte (opsional)
+        name: Hanya proses snapshot dari folder sumber dengan nama ini
+        workers: Jumlah snapshot yang dihapus bersamaan
+        confirm: ConfirmPolicy untuk konfirmasi hapus (default: tanya user)
+
+    Aturan dievaluasi per nama folder sumber. Jika tidak ada aturan
+    keep_last/daily/weekly/monthly, semua snapshot disimpan (hanya kuota
+    ukuran yang berlaku).
+    """
+    try:
+        if not os.path.isdir(folder):
+            print_error(f"❌ Folder tidak ditemukan: {folder}")
+            return False
+
+        log(f"🗄️  Retensi snapshot di: '{folder}'")
+
+        snapshots = list_snapshots(folder, name)
+        if not snapshots:
+            print_info("📂 Tidak ada snapshot backup di folder ini")
+            return True
+
+        if max_size is not None:
+            print_info("📏 Menghitung ukuran snapshot...")
+            _snapshot_sizes(snapshots)
+
+        # Kelompokkan per nama folder sumber
+        groups = {}
+        for snapshot in snapshots:
+            groups.setdefault(snapshot["name"], []).append(snapshot)
+
+        plan = []
+        for group in groups.values():
+            plan.extend(
+                plan_retention(group, keep_last, daily, weekly, monthly, max_size)
+            )
+
+        # Tampilkan rencana
+        print(f"\n{Colors.BOLD_MAGENTA}📋 Rencana Retensi:{Colors.RESET}")
+        for snapshot, keep, reason in plan:
+            label = os.path.basename(snapshot["path"])
+            if keep:
+                print(f"{Colors.GREEN}  ✓ SIMPAN  {label} ({reason}){Colors.RESET}")
+            else:
+                extra = f" ({reason})" if reason else ""
+                print(f"{Colors.RED}  ✗ HAPUS   {label}{extra}{Colors.RESET}")
+
+        to_delete = [snapshot for snapshot, keep, _ in plan if not keep]
+        if not to_delete:
+            print_success("\n✅ Tidak ada snapshot yang perlu dihapus!")
+            return True
+
+        print()
+        confirm = confirm or ASK
+        if not confirm(f"⚠️  Hapus {len(to_delete)} snapshot?", default=False):
+            if confirm.dry_run:
+                return True
+            print_warning("\n❌ Retensi dibatalkan")
+            return False
+
+        stats = {"deleted": 0, "failed": 0}
+        add_stat = make_counter(stats)
+
+        def delete_snapshot(snapshot):
+            label = os.path.basename(snapshot["path"])
+            try:
+                if snapshot["is_dir"]:
+                    # rmtree memakai fd folder (rmtree aman) di Linux
+                    shutil.rmtree(snapshot["path"])
+                else:
+                    os.remove(snapshot["path"])
+                add_stat("deleted")
+                print(f"  🗑️  Dihapus: {label}")
+            except Exception as e:
+                print_warning(f"  ⚠️  Gagal hapus {label}: {str(e)}")
+                add_stat("failed")
+
+        print()
+        run_workers(to_delete, delete_snapshot, workers=workers)
+
+        # Blob dedup yang sudah tidak dipakai ikut dibersihkan
+        removed, freed = _gc_store(folder)
+
+        print()
+        print_success("✅ Retensi selesai!")
+        print_info("\n📈 Statistik Retensi:")
+        print(f"  • Snapshot dihapus: {Colors.GREEN}{stats['deleted']}{Colors.RESET}")
+        print(f"  • Snapshot gagal: {Colors.RED}{stats['failed']}{Colors.RESET}")
+        if removed:
+            freed_mb = freed / (1024 * 1024)
+            print(
+                f"  • Blob dedup dibersihkan: {Colors.CYAN}{removed} ({freed_mb:.2f} MB){Colors.RESET}"
+            )
+
+        return stats["failed"] == 0
+
+    except Exception as e:
+        print_error(f"❌ Error saat retensi: {str(e)}")
+        return False
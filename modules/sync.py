@@ -1,7 +1,7 @@
 import os
-import shutil
+import time
 import filecmp
-from pathlib import Path
+import hashlib
 from utils.utils import (
     log,
     ensure_folder,
@@ -11,9 +11,39 @@ from utils.utils import (
     print_info,
     Colors,
 )
+from utils.walker import scan_tree, is_dir_entry, FileEntry
+from utils.filters import compile_filter
+from utils.sigcache import SignatureCache
+from utils.manifest import load_manifest, save_manifest
+from utils.delta import copy_with_delta
+from utils.copier import copy_file
+from utils.events import (
+    console_events,
+    NULL_EVENTS,
+    FILE_COPIED,
+    FILE_UPDATED,
+    FILE_MOVED,
+    FILE_SKIPPED,
+    FILE_DELETED,
+    ERROR,
+    PHASE_SCAN,
+    PHASE_COMPARE,
+)
+
+TWOWAY_STATE_PREFIX = ".autofile_twoway_"
+ONEWAY_STATE_PREFIX = ".autofile_oneway_"
+ONEWAY_SIGCACHE_PREFIX = ".autofile_srcsig_"
 
 
-def run_sync(folder1, folder2, twoway=False):
+def run_sync(
+    folder1,
+    folder2,
+    twoway=False,
+    delta_min_size=None,
+    filters=None,
+    events=None,
+    dry_run=False,
+):
     """
     Sinkronisasi dua folder
 
@@ -21,6 +51,16 @@ def run_sync(folder1, folder2, twoway=False):
         folder1: Folder pertama
         folder2: Folder kedua
         twoway: Jika True, sinkronisasi dua arah. Jika False, folder1 -> folder2
+        delta_min_size: File yang diperbarui >= ukuran ini (byte) dikirim dengan
+                        delta transfer (hanya blok yang berubah ditulis)
+        filters: Aturan filter file (lihat utils.filters); file di luar filter
+                 tidak disalin, diperbarui maupun dihapus
+        events: EventEmitter untuk event per file (default: cetak ke console)
+        dry_run: Jika True, hanya tampilkan rencana (copy/update/pindah/hapus);
+                 tidak ada file, state maupun cache yang ditulis
+
+    Two-way sync menyimpan state sync terakhir di kedua folder sehingga
+    penghapusan dan rename ikut diteruskan, dan konflik dilaporkan.
     """
     try:
         # Validasi folder
@@ -32,8 +72,12 @@ def run_sync(folder1, folder2, twoway=False):
             print_error(f"❌ Path 1 bukan folder: {folder1}")
             return False
 
+        filters = compile_filter(filters)
+        events = events or console_events()
+
         # Buat folder2 jika belum ada
-        ensure_folder(folder2)
+        if not dry_run:
+            ensure_folder(folder2)
 
         if twoway:
             log(f"🔄 Sinkronisasi dua arah: '{folder1}' ↔️ '{folder2}'")
@@ -42,6 +86,11 @@ def run_sync(folder1, folder2, twoway=False):
             log(f"🔄 Sinkronisasi satu arah: '{folder1}' → '{folder2}'")
             print_info("→  Mode: One-Way Sync (folder1 ke folder2)")
 
+        if filters:
+            print_info(f"🔍 Filter: {filters}")
+        if dry_run:
+            print_info("🔎 Dry-run: hanya menampilkan rencana, tidak ada file yang diubah")
+
         stats = {
             "copied_to_2": 0,
             "copied_to_1": 0,
@@ -49,22 +98,57 @@ def run_sync(folder1, folder2, twoway=False):
             "updated_in_1": 0,
             "deleted_in_2": 0,
             "deleted_in_1": 0,
+            "renamed_in_2": 0,
+            "renamed_in_1": 0,
+            "conflicts": 0,
             "identical": 0,
         }
 
         print_info("\n📊 Menganalisis perbedaan...")
 
-        # Sync dari folder1 ke folder2
-        _sync_one_way(folder1, folder2, stats, "to_2")
+        # Cache signature per folder: file yang metadata-nya tidak berubah tidak dibaca ulang.
+        # One-way sync tidak menulis apa pun ke folder sumber (bisa read-only/dipakai
+        # bersama), cache sisi sumber disimpan di folder tujuan.
+        cache1 = SignatureCache(folder1) if twoway else source_cache(folder1, folder2)
+        cache2 = SignatureCache(folder2)
 
         if twoway:
-            # Sync dari folder2 ke folder1 (hanya file yang tidak ada di folder1)
-            _sync_one_way(folder2, folder1, stats, "to_1")
+            # Diff tiga arah (state terakhir vs folder1 vs folder2)
+            _sync_two_way(
+                folder1,
+                folder2,
+                stats,
+                cache1,
+                cache2,
+                delta_min_size,
+                filters,
+                events,
+                dry_run,
+            )
+        else:
+            # Sync dari folder1 ke folder2
+            _sync_one_way(
+                folder1,
+                folder2,
+                stats,
+                "to_2",
+                cache1,
+                cache2,
+                delta_min_size,
+                filters,
+                events,
+                dry_run,
+            )
 
         # Tampilkan hasil
         print()
-        print_success("✅ Sinkronisasi selesai!")
-        print_info(f"\n📈 Statistik Sinkronisasi:")
+        if dry_run:
+            print_success("✅ Dry-run selesai, tidak ada file yang diubah")
+        else:
+            cache1.save()
+            cache2.save()
+            print_success("✅ Sinkronisasi selesai!")
+        print_info("\n📈 Statistik Sinkronisasi:")
 
         if twoway:
             print(f"  📁 {Colors.BOLD_CYAN}Folder 1 → Folder 2:{Colors.RESET}")
@@ -74,6 +158,12 @@ def run_sync(folder1, folder2, twoway=False):
             print(
                 f"     • File diperbarui: {Colors.YELLOW}{stats['updated_in_2']}{Colors.RESET}"
             )
+            print(
+                f"     • File dihapus: {Colors.RED}{stats['deleted_in_2']}{Colors.RESET}"
+            )
+            print(
+                f"     • File dipindah: {Colors.CYAN}{stats['renamed_in_2']}{Colors.RESET}"
+            )
             print()
             print(f"  📁 {Colors.BOLD_CYAN}Folder 2 → Folder 1:{Colors.RESET}")
             print(
@@ -82,6 +172,14 @@ def run_sync(folder1, folder2, twoway=False):
             print(
                 f"     • File diperbarui: {Colors.YELLOW}{stats['updated_in_1']}{Colors.RESET}"
             )
+            print(
+                f"     • File dihapus: {Colors.RED}{stats['deleted_in_1']}{Colors.RESET}"
+            )
+            print(
+                f"     • File dipindah: {Colors.CYAN}{stats['renamed_in_1']}{Colors.RESET}"
+            )
+            print()
+            print(f"  ⚔️  Konflik: {Colors.BOLD_RED}{stats['conflicts']}{Colors.RESET}")
         else:
             print(
                 f"  • File baru dicopy: {Colors.GREEN}{stats['copied_to_2']}{Colors.RESET}"
@@ -89,6 +187,9 @@ def run_sync(folder1, folder2, twoway=False):
             print(
                 f"  • File diperbarui: {Colors.YELLOW}{stats['updated_in_2']}{Colors.RESET}"
             )
+            print(
+                f"  • File dipindah: {Colors.CYAN}{stats['renamed_in_2']}{Colors.RESET}"
+            )
 
         print(f"  • File identik: {Colors.CYAN}{stats['identical']}{Colors.RESET}")
 
@@ -99,7 +200,18 @@ def run_sync(folder1, folder2, twoway=False):
         return False
 
 
-def _sync_one_way(src_folder, dst_folder, stats, direction):
+def _sync_one_way(
+    src_folder,
+    dst_folder,
+    stats,
+    direction,
+    src_cache=None,
+    dst_cache=None,
+    delta_min_size=None,
+    filters=None,
+    events=NULL_EVENTS,
+    dry_run=False,
+):
     """
     Helper function untuk sinkronisasi satu arah
 
@@ -108,55 +220,516 @@ def _sync_one_way(src_folder, dst_folder, stats, direction):
         dst_folder: Folder tujuan
         stats: Dictionary untuk menyimpan statistik
         direction: 'to_2' atau 'to_1' untuk tracking statistik
+        src_cache: SignatureCache folder sumber (opsional)
+        dst_cache: SignatureCache folder tujuan (opsional)
+        delta_min_size: Ukuran minimum (byte) untuk update via delta transfer
+        filters: FileFilter (opsional), hanya file yang lolos yang disinkronkan
+        events: EventEmitter untuk event per file
+        dry_run: Jika True, aksi hanya dilaporkan, tidak dijalankan
+
+    State sumber saat sync terakhir disimpan di folder tujuan. File baru yang
+    (ukuran, mtime, inode)-nya sama dengan file yang sudah hilang dari sumber
+    dianggap dipindah/di-rename, jadi cukup di-rename juga di tujuan.
     """
-    for root, dirs, files in os.walk(src_folder):
-        # Hitung relative path
-        rel_path = os.path.relpath(root, src_folder)
-        dst_dir = os.path.join(dst_folder, rel_path) if rel_path != "." else dst_folder
+    src_cache = src_cache or source_cache(src_folder, dst_folder)
+    dst_cache = dst_cache or SignatureCache(dst_folder)
+
+    state_name = _state_name(ONEWAY_STATE_PREFIX, src_folder)
+    previous = load_manifest(dst_folder, state_name) or {}
+    moved_from = {old[:3]: rel_path for rel_path, old in previous.items()}
+    state = {}
+
+    entries = events.timed_iter(
+        PHASE_SCAN, scan_tree(src_folder, dirs=True, filters=filters)
+    )
+    for entry in entries:
+        dst_file = os.path.join(dst_folder, entry.relpath)
 
         # Buat struktur folder di tujuan
-        ensure_folder(dst_dir)
+        if is_dir_entry(entry):
+            if not dry_run:
+                ensure_folder(dst_file)
+            continue
+
+        src_file = os.path.join(src_folder, entry.relpath)
+        file = os.path.basename(entry.relpath)
 
-        for file in files:
-            src_file = os.path.join(root, file)
-            dst_file = os.path.join(dst_dir, file)
+        state[entry.relpath] = (entry.size, entry.mtime_ns, entry.inode, None)
+        start = time.perf_counter()
 
+        try:
+            # Cek apakah file sudah ada di tujuan
             try:
-                # Cek apakah file sudah ada di tujuan
-                if os.path.exists(dst_file):
-                    # Bandingkan file
-                    if not filecmp.cmp(src_file, dst_file, shallow=False):
-                        # File berbeda, cek mana yang lebih baru
-                        src_mtime = os.path.getmtime(src_file)
-                        dst_mtime = os.path.getmtime(dst_file)
-
-                        if src_mtime > dst_mtime:
-                            # File sumber lebih baru, update
-                            shutil.copy2(src_file, dst_file)
-                            if direction == "to_2":
-                                stats["updated_in_2"] += 1
-                            else:
-                                stats["updated_in_1"] += 1
-                            print(f"  🔄 Update: {file}")
+                dst_st = os.stat(dst_file)
+            except FileNotFoundError:
+                dst_st = None
+
+            if dst_st is None and _apply_move(
+                entry, src_folder, dst_folder, moved_from, dst_cache, events, dry_run
+            ):
+                stats[f"renamed_in_{direction[-1]}"] += 1
+            elif dst_st is not None:
+                # Bandingkan file: ukuran dulu, lalu signature dari cache
+                src_digest = None
+                if entry.size == dst_st.st_size:
+                    src_digest = src_cache.digest(
+                        entry.relpath, entry.size, entry.mtime_ns, entry.inode
+                    )
+                    dst_digest = dst_cache.digest(
+                        entry.relpath, dst_st.st_size, dst_st.st_mtime_ns, dst_st.st_ino
+                    )
+                    same = src_digest == dst_digest
+                else:
+                    same = False
+
+                events.phase(PHASE_COMPARE, start, entry.relpath)
+                if not same:
+                    # File berbeda, cek mana yang lebih baru
+                    if entry.mtime_ns > dst_st.st_mtime_ns and dry_run:
+                        stats[f"updated_in_{direction[-1]}"] += 1
+                        events.emit(
+                            FILE_UPDATED,
+                            entry.relpath,
+                            entry.size,
+                            f"  📝 Akan diperbarui: {entry.relpath}",
+                        )
+                    elif entry.mtime_ns > dst_st.st_mtime_ns:
+                        # File sumber lebih baru, update
+                        start = time.perf_counter()
+                        copy_with_delta(src_file, dst_file, entry.size, delta_min_size)
+                        if src_digest:
+                            dst_st = os.stat(dst_file)
+                            dst_cache.update(
+                                entry.relpath,
+                                dst_st.st_size,
+                                dst_st.st_mtime_ns,
+                                dst_st.st_ino,
+                                src_digest,
+                            )
+                        if direction == "to_2":
+                            stats["updated_in_2"] += 1
                         else:
-                            # File tujuan lebih baru atau sama, skip
-                            stats["identical"] += 1
+                            stats["updated_in_1"] += 1
+                        events.emit(
+                            FILE_UPDATED,
+                            entry.relpath,
+                            entry.size,
+                            f"  🔄 Update: {file}",
+                            seconds=time.perf_counter() - start,
+                        )
                     else:
-                        # File identik
+                        # File tujuan lebih baru atau sama, skip
                         stats["identical"] += 1
+                        events.emit(FILE_SKIPPED, entry.relpath, entry.size)
                 else:
-                    # File baru, copy
-                    shutil.copy2(src_file, dst_file)
-                    if direction == "to_2":
-                        stats["copied_to_2"] += 1
-                    else:
-                        stats["copied_to_1"] += 1
-                    print(f"  ➕ Baru: {file}")
+                    # File identik
+                    stats["identical"] += 1
+                    events.emit(FILE_SKIPPED, entry.relpath, entry.size)
+            elif dry_run:
+                events.phase(PHASE_COMPARE, start, entry.relpath)
+                stats[f"copied_to_{direction[-1]}"] += 1
+                events.emit(
+                    FILE_COPIED, entry.relpath, entry.size, f"  📝 Akan dicopy: {entry.relpath}"
+                )
+            else:
+                # File baru, copy
+                events.phase(PHASE_COMPARE, start, entry.relpath)
+                start = time.perf_counter()
+                copy_file(src_file, dst_file)
+                if direction == "to_2":
+                    stats["copied_to_2"] += 1
+                else:
+                    stats["copied_to_1"] += 1
+                events.emit(
+                    FILE_COPIED,
+                    entry.relpath,
+                    entry.size,
+                    f"  ➕ Baru: {file}",
+                    seconds=time.perf_counter() - start,
+                )
+
+        except PermissionError:
+            events.emit(ERROR, entry.relpath, message=f"  ⚠️  Akses ditolak: {file}")
+        except Exception as e:
+            events.emit(ERROR, entry.relpath, message=f"  ⚠️  Gagal sync {file}: {str(e)}")
+
+    if not dry_run:
+        save_manifest(dst_folder, state, state_name)
+
+
+def _apply_move(
+    entry, src_folder, dst_folder, moved_from, dst_cache, events, dry_run=False
+):
+    """
+    Rename file di tujuan jika file sumber ternyata hasil pindah/rename
+
+    Returns:
+        True jika file berhasil di-rename di tujuan (dry-run: jika bisa di-rename)
+    """
+    old_path = moved_from.get((entry.size, entry.mtime_ns, entry.inode))
+    if not old_path or old_path == entry.relpath:
+        return False
+
+    # File lama harus sudah hilang dari sumber & masih utuh di tujuan
+    if os.path.lexists(os.path.join(src_folder, old_path)):
+        return False
+
+    old_file = os.path.join(dst_folder, old_path)
+    try:
+        old_st = os.stat(old_file)
+    except OSError:
+        return False
+    if old_st.st_size != entry.size or old_st.st_mtime_ns != entry.mtime_ns:
+        return False
+
+    if dry_run:
+        events.emit(
+            FILE_MOVED,
+            entry.relpath,
+            entry.size,
+            f"  📝 Akan dipindah: {old_path} → {entry.relpath}",
+        )
+        return True
+
+    new_file = os.path.join(dst_folder, entry.relpath)
+    ensure_folder(os.path.dirname(new_file))
+    os.rename(old_file, new_file)
+    dst_cache.forget(old_path)
+    events.emit(
+        FILE_MOVED, entry.relpath, entry.size, f"  🔀 Pindah: {old_path} → {entry.relpath}"
+    )
+    return True
+
+
+def source_cache(src_folder, dst_folder):
+    """SignatureCache folder sumber one-way sync yang disimpan di folder tujuan"""
+    return SignatureCache(
+        src_folder, _state_name(ONEWAY_SIGCACHE_PREFIX, src_folder), store=dst_folder
+    )
+
+
+def _state_name(prefix, other_folder):
+    """Nama file state sync, unik per pasangan folder"""
+    key = os.path.abspath(other_folder).encode("utf-8", "surrogateescape")
+    return f"{prefix}{hashlib.blake2b(key, digest_size=8).hexdigest()}.db"
+
+
+def _side_changes(current, base):
+    """
+    Bandingkan hasil scan satu sisi dengan state terakhir (tanpa I/O)
+
+    Returns:
+        Dictionary {relpath: 'created' | 'modified' | 'deleted'}
+    """
+    changes = {}
+    for rel_path, entry in current.items():
+        old = base.get(rel_path)
+        if old is None:
+            changes[rel_path] = "created"
+        elif old[:3] != (entry.size, entry.mtime_ns, entry.inode):
+            changes[rel_path] = "modified"
+
+    for rel_path in base:
+        if rel_path not in current:
+            changes[rel_path] = "deleted"
+
+    return changes
+
+
+def _match_moves(vanished, created):
+    """
+    Pasangkan file yang hilang dengan file baru berdasarkan (ukuran, mtime, inode)
+
+    Rename tidak mengubah mtime, jadi inode yang dipakai ulang oleh file lain
+    (hapus lalu buat file baru) tidak ikut dianggap pindah.
+
+    Args:
+        vanished: Dictionary {relpath lama: (size, mtime_ns, inode)}
+        created: Dictionary {relpath baru: FileEntry}
+
+    Returns:
+        Dictionary {relpath lama: relpath baru}
+    """
+    by_key = {
+        (entry.size, entry.mtime_ns, entry.inode): rel_path
+        for rel_path, entry in created.items()
+    }
+    moves = {}
+    for old_path, key in vanished.items():
+        new_path = by_key.pop(key, None)
+        if new_path:
+            moves[old_path] = new_path
+    return moves
+
+
+def _sync_two_way(
+    folder1,
+    folder2,
+    stats,
+    cache1,
+    cache2,
+    delta_min_size=None,
+    filters=None,
+    events=NULL_EVENTS,
+    dry_run=False,
+):
+    """
+    Sinkronisasi dua arah berbasis state terakhir (diff tiga arah)
+
+    Setiap folder di-scan sekali lalu dibandingkan dengan state sync terakhir
+    yang disimpan di masing-masing folder. Hanya file yang berubah yang
+    diproses: create/update/delete/rename diteruskan ke sisi lain, dan file
+    yang berubah di kedua sisi dengan isi berbeda dilaporkan sebagai konflik
+    tanpa disentuh.
+
+    Args:
+        folder1: Folder pertama
+        folder2: Folder kedua
+        stats: Dictionary untuk menyimpan statistik
+        cache1: SignatureCache folder1
+        cache2: SignatureCache folder2
+        delta_min_size: Ukuran minimum (byte) untuk update via delta transfer
+        filters: FileFilter (opsional); file yang masih ada tapi tidak lolos
+                 filter dianggap di luar cakupan, bukan dihapus
+        events: EventEmitter untuk event per file
+        dry_run: Jika True, aksi dan konflik hanya dilaporkan; file dan state
+                 tidak diubah
+    """
+    sides = {
+        1: {"folder": folder1, "cache": cache1, "state": _state_name(TWOWAY_STATE_PREFIX, folder2)},
+        2: {"folder": folder2, "cache": cache2, "state": _state_name(TWOWAY_STATE_PREFIX, folder1)},
+    }
+
+    for side in sides.values():
+        side["base"] = load_manifest(side["folder"], side["state"]) or {}
+        unreadable = []
+
+        def on_scan_error(path, error, folder=side["folder"], unreadable=unreadable):
+            _warn_scan_error(path, error)
+            unreadable.append(os.path.relpath(path, folder))
+
+        side["files"] = {
+            entry.relpath: entry
+            for entry in events.timed_iter(
+                PHASE_SCAN,
+                scan_tree(side["folder"], onerror=on_scan_error, filters=filters),
+            )
+        }
+        # File di folder yang gagal dibaca belum tentu dihapus: jangan diteruskan
+        # ke sisi lain, state lamanya disimpan lagi apa adanya
+        side["unscanned"] = {
+            rel_path: old
+            for rel_path, old in side["base"].items()
+            if rel_path not in side["files"] and _is_under(rel_path, unreadable)
+        }
+        for rel_path in side["unscanned"]:
+            del side["base"][rel_path]
+        if filters:
+            # File yang masih ada tapi keluar dari filter (misal ukurannya berubah)
+            # bukan penghapusan: keluarkan dari state agar tidak ikut dihapus
+            side["base"] = {
+                rel_path: old
+                for rel_path, old in side["base"].items()
+                if rel_path in side["files"]
+                or not os.path.lexists(os.path.join(side["folder"], rel_path))
+            }
+        start = time.perf_counter()
+        side["changes"] = _side_changes(side["files"], side["base"])
+        events.phase(PHASE_COMPARE, start, side["folder"])
+
+    conflicts = {}
+
+    def refresh(side, rel_path):
+        st = os.stat(os.path.join(side["folder"], rel_path))
+        side["files"][rel_path] = FileEntry(
+            rel_path,
+            st.st_size,
+            st.st_mtime_ns,
+            st.st_mode,
+            st.st_ino,
+            st.st_atime_ns,
+        )
+
+    # 1. Rename/pindah: file lama hilang & file baru dengan inode yang sama muncul
+    for num, other_num in ((1, 2), (2, 1)):
+        side, other = sides[num], sides[other_num]
+        changes = side["changes"]
+        vanished = {
+            rel_path: side["base"][rel_path][:3]
+            for rel_path, change in changes.items()
+            if change == "deleted"
+        }
+        created = {
+            rel_path: side["files"][rel_path]
+            for rel_path, change in changes.items()
+            if change == "created"
+        }
+
+        for old_path, new_path in _match_moves(vanished, created).items():
+            # Hanya diteruskan jika file lama di sisi lain belum disentuh
+            if (
+                old_path not in other["files"]
+                or old_path in other["changes"]
+                or new_path in other["files"]
+            ):
+                continue
+            try:
+                # Isi harus sama dengan file lama di sisi lain; jika tidak, biarkan
+                # jadi hapus + copy biasa di langkah 2
+                entry = side["files"][new_path]
+                old_entry = other["files"][old_path]
+                if entry.size != old_entry.size or side["cache"].digest(
+                    new_path, entry.size, entry.mtime_ns, entry.inode
+                ) != other["cache"].digest(
+                    old_path, old_entry.size, old_entry.mtime_ns, old_entry.inode
+                ):
+                    continue
+                if not dry_run:
+                    new_file = os.path.join(other["folder"], new_path)
+                    ensure_folder(os.path.dirname(new_file))
+                    os.rename(os.path.join(other["folder"], old_path), new_file)
+                other["files"][new_path] = other["files"].pop(old_path)._replace(
+                    relpath=new_path
+                )
+                other["cache"].forget(old_path)
+                del changes[old_path], changes[new_path]
+                stats[f"renamed_in_{other_num}"] += 1
+                verb = "📝 Akan dipindah" if dry_run else "🔀 Pindah"
+                events.emit(FILE_MOVED, new_path, message=f"  {verb}: {old_path} → {new_path}")
+            except OSError as e:
+                events.emit(
+                    ERROR, old_path, message=f"  ⚠️  Gagal memindah {old_path}: {str(e)}"
+                )
+
+    # 2. Terapkan perubahan per file
+    changed_paths = set(sides[1]["changes"]) | set(sides[2]["changes"])
+    for rel_path in sorted(changed_paths):
+        change1 = sides[1]["changes"].get(rel_path)
+        change2 = sides[2]["changes"].get(rel_path)
+        file = os.path.basename(rel_path)
+
+        try:
+            if change1 and change2:
+                if change1 == "deleted" and change2 == "deleted":
+                    continue
+                if "deleted" in (change1, change2):
+                    conflicts[rel_path] = "dihapus di satu sisi, diubah di sisi lain"
+                    continue
+
+                entry1 = sides[1]["files"][rel_path]
+                entry2 = sides[2]["files"][rel_path]
+                if entry1.size == entry2.size and cache1.digest(
+                    rel_path, entry1.size, entry1.mtime_ns, entry1.inode
+                ) == cache2.digest(rel_path, entry2.size, entry2.mtime_ns, entry2.inode):
+                    stats["identical"] += 1
+                else:
+                    conflicts[rel_path] = "diubah di kedua sisi"
+                continue
+
+            src_num, change = (1, change1) if change1 else (2, change2)
+            dst_num = 3 - src_num
+            src, dst = sides[src_num], sides[dst_num]
+            src_file = os.path.join(src["folder"], rel_path)
+            dst_file = os.path.join(dst["folder"], rel_path)
+
+            start = time.perf_counter()
+            if change == "deleted" and dry_run:
+                if rel_path in dst["files"]:
+                    stats[f"deleted_in_{dst_num}"] += 1
+                    events.emit(
+                        FILE_DELETED, rel_path, message=f"  📝 Akan dihapus: {dst_file}"
+                    )
+                continue
+            if change == "deleted":
+                if rel_path in dst["files"]:
+                    os.remove(dst_file)
+                    del dst["files"][rel_path]
+                    dst["cache"].forget(rel_path)
+                    stats[f"deleted_in_{dst_num}"] += 1
+                    events.emit(
+                        FILE_DELETED,
+                        rel_path,
+                        message=f"  🗑️  Hapus: {file}",
+                        seconds=time.perf_counter() - start,
+                    )
+                continue
+
+            existed = rel_path in dst["files"]
+            if not existed and os.path.lexists(dst_file):
+                # Ada di sisi lain tapi tidak ikut scan (di luar filter/gagal dibaca)
+                conflicts[rel_path] = "file di sisi lain tidak ikut sync"
+                continue
+            if dry_run:
+                size = src["files"][rel_path].size
+                if existed:
+                    stats[f"updated_in_{dst_num}"] += 1
+                    events.emit(FILE_UPDATED, rel_path, size, f"  📝 Akan diperbarui: {dst_file}")
+                else:
+                    stats[f"copied_to_{dst_num}"] += 1
+                    events.emit(FILE_COPIED, rel_path, size, f"  📝 Akan dicopy: {dst_file}")
+                continue
+            ensure_folder(os.path.dirname(dst_file) or dst["folder"])
+            copy_with_delta(
+                src_file, dst_file, src["files"][rel_path].size, delta_min_size
+            )
+            refresh(dst, rel_path)
+
+            size = src["files"][rel_path].size
+            seconds = time.perf_counter() - start
+            if existed:
+                stats[f"updated_in_{dst_num}"] += 1
+                events.emit(FILE_UPDATED, rel_path, size, f"  🔄 Update: {file}", seconds=seconds)
+            else:
+                stats[f"copied_to_{dst_num}"] += 1
+                events.emit(FILE_COPIED, rel_path, size, f"  ➕ Baru: {file}", seconds=seconds)
+
+        except PermissionError:
+            events.emit(ERROR, rel_path, message=f"  ⚠️  Akses ditolak: {file}")
+            conflicts[rel_path] = "akses ditolak"
+        except Exception as e:
+            events.emit(ERROR, rel_path, message=f"  ⚠️  Gagal sync {file}: {str(e)}")
+            conflicts[rel_path] = str(e)
+
+    stats["identical"] += sum(
+        1 for rel_path in sides[1]["files"] if rel_path not in changed_paths
+    )
+    stats["conflicts"] = len(conflicts)
+
+    if conflicts:
+        print_warning(f"\n⚔️  {len(conflicts)} konflik (tidak diubah, selesaikan manual):")
+        for rel_path, reason in sorted(conflicts.items())[:10]:
+            print(f"     • {rel_path}: {reason}")
+        if len(conflicts) > 10:
+            print(f"     ... dan {len(conflicts) - 10} lainnya")
+
+    if dry_run:
+        return
+
+    # 3. Simpan state baru; path yang konflik tetap memakai state lama
+    for side in sides.values():
+        state = {
+            rel_path: (entry.size, entry.mtime_ns, entry.inode, None)
+            for rel_path, entry in side["files"].items()
+            if rel_path not in conflicts
+        }
+        for rel_path in conflicts:
+            if rel_path in side["base"]:
+                state[rel_path] = side["base"][rel_path]
+        for rel_path, old in side["unscanned"].items():
+            state.setdefault(rel_path, old)
+        save_manifest(side["folder"], state, side["state"])
+
+
+def _warn_scan_error(path, error):
+    print_warning(f"  ⚠️  Gagal membaca {os.path.basename(path)}: {str(error)}")
+
 
-            except PermissionError:
-                print_warning(f"  ⚠️  Akses ditolak: {file}")
-            except Exception as e:
-                print_warning(f"  ⚠️  Gagal sync {file}: {str(e)}")
+def _is_under(rel_path, folders):
+    """Cek apakah rel_path sama dengan atau berada di dalam salah satu folders"""
+    for folder in folders:
+        if folder == os.curdir or rel_path == folder or rel_path.startswith(folder + os.sep):
+            return True
+    return False
 
 
 def compare_folders(folder1, folder2):
@@ -4,16 +4,42 @@ Jalankan: python test_autofile.py
 """
 
 import os
+import re
+import json
+import asyncio
+import random
 import shutil
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
 # Import modules
 from modules.backup import run_backup
 from modules.sync import run_sync
-from modules.cleaner import run_clean
-from modules.renamer import run_rename_with_pattern, run_rename_custom_name
+from modules import cleaner, renamer
+from modules.cleaner import run_clean, run_clean_quota
+from modules.renamer import (
+    run_rename_with_pattern,
+    run_rename_custom_name,
+    run_rename_template,
+    run_undo_rename,
+)
+from utils.rename_engine import plan_renames, execute_plan, recover, load_history, JOURNAL_NAME
+from modules.jobs import load_jobs, run_jobs
+from modules.pipeline import async_backup, async_sync, async_clean
+from utils.template import compile_template
+from utils.metadata import MetadataCache, META_CACHE_NAME
+from utils.events import EventEmitter, JsonLinesSink
+from utils.metrics import MetricsSink
+from utils.confirm import ASSUME_YES, DRY_RUN
+from utils import delta
+from utils.delta import delta_copy
+from utils.walker import scan_tree
+from utils.manifest import is_internal, load_manifest
+from modules.dedup import restore_snapshot, STORE_NAME
+from modules.retention import plan_retention, run_retention, list_snapshots, _snapshot_sizes
 from utils.utils import print_header, print_success, print_info, print_warning, Colors
 
 # Folder untuk testing
@@ -244,6 +270,1017 @@ def test_rename():
     print_info("\n✅ Test Rename selesai!\n")
 
 
+def _create_files(folder, files):
+    """Buat file-file test {relpath: isi} di dalam folder"""
+    for rel_path, content in files.items():
+        filepath = os.path.join(folder, rel_path)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "w") as f:
+            f.write(content)
+
+
+def test_backup_parallel():
+    """Test backup dengan worker paralel dan verifikasi checksum"""
+    print_header("🧪 TEST 5: Backup Paralel")
+
+    src = os.path.join(TEST_DIR, "parallel_src")
+    dst = os.path.join(TEST_DIR, "parallel_dst")
+    shutil.rmtree(src, ignore_errors=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    _create_files(src, {f"dir{i % 5}/file{i}.txt": f"isi {i}" for i in range(50)})
+
+    assert run_backup(src, dst, workers=4, verify=True)
+    for i in range(50):
+        assert os.path.exists(os.path.join(dst, f"dir{i % 5}", f"file{i}.txt"))
+
+    print(f"\n{Colors.BOLD_CYAN}Test 5.2: Incremental dengan Manifest{Colors.RESET}")
+    assert os.path.exists(os.path.join(dst, ".autofile_manifest.db"))
+    changed = os.path.join(src, "dir0", "file0.txt")
+    with open(changed, "w") as f:
+        f.write("isi baru yang lebih panjang")
+
+    assert run_backup(src, dst, incremental=True, workers=4)
+    with open(os.path.join(dst, "dir0", "file0.txt")) as f:
+        assert f.read() == "isi baru yang lebih panjang"
+
+    print_info("\n✅ Test Backup Paralel selesai!\n")
+
+
+def test_sync_twoway_state():
+    """Test two-way sync: hapus & konflik diteruskan berdasarkan state terakhir"""
+    print_header("🧪 TEST 6: Two-Way Sync dengan State")
+
+    folder1 = os.path.join(TEST_DIR, "twoway1")
+    folder2 = os.path.join(TEST_DIR, "twoway2")
+    shutil.rmtree(folder1, ignore_errors=True)
+    shutil.rmtree(folder2, ignore_errors=True)
+    _create_files(folder1, {"a.txt": "A", "sub/b.txt": "B"})
+    _create_files(folder2, {"c.txt": "C"})
+
+    assert run_sync(folder1, folder2, twoway=True)
+    assert os.path.exists(os.path.join(folder2, "sub", "b.txt"))
+    assert os.path.exists(os.path.join(folder1, "c.txt"))
+
+    print(f"\n{Colors.BOLD_CYAN}Test 6.2: Hapus & Konflik{Colors.RESET}")
+    os.remove(os.path.join(folder1, "a.txt"))
+    _create_files(folder1, {"c.txt": "versi folder 1"})
+    _create_files(folder2, {"c.txt": "versi folder 2 berbeda"})
+
+    assert run_sync(folder1, folder2, twoway=True)
+    assert not os.path.exists(os.path.join(folder2, "a.txt"))
+    with open(os.path.join(folder2, "c.txt")) as f:
+        assert f.read() == "versi folder 2 berbeda"
+
+    print_info("\n✅ Test Two-Way Sync selesai!\n")
+
+
+def test_backup_filters():
+    """Test filter: folder yang dikecualikan tidak ikut dibackup"""
+    print_header("🧪 TEST 7: Backup dengan Filter")
+
+    src = os.path.join(TEST_DIR, "filter_src")
+    dst = os.path.join(TEST_DIR, "filter_dst")
+    shutil.rmtree(src, ignore_errors=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    _create_files(
+        src,
+        {
+            "main.py": "print()",
+            "besar.bin": "x" * 5000,
+            "node_modules/lib/index.js": "js",
+            "app/.git/HEAD": "ref",
+        },
+    )
+
+    assert run_backup(src, dst, filters="-node_modules -.git size:..4K")
+    assert os.path.exists(os.path.join(dst, "main.py"))
+    assert not os.path.exists(os.path.join(dst, "besar.bin"))
+    assert not os.path.exists(os.path.join(dst, "node_modules"))
+    assert not os.path.exists(os.path.join(dst, "app", ".git"))
+
+    print_info("\n✅ Test Backup dengan Filter selesai!\n")
+
+
+def test_rename_template():
+    """Test template rename: field metadata dan cache hash per inode"""
+    print_header("🧪 TEST 8: Template Rename")
+
+    folder = os.path.join(TEST_DIR, "template")
+    shutil.rmtree(folder, ignore_errors=True)
+    _create_files(folder, {"foto.jpg": "abc", "catatan.txt": "hello"})
+
+    tmpl = compile_template("{name}_{size}_{sha1:8}_{counter:03}")
+    cache = MetadataCache(folder)
+    assert tmpl.render(folder, "foto.jpg", 7, cache) == "foto_3_a9993e36_007.jpg"
+    assert cache.computed == 1
+    cache.save()
+
+    # Setelah rename, hash diambil dari cache (inode sama)
+    os.rename(os.path.join(folder, "foto.jpg"), os.path.join(folder, "baru.jpg"))
+    cache = MetadataCache(folder)
+    assert tmpl.render(folder, "baru.jpg", 1, cache) == "baru_3_a9993e36_001.jpg"
+    assert cache.computed == 0
+
+    print(f"\n{Colors.BOLD_CYAN}Test 8.2: Dry-Run Tidak Menulis Cache{Colors.RESET}")
+    folder = os.path.join(TEST_DIR, "template_dry_run")
+    shutil.rmtree(folder, ignore_errors=True)
+    _create_files(folder, {"foto.jpg": "abc"})
+    assert run_rename_template(folder, "{sha1:8}", confirm=DRY_RUN)
+    assert os.listdir(folder) == ["foto.jpg"]
+    assert run_rename_template(folder, "{sha1:8}", confirm=ASSUME_YES)
+    assert "a9993e36.jpg" in os.listdir(folder)
+    assert META_CACHE_NAME in os.listdir(folder)
+
+    for bad in ("{bogus}", "{sha1:x}", "{name!r}"):
+        try:
+            compile_template(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"Template '{bad}' seharusnya ditolak")
+
+    print_info("\n✅ Test Template Rename selesai!\n")
+
+
+def test_jobs():
+    """Test file job: dependensi dijalankan berurutan, job gagal melewati turunannya"""
+    print_header("🧪 TEST 9: File Job")
+
+    folder = os.path.join(TEST_DIR, "jobs")
+    shutil.rmtree(folder, ignore_errors=True)
+    _create_files(folder, {"src/data.txt": "data"})
+    path = lambda name: os.path.join(folder, name)
+    job_file = path("jobs.json")
+    with open(job_file, "w") as f:
+        json.dump(
+            {
+                "defaults": {"incremental": True},
+                "jobs": [
+                    {"name": "sync", "type": "sync", "after": "backup", "folder1": path("backup"), "folder2": path("mirror")},
+                    {"name": "backup", "type": "backup", "src": path("src"), "dst": path("backup")},
+                    {"name": "rusak", "type": "sync", "folder1": path("tidak_ada"), "folder2": path("x")},
+                    {"name": "setelah_rusak", "type": "retention", "folder": folder, "after": ["rusak"]},
+                ],
+            },
+            f,
+        )
+
+    jobs = load_jobs(job_file)
+    names = [job.name for job in jobs]
+    assert names.index("backup") < names.index("sync")
+    status = {result["name"]: result["status"] for result in run_jobs(jobs, max_jobs=4)}
+    assert status == {"sync": "ok", "backup": "ok", "rusak": "gagal", "setelah_rusak": "dilewati"}
+    assert os.path.exists(os.path.join(path("mirror"), "data.txt"))
+
+    # Batas paralel < 1 ditolak di awal, bukan macet/crash di tengah jalan
+    for limits in ({"max_jobs": 0}, {"per_device": 0}):
+        try:
+            run_jobs(jobs, **limits)
+            assert False, f"{limits} seharusnya ditolak"
+        except ValueError:
+            pass
+
+    print_info("\n✅ Test File Job selesai!\n")
+
+
+def test_backup_events():
+    """Test event stream: backup tanpa output per file, semua event tercatat di JSON-lines"""
+    print_header("🧪 TEST 10: Event Stream Backup")
+
+    folder = os.path.join(TEST_DIR, "events")
+    shutil.rmtree(folder, ignore_errors=True)
+    _create_files(folder, {"src/a.txt": "a", "src/sub/b.txt": "bb"})
+    log_file = os.path.join(folder, "events.jsonl")
+
+    for _ in range(2):
+        events = EventEmitter([JsonLinesSink(log_file)])
+        assert run_backup(
+            os.path.join(folder, "src"),
+            os.path.join(folder, "dst"),
+            incremental=True,
+            events=events,
+        )
+        events.close()
+
+    with open(log_file, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    copied = sorted(r["path"] for r in records if r["type"] == "file_copied")
+    skipped = sorted(r["path"] for r in records if r["type"] == "file_skipped")
+    assert copied == ["a.txt", os.path.join("sub", "b.txt")]
+    assert skipped == copied
+
+    print(f"\n{Colors.BOLD_CYAN}Test 10.2: Event Stream Backup Dedup{Colors.RESET}")
+    dedup_log = os.path.join(folder, "dedup.jsonl")
+    for _ in range(2):
+        events = EventEmitter([JsonLinesSink(dedup_log)])
+        assert run_backup(
+            os.path.join(folder, "src"),
+            os.path.join(folder, "dedup"),
+            dedup=True,
+            events=events,
+        )
+        events.close()
+
+    with open(dedup_log, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(r["path"] for r in records if r["type"] == "file_copied") == copied
+    assert sorted(r["path"] for r in records if r["type"] == "file_skipped") == copied
+
+    print_info("\n✅ Test Event Stream selesai!\n")
+
+
+def test_clean_metrics():
+    """Test metrik: clean mencatat fase scan & delete dalam format Prometheus"""
+    print_header("🧪 TEST 11: Metrik Clean")
+
+    folder = os.path.join(TEST_DIR, "metrics")
+    shutil.rmtree(folder, ignore_errors=True)
+    _create_files(folder, {"data/a.log": "a", "data/b.log": "bb", "data/c.txt": "c"})
+    prom_file = os.path.join(folder, "clean.prom")
+
+    metrics = MetricsSink(prom_file, labels={"command": "clean"})
+    events = EventEmitter([metrics])
+    assert run_clean(
+        os.path.join(folder, "data"), 0, ext=".log", confirm=ASSUME_YES, events=events
+    )
+    events.close()
+
+    with open(prom_file, encoding="utf-8") as f:
+        text = f.read()
+    assert 'autofile_files_total{command="clean",event="file_deleted"} 2' in text
+    assert 'autofile_bytes_total{command="clean",event="file_deleted"} 3' in text
+    assert 'autofile_phase_seconds_count{command="clean",phase="scan"} 2' in text
+    assert 'autofile_phase_seconds_count{command="clean",phase="delete"} 2' in text
+    assert 'autofile_phase_seconds_bucket{command="clean",phase="delete",le="+Inf"} 2' in text
+
+    print(f"\n{Colors.BOLD_CYAN}Test 11.2: Metrik Backup Dedup{Colors.RESET}")
+    prom_file = os.path.join(folder, "backup.prom")
+    metrics = MetricsSink(prom_file, labels={"command": "backup"})
+    events = EventEmitter([metrics])
+    assert run_backup(
+        os.path.join(folder, "data"), os.path.join(folder, "dedup"), dedup=True, events=events
+    )
+    events.close()
+
+    with open(prom_file, encoding="utf-8") as f:
+        text = f.read()
+    # Tersisa c.txt setelah clean di atas
+    assert 'autofile_files_total{command="backup",event="file_copied"} 1' in text
+    assert 'autofile_bytes_total{command="backup",event="file_copied"} 1' in text
+    assert 'autofile_phase_seconds_count{command="backup",phase="scan"} 1' in text
+    assert 'autofile_phase_seconds_count{command="backup",phase="compare"} 1' in text
+    assert 'autofile_phase_seconds_count{command="backup",phase="copy"} 1' in text
+
+    print_info("\n✅ Test Metrik selesai!\n")
+
+
+def test_delta_copy():
+    """Test delta transfer: patch in place, data bergeser, dan fallback copy penuh"""
+    print_header("🧪 TEST 12: Delta Transfer")
+
+    folder = os.path.join(TEST_DIR, "delta")
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    src = os.path.join(folder, "baru.bin")
+    dst = os.path.join(folder, "lama.bin")
+    block = 1024
+    data = os.urandom(64 * block)
+
+    def write(path, content):
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def same():
+        with open(src, "rb") as a, open(dst, "rb") as b:
+            return a.read() == b.read()
+
+    # Satu blok di tengah berubah: hanya blok itu yang ditulis, file tidak diganti
+    write(dst, data)
+    changed = bytearray(data)
+    changed[10 * block : 11 * block] = os.urandom(block)
+    write(src, bytes(changed))
+    inode = os.stat(dst).st_ino
+    assert delta_copy(src, dst, block_size=block) == block
+    assert same() and os.stat(dst).st_ino == inode
+
+    print(f"\n{Colors.BOLD_CYAN}Test 12.2: Data Bergeser{Colors.RESET}")
+    write(dst, data)
+    write(src, b"sisipan di awal" + data)
+    assert delta_copy(src, dst, block_size=block) == len(b"sisipan di awal")
+    assert same()
+
+    print(f"\n{Colors.BOLD_CYAN}Test 12.3: Perubahan Besar di Tengah File{Colors.RESET}")
+    big = random.Random(12).randbytes(256 * block)
+    write(dst, big)
+    changed = bytearray(big)
+    changed[100 * block + 7 : 164 * block + 7] = os.urandom(64 * block)
+    write(src, bytes(changed))
+    written = delta_copy(src, dst, block_size=block)
+    assert 64 * block <= written <= 66 * block
+    assert same()
+
+    print(f"\n{Colors.BOLD_CYAN}Test 12.4: File Ditulis Ulang{Colors.RESET}")
+    # Hitung copy penuh lewat copy_file yang dipakai delta_copy
+    copies = []
+    copy_file = delta.copy_file
+
+    def counting_copy_file(*args, **kwargs):
+        copies.append(args)
+        return copy_file(*args, **kwargs)
+
+    delta.copy_file = counting_copy_file
+    try:
+        write(dst, data)
+        write(src, b"sisipan" + data[: 40 * block])
+        assert delta_copy(src, dst, block_size=block) == len(b"sisipan")
+        assert same() and not copies
+
+        write(dst, data)
+        write(src, os.urandom(len(data)))
+        assert delta_copy(src, dst, block_size=block) == len(data)
+        assert same() and len(copies) == 1
+    finally:
+        delta.copy_file = copy_file
+
+    print_info("\n✅ Test Delta Transfer selesai!\n")
+
+
+def _snapshot_tree(folder):
+    """Isi semua file di folder: {relpath: bytes}"""
+    tree = {}
+    for root, _, files in os.walk(folder):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                tree[os.path.relpath(path, folder)] = f.read()
+    return tree
+
+
+def test_sync_source_untouched():
+    """Test one-way sync: folder sumber tidak ditulisi sama sekali (termasuk cache)"""
+    print_header("🧪 TEST 13: One-Way Sync Tanpa Menulis Sumber")
+
+    src = os.path.join(TEST_DIR, "readonly_src")
+    dst = os.path.join(TEST_DIR, "readonly_dst")
+    shutil.rmtree(src, ignore_errors=True)
+    shutil.rmtree(dst, ignore_errors=True)
+    _create_files(src, {"a.txt": "AAAA", "sub/b.txt": "B"})
+    _create_files(dst, {"a.txt": "XXXX"})
+    os.utime(os.path.join(dst, "a.txt"), (0, 0))
+    before = _snapshot_tree(src)
+
+    assert run_sync(src, dst)
+    assert run_sync(src, dst)
+    assert _snapshot_tree(src) == before
+    assert _snapshot_tree(dst)["a.txt"] == b"AAAA"
+
+    print_info("\n✅ Test Sumber Tidak Berubah selesai!\n")
+
+
+def _dir_size(folder):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(folder)
+        for name in files
+    )
+
+
+def test_dedup_restore():
+    """Test backup dedup: snapshot unik, chunk tahan sisipan, restore identik"""
+    print_header("🧪 TEST 14: Dedup Store & Restore")
+
+    folder = os.path.join(TEST_DIR, "dedup")
+    shutil.rmtree(folder, ignore_errors=True)
+    src = os.path.join(folder, "data")
+    dst = os.path.join(folder, "backup")
+    _create_files(src, {"teks.txt": "halo", "sub/kosong.txt": ""})
+    big = random.Random(14).randbytes(8 * 1024 * 1024)
+    with open(os.path.join(src, "besar.bin"), "wb") as f:
+        f.write(big)
+
+    # Dua backup berturut-turut (detik yang sama) menghasilkan dua snapshot
+    assert run_backup(src, dst, dedup=True, chunking=True)
+    assert run_backup(src, dst, dedup=True, chunking=True)
+    snapshots = sorted(name for name in os.listdir(dst) if name.endswith(".snapshot"))
+    assert len(snapshots) == 2
+
+    # Sisipan di awal file besar: chunk sesudahnya dipakai ulang
+    store = os.path.join(dst, STORE_NAME)
+    before = _dir_size(store)
+    with open(os.path.join(src, "besar.bin"), "wb") as f:
+        f.write(b"sisipan" + big)
+    assert run_backup(src, dst, dedup=True, chunking=True)
+    assert _dir_size(store) - before < len(big) // 2
+
+    print(f"\n{Colors.BOLD_CYAN}Test 14.2: Restore{Colors.RESET}")
+    snapshots = sorted(name for name in os.listdir(dst) if name.endswith(".snapshot"))
+    for snapshot, expected in ((snapshots[0], big), (snapshots[-1], b"sisipan" + big)):
+        target = os.path.join(folder, "restore_" + snapshot)
+        assert restore_snapshot(os.path.join(dst, snapshot), target)
+        tree = _snapshot_tree(target)
+        assert tree["besar.bin"] == expected
+        assert tree["teks.txt"] == b"halo"
+        assert tree[os.path.join("sub", "kosong.txt")] == b""
+
+    print_info("\n✅ Test Dedup selesai!\n")
+
+
+def test_retention_plan():
+    """Test rencana retensi: keep_last, bucket harian/mingguan/bulanan, kuota ukuran"""
+    print_header("🧪 TEST 15: Rencana Retensi")
+
+    base = datetime(2025, 3, 31, 12, 0)
+    # Dua snapshot per hari selama 60 hari, terbaru dulu
+    snapshots = [
+        {"path": f"s{i}", "time": base - timedelta(hours=12 * i), "size": 10}
+        for i in range(120)
+    ]
+    kept = lambda plan: [s["path"] for s, keep, _ in plan if keep]
+
+    assert kept(plan_retention(snapshots, keep_last=3)) == ["s0", "s1", "s2"]
+    # Harian: snapshot terbaru dari 3 hari terakhir
+    assert kept(plan_retention(snapshots, daily=3)) == ["s0", "s2", "s4"]
+    # Mingguan: 2025-03-31 hari Senin, s2 (Minggu 30 Maret) masuk minggu sebelumnya
+    assert kept(plan_retention(snapshots, weekly=2)) == ["s0", "s2"]
+    # Bulanan: Maret, Februari (s62 = 28 Feb 12:00), Januari (s118 = 31 Jan 12:00)
+    assert kept(plan_retention(snapshots, monthly=3)) == ["s0", "s62", "s118"]
+    # Tanpa aturan: semua disimpan, kuota menghapus yang tertua
+    plan = plan_retention(snapshots, max_size=55)
+    assert kept(plan) == ["s0", "s1", "s2", "s3", "s4"]
+    assert plan[-1][2] == "melebihi kuota"
+
+    print_info("\n✅ Test Rencana Retensi selesai!\n")
+
+
+def test_retention_gc():
+    """Test GC store dedup: blob yatim dihapus, blob yang baru dipakai ulang aman"""
+    print_header("🧪 TEST 16: Retensi & GC Dedup")
+
+    folder = os.path.join(TEST_DIR, "retention_gc")
+    shutil.rmtree(folder, ignore_errors=True)
+    src = os.path.join(folder, "data")
+    dst = os.path.join(folder, "backup")
+    store = os.path.join(dst, STORE_NAME, "objects")
+    blobs = lambda: {name for _, _, files in os.walk(store) for name in files}
+
+    _create_files(src, {"tetap.txt": "tidak berubah", "ubah.txt": "versi 1"})
+    assert run_backup(src, dst, dedup=True)
+    first = blobs()
+    _create_files(src, {"ubah.txt": "versi 2"})
+    time.sleep(0.01)
+    assert run_backup(src, dst, dedup=True)
+    assert len(blobs()) == len(first) + 1
+
+    # Ukuran snapshot dedup = blob yang dipakai, bukan hanya file manifest
+    snapshots = list_snapshots(dst)
+    _snapshot_sizes(snapshots)
+    assert snapshots[0]["size"] > os.path.getsize(snapshots[0]["path"])
+
+    assert run_retention(dst, keep_last=1, confirm=ASSUME_YES)
+    assert len(list_snapshots(dst)) == 1
+    assert len(blobs()) == len(first)
+
+    print(f"\n{Colors.BOLD_CYAN}Test 16.2: Blob Dipakai Backup Berjalan{Colors.RESET}")
+    # Blob yang dipakai ulang di-touch, dan blob yatim yang lebih baru dari
+    # snapshot terakhir (milik backup yang sedang jalan) tidak dihapus
+    for root, _, files in os.walk(store):
+        for name in files:
+            os.utime(os.path.join(root, name), (0, 0))
+    _create_files(src, {"ubah.txt": "versi 3"})
+    time.sleep(0.01)
+    assert run_backup(src, dst, dedup=True)
+    mtimes = [
+        os.path.getmtime(os.path.join(root, name))
+        for root, _, files in os.walk(store)
+        for name in files
+    ]
+    assert sorted(mtimes)[0] == 0 and sum(1 for m in mtimes if m > 0) == 2
+    newest = max(s["path"] for s in list_snapshots(dst))
+    os.remove(newest)
+    assert run_retention(dst, keep_last=1, confirm=ASSUME_YES)
+    assert len(blobs()) == len(first) + 1
+
+    target = os.path.join(folder, "restore")
+    assert restore_snapshot(list_snapshots(dst)[0]["path"], target)
+    assert _snapshot_tree(target)["tetap.txt"] == b"tidak berubah"
+
+    print_info("\n✅ Test Retensi & GC selesai!\n")
+
+
+def test_dry_run_backup_sync():
+    """Test dry-run backup & sync: rencana ditampilkan, tidak ada file yang berubah"""
+    print_header("🧪 TEST 17: Dry-Run Backup & Sync")
+
+    folder = os.path.join(TEST_DIR, "dry_run")
+    shutil.rmtree(folder, ignore_errors=True)
+    folder1 = os.path.join(folder, "satu")
+    folder2 = os.path.join(folder, "dua")
+    _create_files(folder1, {"a.txt": "A", "sub/b.txt": "B"})
+    _create_files(folder2, {"c.txt": "C"})
+
+    assert run_backup(folder1, os.path.join(folder, "backup"), timestamp=True, dry_run=True)
+    assert run_backup(folder1, os.path.join(folder, "dedup"), dedup=True, dry_run=True)
+    assert run_sync(folder1, os.path.join(folder, "baru"), dry_run=True)
+    assert sorted(os.listdir(folder)) == ["dua", "satu"]
+
+    # Two-way: setelah sync pertama, hapus & ubah hanya dilaporkan
+    assert run_sync(folder1, folder2, twoway=True)
+    os.remove(os.path.join(folder1, "a.txt"))
+    _create_files(folder2, {"c.txt": "C versi baru"})
+    before = (_snapshot_tree(folder1), _snapshot_tree(folder2))
+    assert run_sync(folder1, folder2, twoway=True, dry_run=True)
+    assert (_snapshot_tree(folder1), _snapshot_tree(folder2)) == before
+
+    print_info("\n✅ Test Dry-Run selesai!\n")
+
+
+def test_rename_engine():
+    """Test rename engine: deteksi konflik, siklus dua fase, rollback & recovery"""
+    print_header("🧪 TEST 18: Rename Engine Transaksional")
+
+    folder = os.path.join(TEST_DIR, "rename_engine")
+    shutil.rmtree(folder, ignore_errors=True)
+    _create_files(folder, {"a.txt": "A", "b.txt": "B", "c.txt": "C", "x.txt": "X"})
+
+    plan = plan_renames(folder, [("a.txt", "x.txt"), ("b.txt", "y.txt"), ("c.txt", "y.txt")])
+    assert [(old, new) for old, new, _ in plan.conflicts] == [
+        ("a.txt", "x.txt"),
+        ("c.txt", "y.txt"),
+    ]
+    try:
+        execute_plan(folder, plan)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Plan dengan konflik seharusnya ditolak")
+
+    # Folder bernama sama dengan hasil rename juga konflik, tidak ada file yang berubah
+    os.makedirs(os.path.join(folder, "sub", "foto_1.txt"))
+    _create_files(folder, {"sub/a.txt": "A"})
+    assert not run_rename_custom_name(os.path.join(folder, "sub"), "foto", confirm=ASSUME_YES)
+    assert os.path.exists(os.path.join(folder, "sub", "a.txt"))
+
+    print(f"\n{Colors.BOLD_CYAN}Test 18.2: Siklus a→b, b→a{Colors.RESET}")
+    plan = plan_renames(folder, [("a.txt", "b.txt"), ("b.txt", "a.txt")])
+    assert not plan.conflicts and plan.two_phase
+    assert execute_plan(folder, plan, history=False)
+    tree = _snapshot_tree(folder)
+    assert tree["a.txt"] == b"B" and tree["b.txt"] == b"A"
+    assert JOURNAL_NAME not in os.listdir(folder)
+
+    print(f"\n{Colors.BOLD_CYAN}Test 18.3: Rollback Saat Rename Gagal{Colors.RESET}")
+    before = _snapshot_tree(folder)
+    plan = plan_renames(
+        folder,
+        [("a.txt", "b.txt"), ("b.txt", "a.txt"), ("hilang.txt", "d.txt")],
+        existing=os.listdir(folder) + ["hilang.txt"],
+    )
+    try:
+        execute_plan(folder, plan, history=False)
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("Rename file yang hilang seharusnya gagal")
+    assert _snapshot_tree(folder) == before
+    assert JOURNAL_NAME not in os.listdir(folder)
+
+    print(f"\n{Colors.BOLD_CYAN}Test 18.4: Recovery Setelah Proses Mati{Colors.RESET}")
+    # Proses mati di tengah fase 1: a.txt sudah di nama sementara, journal masih ada
+    with open(os.path.join(folder, JOURNAL_NAME), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "phase": "temp",
+                "renames": [
+                    ["a.txt", ".autofile_rn_test_0", "c.txt"],
+                    ["c.txt", ".autofile_rn_test_1", "a.txt"],
+                ],
+            },
+            f,
+        )
+    os.rename(os.path.join(folder, "a.txt"), os.path.join(folder, ".autofile_rn_test_0"))
+
+    # Dry-run hanya melaporkan journal, file tetap di nama sementara
+    interrupted = _snapshot_tree(folder)
+    assert run_rename_custom_name(folder, "foto", confirm=DRY_RUN)
+    assert _snapshot_tree(folder) == interrupted
+
+    assert recover(folder) == 2
+    assert _snapshot_tree(folder) == before
+    assert recover(folder) == 0
+
+    print_info("\n✅ Test Rename Engine selesai!\n")
+
+
+def test_rename_undo():
+    """Test undo rename: file yang diganti (inode berbeda) tidak ikut dikembalikan"""
+    print_header("🧪 TEST 19: Undo Rename")
+
+    folder = os.path.join(TEST_DIR, "rename_undo")
+    shutil.rmtree(folder, ignore_errors=True)
+    _create_files(folder, {"x.txt": "X", "y.txt": "Y", "z.txt": "Z"})
+
+    assert run_rename_custom_name(folder, "foto", confirm=ASSUME_YES)
+    assert len(load_history(folder)) == 1
+
+    # foto_2.txt diganti file lain: file baru dibuat dulu agar inode-nya pasti berbeda
+    _create_files(folder, {"pengganti.txt": "baru"})
+    os.replace(os.path.join(folder, "pengganti.txt"), os.path.join(folder, "foto_2.txt"))
+
+    assert run_undo_rename(folder, confirm=ASSUME_YES)
+    tree = _snapshot_tree(folder)
+    assert tree["x.txt"] == b"X" and tree["z.txt"] == b"Z"
+    assert tree["foto_2.txt"] == b"baru" and "y.txt" not in tree
+    assert load_history(folder) == []
+
+    print_info("\n✅ Test Undo Rename selesai!\n")
+
+
+def test_rename_recursive():
+    """Test rename recursive: penomoran per folder dan lanjut antar folder"""
+    print_header("🧪 TEST 20: Rename Recursive")
+
+    files = {"0.txt": "0", "a/1.txt": "1", "a/2.txt": "2", "b/3.txt": "3"}
+    expected = {
+        "dir": ["img_1.txt", "a/img_1.txt", "a/img_2.txt", "b/img_1.txt"],
+        "global": ["img_1.txt", "a/img_2.txt", "a/img_3.txt", "b/img_4.txt"],
+    }
+    for numbering, names in expected.items():
+        folder = os.path.join(TEST_DIR, f"rename_recursive_{numbering}")
+        shutil.rmtree(folder, ignore_errors=True)
+        _create_files(folder, files)
+
+        assert run_rename_custom_name(
+            folder,
+            "img",
+            recursive=True,
+            numbering=numbering,
+            workers=2,
+            confirm=ASSUME_YES,
+        )
+        tree = _snapshot_tree(folder)
+        renamed = {
+            rel: content
+            for rel, content in tree.items()
+            if not is_internal(os.path.basename(rel))
+        }
+        paths = [os.path.join(*name.split("/")) for name in names]
+        assert sorted(renamed) == sorted(paths)
+        assert [renamed[path] for path in paths] == [b"0", b"1", b"2", b"3"]
+
+    print_info("\n✅ Test Rename Recursive selesai!\n")
+
+
+def test_clean_quota():
+    """Test clean kuota: himpunan file terkecil sesuai urutan key yang memenuhi target"""
+    print_header("🧪 TEST 21: Clean Kuota")
+
+    folder = os.path.join(TEST_DIR, "quota")
+    kb = 1024
+    # Urut dari yang paling lama diubah
+    sizes = {"f0.bin": 400, "f1.bin": 200, "sub/f2.bin": 800, "f3.bin": 400, "sub/f4.bin": 40}
+
+    def prepare():
+        shutil.rmtree(folder, ignore_errors=True)
+        _create_files(folder, {rel: "x" * (size * kb) for rel, size in sizes.items()})
+        for i, rel in enumerate(sizes):
+            mtime = time.time() - (len(sizes) - i) * 86400
+            os.utime(os.path.join(folder, rel), (mtime, mtime))
+
+    def remaining():
+        return sorted(_snapshot_tree(folder))
+
+    def expect(*deleted):
+        return sorted(os.path.join(*rel.split("/")) for rel in sizes if rel not in deleted)
+
+    # 400 + 200 < 1000, jadi file ketiga tertua ikut dihapus
+    prepare()
+    assert run_clean_quota(folder, 1000 * kb, confirm=ASSUME_YES)
+    assert remaining() == expect("f0.bin", "f1.bin", "sub/f2.bin")
+
+    print(f"\n{Colors.BOLD_CYAN}Test 21.2: Urut Berdasarkan Ukuran{Colors.RESET}")
+    prepare()
+    assert run_clean_quota(folder, 800 * kb, key="size", confirm=ASSUME_YES)
+    assert remaining() == expect("sub/f2.bin")
+
+    print(f"\n{Colors.BOLD_CYAN}Test 21.3: Target Ruang Kosong (min_free){Colors.RESET}")
+    prepare()
+    free = shutil.disk_usage(folder).free
+    assert run_clean_quota(folder, free - kb, min_free=True, confirm=ASSUME_YES)
+    assert remaining() == expect()
+    assert run_clean_quota(folder, free + 500 * kb, min_free=True, confirm=ASSUME_YES)
+    assert remaining() == expect("f0.bin", "f1.bin")
+
+    print_info("\n✅ Test Clean Kuota selesai!\n")
+
+
+def test_clean_parallel():
+    """Test clean paralel: hanya file kedaluwarsa yang dihapus, spool ditutup"""
+    print_header("🧪 TEST 22: Clean Paralel")
+
+    folder = os.path.join(TEST_DIR, "clean_parallel")
+    shutil.rmtree(folder, ignore_errors=True)
+    files = {f"d{i % 7}/n{i % 3}/file{i}.log": str(i) for i in range(300)}
+    _create_files(folder, files)
+    old = time.time() - 10 * 86400
+    expired = set()
+    for i, rel in enumerate(files):
+        if i % 2:
+            os.utime(os.path.join(folder, rel), (old, old))
+            expired.add(os.path.join(*rel.split("/")))
+
+    # Catat spool yang dibuat cleaner untuk memastikan file sementara ditutup
+    spools = []
+    temporary_file = tempfile.TemporaryFile
+
+    def tracked_temporary_file(*args, **kwargs):
+        spool = temporary_file(*args, **kwargs)
+        spools.append(spool)
+        return spool
+
+    cleaner.tempfile.TemporaryFile = tracked_temporary_file
+    try:
+        assert run_clean(folder, 5, workers=4, confirm=ASSUME_YES)
+    finally:
+        cleaner.tempfile.TemporaryFile = temporary_file
+
+    remaining = set(_snapshot_tree(folder))
+    all_files = {os.path.join(*rel.split("/")) for rel in files}
+    assert remaining == all_files - expired
+    assert len(spools) == 1 and spools[0].closed
+
+    print_info("\n✅ Test Clean Paralel selesai!\n")
+
+
+def test_async_pipeline():
+    """Test pipeline asyncio: backup, sync, clean, dan backup yang dibatalkan"""
+    print_header("🧪 TEST 23: Pipeline Async")
+
+    folder = os.path.join(TEST_DIR, "async")
+    shutil.rmtree(folder, ignore_errors=True)
+    src = os.path.join(folder, "src")
+    files = {f"d{i % 4}/file{i}.txt": f"isi {i}" for i in range(40)}
+    _create_files(src, files)
+
+    result = asyncio.run(async_backup(src, os.path.join(folder, "backup"), incremental=True))
+    assert result["copied"] == 40 and result["failed"] == 0 and not result["errors"]
+    assert _snapshot_tree(src) == {
+        rel: content
+        for rel, content in _snapshot_tree(os.path.join(folder, "backup")).items()
+        if not is_internal(os.path.basename(rel))
+    }
+    result = asyncio.run(async_backup(src, os.path.join(folder, "backup"), incremental=True))
+    assert result["copied"] == 0 and result["skipped"] == 40
+
+    print(f"\n{Colors.BOLD_CYAN}Test 23.2: Async Sync{Colors.RESET}")
+    mirror = os.path.join(folder, "mirror")
+    result = asyncio.run(async_sync(src, mirror))
+    assert result["copied"] == 40
+    os.rename(os.path.join(src, "d0", "file0.txt"), os.path.join(src, "d0", "pindah.txt"))
+    result = asyncio.run(async_sync(src, mirror))
+    assert result["renamed"] == 1 and result["copied"] == 0
+    assert not os.path.exists(os.path.join(mirror, "d0", "file0.txt"))
+
+    print(f"\n{Colors.BOLD_CYAN}Test 23.3: Async Clean{Colors.RESET}")
+    old = time.time() - 10 * 86400
+    for i in range(1, 40, 2):
+        path = os.path.join(mirror, f"d{i % 4}", f"file{i}.txt")
+        os.utime(path, (old, old))
+    result = asyncio.run(async_clean(mirror, 5, ext=".txt", dry_run=True))
+    assert result["matched"] == 20 and result["deleted"] == 0
+    result = asyncio.run(async_clean(mirror, 5, ext=".txt"))
+    assert result["deleted"] == 20 and result["scanned"] == 40
+
+    print(f"\n{Colors.BOLD_CYAN}Test 23.4: Backup Dibatalkan di Tengah Jalan{Colors.RESET}")
+    big_src = os.path.join(folder, "big")
+    big_dst = os.path.join(folder, "big_backup")
+    total = 300
+    _create_files(big_src, {f"file{i:03}.bin": "x" * 65536 for i in range(total)})
+
+    async def cancel_midway(pool):
+        task = asyncio.ensure_future(
+            async_backup(big_src, big_dst, workers=1, queue_size=1, executor=pool)
+        )
+        while not os.path.isdir(big_dst) or len(os.listdir(big_dst)) < 5:
+            assert not task.done(), "Backup selesai sebelum sempat dibatalkan"
+            await asyncio.sleep(0.001)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return
+        raise AssertionError("Backup seharusnya dibatalkan")
+
+    # Executor sendiri: keluar dari with menunggu copy yang sedang jalan selesai
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        asyncio.run(cancel_midway(pool))
+
+    saved = load_manifest(big_dst)
+    assert 0 < len(saved) < total
+    result = asyncio.run(async_backup(big_src, big_dst, incremental=True))
+    assert result["skipped"] == len(saved)
+    assert result["copied"] == total - len(saved)
+
+    print_info("\n✅ Test Pipeline Async selesai!\n")
+
+
+def test_scan_tree():
+    """Test walker: filter include/exclude, file internal, dan kebijakan symlink"""
+    print_header("🧪 TEST 24: Walker scan_tree")
+
+    folder = os.path.join(TEST_DIR, "walker")
+    shutil.rmtree(folder, ignore_errors=True)
+    _create_files(
+        folder,
+        {
+            "a.txt": "a",
+            "b.log": "bb",
+            "node_modules/x.txt": "x",
+            "sub/c.txt": "ccc",
+            "sub/d.tmp": "d",
+            ".autofile_manifest.db": "",
+        },
+    )
+    os.symlink("a.txt", os.path.join(folder, "link.txt"))
+    os.symlink("sub", os.path.join(folder, "linkdir"))
+    os.symlink("tidak_ada.txt", os.path.join(folder, "rusak.txt"))
+
+    def scan(**kwargs):
+        errors = []
+        entries = scan_tree(folder, onerror=lambda path, e: errors.append(path), **kwargs)
+        paths = [entry.relpath.replace(os.sep, "/") for entry in entries]
+        return paths, [os.path.basename(path) for path in errors]
+
+    # Default: symlink file diikuti, symlink folder tidak, symlink rusak dilaporkan
+    paths, errors = scan()
+    assert sorted(paths) == [
+        "a.txt", "b.log", "link.txt", "node_modules/x.txt", "sub/c.txt", "sub/d.tmp"
+    ]
+    assert errors == ["rusak.txt"]
+    entry = next(e for e in scan_tree(folder) if e.relpath == os.path.join("sub", "c.txt"))
+    assert entry.size == 3 and entry.inode == os.stat(os.path.join(folder, "sub", "c.txt")).st_ino
+
+    paths, _ = scan(include=["*.txt"], exclude=["node_modules", "*.tmp"])
+    assert sorted(paths) == ["a.txt", "link.txt", "sub/c.txt"]
+
+    print(f"\n{Colors.BOLD_CYAN}Test 24.2: Kebijakan Symlink{Colors.RESET}")
+    paths, errors = scan(skip_symlinks=True)
+    assert "link.txt" not in paths and not errors
+    paths, _ = scan(follow_symlinks=True)
+    assert "linkdir/c.txt" in paths and "linkdir/d.tmp" in paths
+
+    print(f"\n{Colors.BOLD_CYAN}Test 24.3: Folder Bottom-Up{Colors.RESET}")
+    paths, _ = scan(dirs=True, topdown=False, exclude=["node_modules"])
+    assert paths.index("sub/c.txt") < paths.index("sub")
+    assert "node_modules" not in paths
+
+    print_info("\n✅ Test Walker selesai!\n")
+
+
+def test_backup_link_dest():
+    """Test snapshot link-dest: file yang tidak berubah di-hard-link dari snapshot sebelumnya"""
+    print_header("🧪 TEST 25: Snapshot Hard-Link")
+
+    folder = os.path.join(TEST_DIR, "link_dest")
+    shutil.rmtree(folder, ignore_errors=True)
+    src = os.path.join(folder, "data")
+    dst = os.path.join(folder, "snapshots")
+    _create_files(src, {"a.txt": "tetap", "sub/b.txt": "lama"})
+
+    assert run_backup(src, dst, timestamp=True, link_dest=True)
+    _create_files(src, {"sub/b.txt": "isi baru"})
+    assert run_backup(src, dst, timestamp=True, link_dest=True)
+
+    # Dua backup dalam detik yang sama tetap menghasilkan dua snapshot
+    first, second = sorted(
+        os.path.join(dst, name) for name in os.listdir(dst) if not is_internal(name)
+    )
+
+    def stat(snapshot, rel):
+        return os.stat(os.path.join(snapshot, rel))
+
+    assert stat(first, "a.txt").st_ino == stat(second, "a.txt").st_ino
+    assert stat(second, "a.txt").st_nlink == 2
+    b_path = os.path.join("sub", "b.txt")
+    assert stat(first, b_path).st_ino != stat(second, b_path).st_ino
+    assert _snapshot_tree(first)[b_path] == b"lama"
+    assert _snapshot_tree(second)[b_path] == b"isi baru"
+
+    print_info("\n✅ Test Snapshot Hard-Link selesai!\n")
+
+
+def test_sync_move_detection():
+    """Test one-way sync: file yang dipindah di sumber di-rename di tujuan, bukan dicopy ulang"""
+    print_header("🧪 TEST 26: Deteksi Pindah File di Sync")
+
+    folder = os.path.join(TEST_DIR, "sync_move")
+    shutil.rmtree(folder, ignore_errors=True)
+    src = os.path.join(folder, "src")
+    dst = os.path.join(folder, "dst")
+    _create_files(src, {"video.mp4": "x" * 100000, "catatan.txt": "halo"})
+
+    assert run_sync(src, dst)
+    inode = os.stat(os.path.join(dst, "video.mp4")).st_ino
+
+    os.makedirs(os.path.join(src, "arsip"))
+    os.rename(os.path.join(src, "video.mp4"), os.path.join(src, "arsip", "liburan.mp4"))
+    assert run_sync(src, dst)
+
+    moved = os.path.join(dst, "arsip", "liburan.mp4")
+    assert os.stat(moved).st_ino == inode
+    assert not os.path.exists(os.path.join(dst, "video.mp4"))
+    assert _snapshot_tree(dst)[os.path.join("arsip", "liburan.mp4")] == b"x" * 100000
+
+    print_info("\n✅ Test Deteksi Pindah selesai!\n")
+
+
+def test_remove_timestamp():
+    """Test registry timestamp: setiap format dikenali dan dihapus tepat dari nama file"""
+    print_header("🧪 TEST 27: Registry Timestamp")
+
+    # Contoh per format di TIMESTAMP_FORMATS: (nama file, hasil setelah timestamp dihapus)
+    examples = {
+        "whatsapp": [("IMG-20230115-WA0001.jpg", "IMG.jpg")],
+        "whatsapp_desktop": [
+            ("WhatsApp Image 2023-01-15 at 12.34.56 PM.jpeg", "WhatsApp Image.jpeg")
+        ],
+        "compact": [
+            ("PXL_20230115_123456789.jpg", "PXL.jpg"),
+            ("Screenshot_20230115-123456.png", "Screenshot.png"),
+        ],
+        "compact_short": [("IMG_20230115_1234.jpg", "IMG.jpg")],
+        "iso": [
+            ("Foto_2023-01-15T12:34:56Z.jpg", "Foto.jpg"),
+            ("Foto 2023-01-15 12.34.56.jpg", "Foto.jpg"),
+        ],
+        "exif": [("scan_2023:01:15 12:34:56.tif", "scan.tif")],
+        "epoch": [("log_1673786096.txt", "log.txt"), ("log_1673786096123.txt", "log.txt")],
+    }
+    # Format baru di registry harus ikut diberi contoh di sini
+    assert sorted(examples) == sorted(name for name, _ in renamer.TIMESTAMP_FORMATS)
+
+    for name, cases in examples.items():
+        for filename, expected in cases:
+            assert renamer.remove_timestamp(filename) == (expected, True), (name, filename)
+
+    assert renamer.remove_timestamp("invoice_12345.pdf") == ("invoice_12345.pdf", False)
+    assert renamer.remove_timestamp("20230115_123456.jpg") == ("foto.jpg", True)
+
+    print(f"\n{Colors.BOLD_CYAN}Test 27.2: Format Tambahan{Colors.RESET}")
+    saved = list(renamer.TIMESTAMP_FORMATS)
+    try:
+        renamer.register_timestamp_format("tanggal_indo", r"\d{2}-\d{2}-\d{4}")
+        assert renamer.remove_timestamp("Foto_15-01-2023.jpg") == ("Foto.jpg", True)
+        try:
+            renamer.register_timestamp_format("rusak", r"(\d{2}")
+        except re.error:
+            pass
+        else:
+            raise AssertionError("Regex tidak valid seharusnya ditolak")
+        assert [name for name, _ in renamer.TIMESTAMP_FORMATS][-1] == "tanggal_indo"
+    finally:
+        renamer.TIMESTAMP_FORMATS[:] = saved
+        renamer._compile_timestamp_formats()
+    assert renamer.remove_timestamp("Foto_15-01-2023.jpg") == ("Foto_15-01-2023.jpg", False)
+
+    print_info("\n✅ Test Registry Timestamp selesai!\n")
+
+
+def test_sync_twoway_unreadable():
+    """Test two-way sync: folder yang gagal di-scan tidak dianggap terhapus"""
+    print_header("🧪 TEST 28: Two-Way Sync dengan Folder Tidak Terbaca")
+
+    folder = os.path.join(TEST_DIR, "twoway_unreadable")
+    shutil.rmtree(folder, ignore_errors=True)
+    left = os.path.join(folder, "kiri")
+    right = os.path.join(folder, "kanan")
+    _create_files(left, {"a.txt": "A", "sub/x.txt": "X", "sub/y.txt": "Y"})
+    assert run_sync(left, right, twoway=True)
+    assert os.path.exists(os.path.join(right, "sub", "x.txt"))
+
+    # Gagal baca disimulasikan lewat scandir (chmod tidak berlaku untuk root)
+    scandir = os.scandir
+    unreadable = os.path.join(left, "sub")
+
+    def failing_scandir(path="."):
+        if os.fspath(path) == unreadable:
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    os.scandir = failing_scandir
+    try:
+        assert run_sync(left, right, twoway=True)
+    finally:
+        os.scandir = scandir
+    assert os.path.exists(os.path.join(right, "sub", "x.txt"))
+
+    # State lama tetap tersimpan: penghapusan sungguhan setelahnya tetap diteruskan
+    os.remove(os.path.join(left, "sub", "x.txt"))
+    assert run_sync(left, right, twoway=True)
+    assert not os.path.exists(os.path.join(right, "sub", "x.txt"))
+    assert os.path.exists(os.path.join(right, "sub", "y.txt"))
+
+    print_info("\n✅ Test Folder Tidak Terbaca selesai!\n")
+
+
 def cleanup_test_environment():
     """Hapus folder test"""
     print_header("🧹 Cleanup")
@@ -285,6 +1322,30 @@ def main():
         test_sync()
         test_clean()
         test_rename()
+        test_backup_parallel()
+        test_sync_twoway_state()
+        test_backup_filters()
+        test_rename_template()
+        test_jobs()
+        test_backup_events()
+        test_clean_metrics()
+        test_delta_copy()
+        test_sync_source_untouched()
+        test_dedup_restore()
+        test_retention_plan()
+        test_retention_gc()
+        test_dry_run_backup_sync()
+        test_rename_engine()
+        test_rename_undo()
+        test_rename_recursive()
+        test_clean_quota()
+        test_clean_parallel()
+        test_async_pipeline()
+        test_scan_tree()
+        test_backup_link_dest()
+        test_sync_move_detection()
+        test_remove_timestamp()
+        test_sync_twoway_unreadable()
 
         # Summary
         print_header("📊 Test Summary")
@@ -0,0 +1,40 @@
+from utils.utils import get_yes_no, print_info
+
+# Mode konfirmasi
+MODE_ASK = "ask"
+MODE_YES = "yes"
+MODE_DRY_RUN = "dry-run"
+
+
+class ConfirmPolicy:
+    """
+    Cara modul meminta konfirmasi sebelum mengubah/menghapus file
+
+    Dipanggil seperti get_yes_no: confirm(prompt, default) -> bool.
+      - ask     : tanya user lewat input (default, untuk menu interaktif)
+      - yes     : selalu lanjut tanpa bertanya (untuk cron / --yes)
+      - dry-run : tidak pernah lanjut, hanya tampilkan rencana (--dry-run)
+    """
+
+    def __init__(self, mode=MODE_ASK):
+        if mode not in (MODE_ASK, MODE_YES, MODE_DRY_RUN):
+            raise ValueError(f"Mode konfirmasi tidak dikenal: '{mode}'")
+        self.mode = mode
+
+    @property
+    def dry_run(self):
+        return self.mode == MODE_DRY_RUN
+
+    def __call__(self, prompt, default=None):
+        if self.mode == MODE_YES:
+            print_info(f"{prompt} → ya (--yes)")
+            return True
+        if self.mode == MODE_DRY_RUN:
+            print_info(f"🔎 Dry-run: {prompt} → tidak ada yang diubah")
+            return False
+        return get_yes_no(prompt, default=default)
+
+
+ASK = ConfirmPolicy(MODE_ASK)
+ASSUME_YES = ConfirmPolicy(MODE_YES)
+DRY_RUN = ConfirmPolicy(MODE_DRY_RUN)
@@ -0,0 +1,237 @@
+import os
+import shutil
+import zlib
+import hashlib
+import tempfile
+from utils.copier import copy_file
+
+DELTA_BLOCK_SIZE = 64 * 1024
+
+# Jika porsi data baru melebihi batas ini, delta dihentikan dan file dicopy penuh
+DELTA_MAX_LITERAL_RATIO = 0.5
+
+# Pencarian per byte (lambat, Python murni) paling jauh sekian blok tanpa
+# menemukan blok lama; setelah itu hanya blok sejajar yang dicek sampai cocok lagi
+DELTA_SEARCH_BLOCKS = 2
+
+_ADLER_MOD = 65521
+_READ_SIZE = 8 * 1024 * 1024
+
+
+def _strong(block):
+    return hashlib.blake2b(block, digest_size=16).digest()
+
+
+def block_signatures(path, block_size=DELTA_BLOCK_SIZE):
+    """
+    Hitung signature per blok dari file (checksum lemah adler32 + hash kuat)
+
+    Returns:
+        Dictionary {adler32: {strong_hash: index_blok}}
+    """
+    signatures = {}
+    with open(path, "rb") as f:
+        index = 0
+        for block in iter(lambda: f.read(block_size), b""):
+            signatures.setdefault(zlib.adler32(block), {}).setdefault(
+                _strong(block), index
+            )
+            index += 1
+    return signatures
+
+
+def _roll(checksum, out_byte, in_byte, block_size):
+    """Geser adler32 satu byte: buang out_byte, tambah in_byte"""
+    a = checksum & 0xFFFF
+    b = checksum >> 16
+    a = (a - out_byte + in_byte) % _ADLER_MOD
+    b = (b - block_size * out_byte + a - 1) % _ADLER_MOD
+    return (b << 16) | a
+
+
+def compute_delta(
+    src,
+    signatures,
+    block_size=DELTA_BLOCK_SIZE,
+    max_literal=None,
+    max_search=None,
+):
+    """
+    Bandingkan file sumber dengan signature file tujuan (algoritma rsync)
+
+    Blok sejajar dicek dulu dengan adler32 + hash kuat (kecepatan C). Hanya
+    di area yang berubah checksum digeser per byte untuk menemukan blok lama
+    yang bergeser karena sisipan/hapusan.
+
+    Args:
+        max_literal: Batas total data baru (byte)
+        max_search: Batas geser per byte dalam satu area data baru (byte).
+                    Geser per byte lambat, jadi setelah batas ini area berubah
+                    dilompati per blok, sejajar dengan blok cocok terakhir,
+                    sampai blok lama ditemukan lagi
+
+    Returns:
+        List operasi (src_offset, length, dst_index) dengan dst_index None
+        untuk data baru, atau None jika max_literal terlewati
+    """
+    ops = []
+    literal_start = None
+    literal_total = 0
+    phase = 0  # offset sumber blok lama terakhir yang cocok, modulo block_size
+    skipping = False
+
+    def flush_literal(end):
+        nonlocal literal_start, literal_total
+        if literal_start is not None and end > literal_start:
+            ops.append((literal_start, end - literal_start, None))
+            literal_total += end - literal_start
+        literal_start = None
+
+    with open(src, "rb") as f:
+        buf = f.read(_READ_SIZE)
+        base = 0  # offset file untuk buf[0]
+        pos = 0  # posisi di dalam buf
+        eof = len(buf) < _READ_SIZE
+        checksum = None
+
+        while True:
+            # Pastikan buffer berisi minimal satu blok penuh dari pos
+            if not eof and len(buf) - pos < block_size:
+                more = f.read(_READ_SIZE)
+                eof = len(more) < _READ_SIZE
+                buf = buf[pos:] + more
+                base += pos
+                pos = 0
+
+            remaining = len(buf) - pos
+            if remaining <= 0:
+                break
+
+            block = buf[pos : pos + block_size]
+            if checksum is None:
+                checksum = zlib.adler32(block)
+
+            match = signatures.get(checksum)
+            index = match.get(_strong(block)) if match else None
+
+            if index is not None:
+                flush_literal(base + pos)
+                ops.append((base + pos, len(block), index))
+                phase = (base + pos) % block_size
+                skipping = False
+                pos += len(block)
+                checksum = None
+                continue
+
+            if literal_start is None:
+                literal_start = base + pos
+            if skipping:
+                # Area berubah yang panjang: satu blok sekaligus jadi data baru
+                pos += len(block)
+                checksum = None
+            else:
+                # Tidak cocok: byte ini jadi data baru, geser checksum satu byte
+                if remaining > block_size:
+                    checksum = _roll(checksum, buf[pos], buf[pos + block_size], block_size)
+                else:
+                    checksum = None
+                pos += 1
+
+                if max_search is not None and base + pos - literal_start > max_search:
+                    # Lanjut dari posisi sejajar berikutnya (blok yang diubah di tempat
+                    # atau sisa data setelah sisipan sebelumnya)
+                    skipping = True
+                    pos = min(pos + (phase - base - pos) % block_size, len(buf))
+                    checksum = None
+
+            run = base + pos - literal_start
+            if max_literal is not None and literal_total + run > max_literal:
+                return None
+
+        flush_literal(base + pos)
+
+    return ops
+
+
+def delta_copy(src, dst, block_size=DELTA_BLOCK_SIZE):
+    """
+    Perbarui dst agar sama dengan src dengan hanya menulis bagian yang berubah
+
+    Jika semua blok lama tetap di posisinya, dst di-patch langsung (in place).
+    Jika ada blok yang bergeser, file baru disusun di file sementara dari blok
+    lama + data baru lalu di-rename atomik. Jika data baru lebih dari
+    DELTA_MAX_LITERAL_RATIO file atau dst belum ada, file dicopy penuh.
+
+    Returns:
+        Jumlah byte data baru yang ditulis
+    """
+    src_size = os.path.getsize(src)
+    if not os.path.isfile(dst):
+        copy_file(src, dst)
+        return src_size
+
+    signatures = block_signatures(dst, block_size)
+    ops = compute_delta(
+        src,
+        signatures,
+        block_size,
+        max_literal=src_size * DELTA_MAX_LITERAL_RATIO,
+        max_search=DELTA_SEARCH_BLOCKS * block_size,
+    )
+    if ops is None:
+        copy_file(src, dst)
+        return src_size
+
+    literal = sum(length for _, length, index in ops if index is None)
+    aligned = all(
+        index is None or offset == index * block_size for offset, _, index in ops
+    )
+
+    # Hard link dipakai bersama snapshot lain, jangan di-patch di tempat
+    if aligned and os.stat(dst).st_nlink == 1:
+        with open(src, "rb") as fsrc, open(dst, "r+b") as fdst:
+            for offset, length, index in ops:
+                if index is None:
+                    fsrc.seek(offset)
+                    fdst.seek(offset)
+                    fdst.write(fsrc.read(length))
+            fdst.truncate(src_size)
+    else:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(dst)), prefix=".autofile_delta_"
+        )
+        try:
+            with os.fdopen(fd, "wb") as out, open(src, "rb") as fsrc, open(
+                dst, "rb"
+            ) as fold:
+                for offset, length, index in ops:
+                    if index is None:
+                        fsrc.seek(offset)
+                        out.write(fsrc.read(length))
+                    else:
+                        fold.seek(index * block_size)
+                        out.write(fold.read(length))
+            os.replace(tmp_path, dst)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    shutil.copystat(src, dst)
+    return literal
+
+
+def copy_with_delta(src, dst, size, delta_min_size=None):
+    """
+    Copy file, memakai delta transfer jika dst sudah ada dan file cukup besar
+
+    Args:
+        src: File sumber
+        dst: File tujuan
+        size: Ukuran file sumber
+        delta_min_size: Ukuran minimum (byte) untuk delta; None = selalu copy penuh
+    """
+    if delta_min_size is not None and size >= delta_min_size and os.path.isfile(dst):
+        delta_copy(src, dst)
+    else:
+        copy_file(src, dst)
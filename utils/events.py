@@ -0,0 +1,245 @@
+import sys
+import json
+import time
+import threading
+from collections import namedtuple, Counter
+from utils.utils import print_warning
+
+# Tipe event
+FILE_COPIED = "file_copied"
+FILE_UPDATED = "file_updated"
+FILE_LINKED = "file_linked"
+FILE_MOVED = "file_moved"
+FILE_SKIPPED = "file_skipped"
+FILE_DELETED = "file_deleted"
+FILE_RENAMED = "file_renamed"
+ERROR = "error"
+PROGRESS = "progress"
+PHASE = "phase"
+
+# Nama fase untuk event PHASE (lama per file di setiap tahap)
+PHASE_SCAN = "scan"
+PHASE_COMPARE = "compare"
+PHASE_COPY = "copy"
+PHASE_DELETE = "delete"
+
+# Event yang berarti satu file selesai diproses (dihitung di progress)
+FILE_EVENTS = (
+    FILE_COPIED,
+    FILE_UPDATED,
+    FILE_LINKED,
+    FILE_MOVED,
+    FILE_SKIPPED,
+    FILE_DELETED,
+    FILE_RENAMED,
+)
+
+# message: teks untuk console (None = tidak dicetak di mode console)
+# done/total: posisi progress (event PROGRESS)
+# seconds: lama operasi (copy/hapus untuk event file, lama fase untuk PHASE)
+# phase: nama fase (event PHASE)
+Event = namedtuple(
+    "Event",
+    ["type", "path", "size", "message", "done", "total", "seconds", "phase"],
+    defaults=[None, 0, None, None, None, None, None],
+)
+
+
+class EventEmitter:
+    """
+    Meneruskan event dari modul ke beberapa sink
+
+    Aman dipanggil dari banyak thread (sink dipanggil satu per satu di bawah
+    lock). Tanpa sink, emit langsung kembali tanpa membuat Event, jadi biaya
+    di loop per file hampir nol. Event PHASE hanya dikirim jika ada sink
+    dengan atribut `timing = True` (misal MetricsSink).
+    """
+
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+        self.timing = any(getattr(sink, "timing", False) for sink in self.sinks)
+        self._lock = threading.Lock()
+
+    def emit(
+        self,
+        kind,
+        path=None,
+        size=0,
+        message=None,
+        done=None,
+        total=None,
+        seconds=None,
+        phase=None,
+    ):
+        """Kirim satu event (kind = salah satu tipe event di atas) ke semua sink"""
+        if not self.sinks:
+            return
+        event = Event(kind, path, size, message, done, total, seconds, phase)
+        with self._lock:
+            for sink in self.sinks:
+                sink.handle(event)
+
+    def phase(self, name, start, path=None):
+        """Kirim event PHASE: lama fase `name` sejak time.perf_counter() `start`"""
+        if self.timing:
+            self.emit(PHASE, path, seconds=time.perf_counter() - start, phase=name)
+
+    def timed_iter(self, name, iterable):
+        """Bungkus iterator (misal scan_tree) agar lama tiap item dicatat sebagai fase"""
+        if not self.timing:
+            return iterable
+        return self._timed_iter(name, iterable)
+
+    def _timed_iter(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.phase(name, start)
+            yield item
+
+    def close(self):
+        """Tutup semua sink (flush file, akhiri baris progress)"""
+        with self._lock:
+            for sink in self.sinks:
+                sink.close()
+
+
+class NullSink:
+    """Buang semua event"""
+
+    def handle(self, event):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink:
+    """Cetak event yang punya pesan, sama seperti output per file sebelumnya"""
+
+    def handle(self, event):
+        if event.message is None:
+            return
+        if event.type == ERROR:
+            print_warning(event.message)
+        else:
+            print(event.message)
+
+    def close(self):
+        pass
+
+
+class ProgressSink:
+    """
+    Satu baris progress yang diperbarui paling sering tiap `interval` detik
+
+    Di terminal (TTY) baris ditimpa dengan '\\r'; jika output bukan terminal
+    (misal log cron) progress ditulis sebagai baris baru tiap `log_interval`
+    detik. Error tetap dicetak di baris sendiri.
+    """
+
+    def __init__(self, stream=None, interval=0.2, log_interval=10.0):
+        self.stream = stream or sys.stderr
+        self.tty = self.stream.isatty()
+        self.interval = interval if self.tty else log_interval
+        self.counts = Counter()
+        self.bytes = 0
+        self.done = None
+        self.total = None
+        self.start = time.monotonic()
+        self.last = 0.0
+        self.width = 0
+
+    def handle(self, event):
+        if event.type == ERROR:
+            self.counts[ERROR] += 1
+            if event.message:
+                self._clear()
+                print_warning(event.message)
+        elif event.type == PROGRESS:
+            self.done, self.total = event.done, event.total
+        elif event.type == PHASE:
+            return
+        else:
+            self.counts[event.type] += 1
+            if event.type != FILE_SKIPPED:
+                self.bytes += event.size or 0
+
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.last = now
+            self._render(now)
+
+    def _line(self, now):
+        files = sum(self.counts[t] for t in FILE_EVENTS)
+        elapsed = max(now - self.start, 1e-9)
+        parts = [f"⏳ {files:,} file"]
+        if self.done is not None and self.total:
+            parts.append(f"{self.done:,}/{self.total:,}")
+        parts.append(f"{self.bytes / (1024 * 1024):,.1f} MB")
+        if self.counts[ERROR]:
+            parts.append(f"{self.counts[ERROR]} error")
+        parts.append(f"{files / elapsed:,.0f} file/s")
+        parts.append(f"{self.bytes / (1024 * 1024) / elapsed:,.1f} MB/s")
+        return " • ".join(parts)
+
+    def _render(self, now):
+        line = self._line(now)
+        if self.tty:
+            self.stream.write("\r" + line.ljust(self.width))
+            self.width = len(line)
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def _clear(self):
+        if self.tty and self.width:
+            self.stream.write("\r" + " " * self.width + "\r")
+            self.stream.flush()
+            self.width = 0
+            self.last = 0.0
+
+    def close(self):
+        self._render(time.monotonic())
+        if self.tty:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+class JsonLinesSink:
+    """Tulis setiap event sebagai satu baris JSON (dengan timestamp)"""
+
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8", buffering=1024 * 1024)
+
+    def handle(self, event):
+        record = {"time": time.time(), "type": event.type}
+        if event.path is not None:
+            record["path"] = event.path
+        if event.size:
+            record["size"] = event.size
+        if event.message is not None:
+            record["message"] = event.message.strip()
+        if event.done is not None:
+            record["done"] = event.done
+            record["total"] = event.total
+        if event.seconds is not None:
+            record["seconds"] = round(event.seconds, 6)
+        if event.phase is not None:
+            record["phase"] = event.phase
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def console_events():
+    """Emitter default modul: cetak pesan per file ke console"""
+    return EventEmitter([ConsoleSink()])
+
+
+NULL_EVENTS = EventEmitter()
@@ -0,0 +1,199 @@
+import re
+import time
+from utils.walker import compile_patterns
+
+# Satuan ukuran & umur yang dikenali di aturan size:/age:
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+AGE_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+RULE_KINDS = ("include", "exclude", "regex", "!regex", "ext", "size", "age")
+
+_NUMBER = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*$")
+
+
+def _parse_amount(text, units, label):
+    match = _NUMBER.match(text)
+    if not match:
+        raise ValueError(f"Nilai {label} tidak valid: '{text}'")
+    unit = match.group(2).lower()
+    if label == "size" and unit.endswith("b"):
+        unit = unit[:-1]
+    if unit not in units:
+        raise ValueError(f"Satuan {label} tidak dikenal: '{match.group(2)}'")
+    return int(float(match.group(1)) * units[unit])
+
+
+def parse_size(text):
+    """'500M' / '1.5G' / '4096' -> jumlah byte"""
+    return _parse_amount(text, SIZE_UNITS, "size")
+
+
+def _parse_range(text, units, label):
+    """'10M..1G' / '..7d' / '30d..' -> (min, max), None = tanpa batas"""
+    low, sep, high = text.partition("..")
+    if not sep:
+        raise ValueError(f"Rentang {label} harus berbentuk MIN..MAX: '{text}'")
+    return (
+        _parse_amount(low, units, label) if low.strip() else None,
+        _parse_amount(high, units, label) if high.strip() else None,
+    )
+
+
+def parse_rules(spec):
+    """
+    Pecah spesifikasi filter menjadi list aturan (jenis, nilai)
+
+    Args:
+        spec: String aturan dipisah spasi/baris baru, atau list aturan
+
+    Aturan yang dikenali:
+        include:GLOB   hanya file yang cocok (nama atau relpath)
+        exclude:GLOB   lewati file/folder yang cocok (folder tidak dimasuki)
+        regex:REGEX    hanya file yang relpath-nya cocok (pemisah '/')
+        !regex:REGEX   lewati file/folder yang relpath-nya cocok
+        ext:.log       hanya file dengan ekstensi ini (tanpa beda huruf besar/kecil)
+        size:MIN..MAX  rentang ukuran, misal 10M..1G, ..500K
+        age:MIN..MAX   rentang umur (dari mtime), misal 30d.., ..12h
+    Singkatan: +GLOB = include:GLOB, -GLOB = exclude:GLOB
+    """
+    if not spec:
+        return []
+    if isinstance(spec, FileFilter):
+        return list(spec.rules)
+    tokens = spec.split() if isinstance(spec, str) else spec
+
+    rules = []
+    for token in tokens:
+        if token.startswith("+"):
+            kind, value = "include", token[1:]
+        elif token.startswith("-"):
+            kind, value = "exclude", token[1:]
+        else:
+            kind, sep, value = token.partition(":")
+            if not sep or kind not in RULE_KINDS:
+                raise ValueError(f"Aturan filter tidak dikenal: '{token}'")
+        if not value:
+            raise ValueError(f"Aturan filter kosong: '{token}'")
+        rules.append((kind, value))
+    return rules
+
+
+class FileFilter:
+    """
+    Filter file hasil kompilasi aturan, dipakai langsung oleh scan_tree
+
+    Semua glob digabung ke satu regex per jenis dan rentang umur diubah
+    ke batas mtime saat kompilasi, jadi pengecekan per file hanya beberapa
+    pemanggilan regex dan perbandingan angka.
+    """
+
+    def __init__(self, rules, now=None):
+        self.rules = rules
+        now_ns = int((now if now is not None else time.time()) * 1_000_000_000)
+
+        by_kind = {kind: [] for kind in RULE_KINDS}
+        for kind, value in rules:
+            by_kind[kind].append(value)
+
+        self.include = compile_patterns(by_kind["include"])
+        self.exclude = compile_patterns(by_kind["exclude"])
+        self.regex = _join_regex(by_kind["regex"])
+        self.not_regex = _join_regex(by_kind["!regex"])
+        self.ext = _join_regex(
+            [re.escape(ext.lower()) + "$" for ext in by_kind["ext"]], re.IGNORECASE
+        )
+
+        self.min_size = self.max_size = None
+        for value in by_kind["size"]:
+            low, high = _parse_range(value, SIZE_UNITS, "size")
+            self.min_size = _tighter(self.min_size, low, max)
+            self.max_size = _tighter(self.max_size, high, min)
+
+        # Umur minimal = mtime maksimal, dan sebaliknya
+        self.min_mtime_ns = self.max_mtime_ns = None
+        for value in by_kind["age"]:
+            low, high = _parse_range(value, AGE_UNITS, "age")
+            if low is not None:
+                self.max_mtime_ns = _tighter(
+                    self.max_mtime_ns, now_ns - low * 1_000_000_000, min
+                )
+            if high is not None:
+                self.min_mtime_ns = _tighter(
+                    self.min_mtime_ns, now_ns - high * 1_000_000_000, max
+                )
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def __str__(self):
+        return " ".join(f"{kind}:{value}" for kind, value in self.rules)
+
+    def allow_dir(self, name, rel_path):
+        """False jika folder harus dilewati beserta seluruh isinya"""
+        if self.exclude and (self.exclude.match(name) or self.exclude.match(rel_path)):
+            return False
+        # Relpath folder diberi '/' di akhir agar regex seperti 'cache/' ikut cocok
+        if self.not_regex and self.not_regex.search(rel_path + "/"):
+            return False
+        return True
+
+    def allow_path(self, name, rel_path):
+        """Cek aturan berbasis nama file (sebelum stat)"""
+        if self.exclude and (self.exclude.match(name) or self.exclude.match(rel_path)):
+            return False
+        if self.not_regex and self.not_regex.search(rel_path):
+            return False
+        if self.include and not (self.include.match(name) or self.include.match(rel_path)):
+            return False
+        if self.regex and not self.regex.search(rel_path):
+            return False
+        if self.ext and not self.ext.search(name):
+            return False
+        return True
+
+    def allow_stat(self, size, mtime_ns):
+        """Cek aturan ukuran & umur (setelah stat)"""
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        if self.min_mtime_ns is not None and mtime_ns < self.min_mtime_ns:
+            return False
+        if self.max_mtime_ns is not None and mtime_ns > self.max_mtime_ns:
+            return False
+        return True
+
+
+def _join_regex(patterns, flags=0):
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
+
+
+def _tighter(current, value, pick):
+    if value is None:
+        return current
+    return value if current is None else pick(current, value)
+
+
+def compile_filter(*specs, now=None):
+    """
+    Kompilasi satu atau beberapa spesifikasi filter menjadi FileFilter
+
+    Args:
+        *specs: String/list aturan (lihat parse_rules) atau FileFilter;
+                None dilewati. Semua aturan digabung (harus lolos semuanya).
+        now: Waktu acuan untuk aturan age (default sekarang)
+
+    Returns:
+        FileFilter, atau None jika tidak ada aturan sama sekali
+
+    Raises:
+        ValueError jika ada aturan yang tidak valid
+    """
+    rules = []
+    for spec in specs:
+        rules.extend(parse_rules(spec))
+    if not rules:
+        return None
+    return FileFilter(rules, now)
@@ -0,0 +1,73 @@
+import os
+import sqlite3
+
+# Semua file internal AutoFile diawali prefix ini dan tidak ikut diproses
+INTERNAL_PREFIX = ".autofile_"
+
+MANIFEST_NAME = ".autofile_manifest.db"
+
+
+def is_internal(name):
+    """Cek apakah nama file adalah file internal AutoFile (manifest, cache, dll)"""
+    return name.startswith(INTERNAL_PREFIX)
+
+
+def load_manifest(folder, name=MANIFEST_NAME):
+    """
+    Membaca manifest dari folder
+
+    Args:
+        folder: Folder tempat manifest disimpan
+        name: Nama file manifest
+
+    Returns:
+        Dictionary {relpath: (size, mtime_ns, inode, digest)} atau None jika
+        manifest belum ada / rusak
+    """
+    path = os.path.join(folder, name)
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute(
+                "SELECT path, size, mtime_ns, inode, digest FROM files"
+            )
+            return {row[0]: row[1:] for row in rows}
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+def save_manifest(folder, entries, name=MANIFEST_NAME):
+    """
+    Menyimpan manifest ke folder (ditulis ke file sementara lalu di-rename)
+
+    Args:
+        folder: Folder tempat manifest disimpan
+        entries: Dictionary {relpath: (size, mtime_ns, inode, digest)}
+        name: Nama file manifest
+    """
+    path = os.path.join(folder, name)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute(
+            "CREATE TABLE files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "inode INTEGER, digest TEXT)"
+        )
+        conn.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+            ((path, *values) for path, values in entries.items()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+from utils.manifest import INTERNAL_PREFIX, load_manifest, save_manifest
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+META_CACHE_NAME = f"{INTERNAL_PREFIX}metadata.db"
+
+# Tag EXIF: pointer ke Exif IFD, DateTimeOriginal, DateTime
+_EXIF_IFD = 0x8769
+_DATETIME_ORIGINAL = 36867
+_DATETIME = 306
+
+
+def exif_date(path):
+    """
+    Tanggal foto dari EXIF (DateTimeOriginal, lalu DateTime)
+
+    Returns:
+        String ISO, atau None jika tidak ada EXIF / Pillow tidak terinstall
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as image:
+            exif = image.getexif()
+            value = exif.get_ifd(_EXIF_IFD).get(_DATETIME_ORIGINAL) or exif.get(
+                _DATETIME
+            )
+        if not value:
+            return None
+        return datetime.strptime(str(value).strip("\x00 "), "%Y:%m:%d %H:%M:%S").isoformat()
+    except Exception:
+        return None
+
+
+def sha1_digest(path, chunk_size=1024 * 1024):
+    """Hash SHA-1 isi file (hex)"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Field yang mahal dihitung (baca isi file), disimpan di cache
+EXTRACTORS = {
+    "exif_date": exif_date,
+    "sha1": sha1_digest,
+}
+
+
+class MetadataCache:
+    """
+    Cache metadata file per folder: inode -> (size, mtime_ns, inode, field JSON)
+
+    Kunci cache adalah inode, jadi cache tetap berlaku setelah file di-rename.
+    Field hanya dihitung saat diminta dan dihitung ulang jika ukuran, mtime
+    atau inode berubah. Entry yang tidak disentuh selama run dibuang saat save.
+    """
+
+    def __init__(self, folder, name=META_CACHE_NAME):
+        self.folder = folder
+        self.name = name
+        self.old = load_manifest(folder, name) or {}
+        self.new = {}
+        self.computed = 0
+
+    def get(self, filename, st, field):
+        """Ambil field (lihat EXTRACTORS) untuk file dari cache atau hitung"""
+        key = str(st.st_ino)
+        state = (st.st_size, st.st_mtime_ns, st.st_ino)
+
+        fields = self.new.get(key)
+        if fields is None or fields[0] != state:
+            cached = self.old.get(key)
+            if cached and cached[:3] == state:
+                fields = (state, json.loads(cached[3]))
+            else:
+                fields = (state, {})
+            self.new[key] = fields
+
+        values = fields[1]
+        if field not in values:
+            values[field] = EXTRACTORS[field](os.path.join(self.folder, filename))
+            self.computed += 1
+        return values[field]
+
+    def save(self):
+        """Simpan cache ke folder"""
+        save_manifest(
+            self.folder,
+            {
+                key: (*state, json.dumps(values, separators=(",", ":")))
+                for key, (state, values) in self.new.items()
+            },
+            self.name,
+        )
@@ -0,0 +1,234 @@
+import os
+import time
+import bisect
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.events import (
+    FILE_COPIED,
+    FILE_UPDATED,
+    FILE_LINKED,
+    FILE_MOVED,
+    FILE_DELETED,
+    FILE_RENAMED,
+    FILE_EVENTS,
+    ERROR,
+    PHASE,
+    PHASE_COPY,
+    PHASE_DELETE,
+)
+
+# Batas bucket histogram latency per file (detik)
+LATENCY_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    30.0,
+    120.0,
+)
+
+# Fase dari event file yang membawa `seconds` (lama operasinya)
+_EVENT_PHASES = {
+    FILE_COPIED: PHASE_COPY,
+    FILE_UPDATED: PHASE_COPY,
+    FILE_LINKED: PHASE_COPY,
+    FILE_MOVED: PHASE_COPY,
+    FILE_DELETED: PHASE_DELETE,
+    FILE_RENAMED: "rename",
+}
+
+# Event yang dihitung untuk bytes/s (data yang benar-benar dicopy/dihapus)
+_THROUGHPUT_EVENTS = {FILE_COPIED, FILE_UPDATED, FILE_DELETED}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Histogram kumulatif seperti histogram Prometheus"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """List (batas, jumlah observasi <= batas), termasuk '+Inf'"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((_number(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class MetricsSink:
+    """
+    Kumpulkan throughput dan latency dari event stream
+
+    Per tipe event: jumlah file dan byte. Per fase (scan, compare, copy,
+    delete, rename): histogram lama per file dan total waktunya, jadi run
+    yang lambat bisa dilihat macet di tahap mana. Ditambah files/s dan
+    bytes/s sejak sink dibuat.
+
+    Hasil dalam format teks Prometheus: ditulis ke file saat close (untuk
+    textfile collector node_exporter) dan/atau disajikan lewat serve_metrics.
+
+    Args:
+        path: File tujuan metrik (opsional), ditulis atomik saat close
+        labels: Dict label tambahan untuk semua metrik, misal {"command": "backup"}
+    """
+
+    timing = True
+
+    def __init__(self, path=None, labels=None):
+        self.path = path
+        self.labels = dict(labels or {})
+        self.start = time.time()
+        self.started = time.monotonic()
+        self.finished = None
+        self.files = Counter()
+        self.bytes = Counter()
+        self.errors = 0
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def handle(self, event):
+        with self._lock:
+            if event.type == ERROR:
+                self.errors += 1
+                return
+            if event.type == PHASE:
+                phase = event.phase
+            else:
+                if event.type in FILE_EVENTS:
+                    self.files[event.type] += 1
+                    self.bytes[event.type] += event.size or 0
+                phase = _EVENT_PHASES.get(event.type)
+            if phase and event.seconds is not None:
+                histogram = self.phases.get(phase)
+                if histogram is None:
+                    histogram = self.phases[phase] = Histogram()
+                histogram.observe(event.seconds)
+
+    def render(self):
+        """Semua metrik dalam format teks Prometheus"""
+        with self._lock:
+            end = self.finished or time.monotonic()
+            elapsed = max(end - self.started, 1e-9)
+            processed = sum(self.files.values())
+            moved_bytes = sum(
+                size for kind, size in self.bytes.items() if kind in _THROUGHPUT_EVENTS
+            )
+
+            lines = []
+
+            def metric(name, kind, text):
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            metric("autofile_files_total", "counter", "File yang diproses per tipe event")
+            for kind, count in sorted(self.files.items()):
+                lines.append(f"autofile_files_total{self._labels(event=kind)} {count}")
+
+            metric("autofile_bytes_total", "counter", "Byte yang diproses per tipe event")
+            for kind, size in sorted(self.bytes.items()):
+                lines.append(f"autofile_bytes_total{self._labels(event=kind)} {size}")
+
+            metric("autofile_errors_total", "counter", "File yang gagal diproses")
+            lines.append(f"autofile_errors_total{self._labels()} {self.errors}")
+
+            metric("autofile_phase_seconds", "histogram", "Lama per file di setiap fase")
+            for phase, histogram in sorted(self.phases.items()):
+                for bound, count in histogram.cumulative():
+                    labels = self._labels(phase=phase, le=bound)
+                    lines.append(f"autofile_phase_seconds_bucket{labels} {count}")
+                labels = self._labels(phase=phase)
+                lines.append(f"autofile_phase_seconds_sum{labels} {histogram.sum:.6f}")
+                lines.append(f"autofile_phase_seconds_count{labels} {histogram.count}")
+
+            metric("autofile_files_per_second", "gauge", "Rata-rata file per detik")
+            lines.append(f"autofile_files_per_second{self._labels()} {processed / elapsed:.3f}")
+
+            metric("autofile_bytes_per_second", "gauge", "Rata-rata byte dicopy/dihapus per detik")
+            lines.append(f"autofile_bytes_per_second{self._labels()} {moved_bytes / elapsed:.1f}")
+
+            metric("autofile_duration_seconds", "gauge", "Lama run sejauh ini")
+            lines.append(f"autofile_duration_seconds{self._labels()} {elapsed:.3f}")
+
+            metric("autofile_start_time_seconds", "gauge", "Waktu mulai run (unix time)")
+            lines.append(f"autofile_start_time_seconds{self._labels()} {self.start:.3f}")
+
+            return "\n".join(lines) + "\n"
+
+    def _labels(self, **extra):
+        labels = {**self.labels, **extra}
+        if not labels:
+            return ""
+        text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        return "{" + text + "}"
+
+    def write(self, path):
+        """Tulis metrik ke file secara atomik (tmp lalu rename)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def close(self):
+        with self._lock:
+            self.finished = time.monotonic()
+        if self.path:
+            self.write(self.path)
+
+
+def serve_metrics(sink, port, host="127.0.0.1"):
+    """
+    Sajikan metrik sink di http://host:port/metrics (thread background)
+
+    Returns:
+        HTTP server; panggil shutdown() untuk berhenti
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = sink.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _number(value):
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,284 @@
+import os
+import json
+import time
+from utils.manifest import INTERNAL_PREFIX
+
+JOURNAL_NAME = f"{INTERNAL_PREFIX}rename_journal.json"
+HISTORY_NAME = f"{INTERNAL_PREFIX}rename_history.jsonl"
+TEMP_PREFIX = f"{INTERNAL_PREFIX}rn_"
+
+# Fase journal: direct = langsung lama -> baru, temp/final = dua fase lewat nama sementara
+PHASE_DIRECT = "direct"
+PHASE_TEMP = "temp"
+PHASE_FINAL = "final"
+
+
+class RenamePlan:
+    """
+    Rencana rename satu folder: daftar (lama, baru) yang sudah divalidasi
+
+    Attributes:
+        renames: List (nama lama, nama baru) yang benar-benar berubah
+        conflicts: List (nama lama, nama baru, alasan) yang membatalkan rencana
+        two_phase: True jika ada nama baru yang juga nama lama file lain
+                   (rantai/siklus), jadi harus lewat nama sementara
+    """
+
+    def __init__(self, renames, conflicts, two_phase):
+        self.renames = renames
+        self.conflicts = conflicts
+        self.two_phase = two_phase
+
+    def __len__(self):
+        return len(self.renames)
+
+
+def plan_renames(folder, mapping, existing=None):
+    """
+    Validasi pemetaan nama lama -> baru dalam satu folder (O(n), pakai dict/set)
+
+    Args:
+        folder: Folder berisi file
+        mapping: Iterable (nama lama, nama baru)
+        existing: Set nama yang ada di folder (opsional, default os.listdir)
+
+    Returns:
+        RenamePlan. Konflik: nama tujuan dipakai lebih dari satu file, nama
+        tujuan sudah ada dan tidak ikut di-rename, atau nama tidak valid.
+    """
+    if existing is None:
+        existing = os.listdir(folder)
+    key = os.path.normcase
+    existing_keys = {key(name) for name in existing}
+
+    renames = [(old, new) for old, new in mapping if old != new]
+    sources = {key(old) for old, _ in renames}
+
+    conflicts = []
+    targets = {}
+    two_phase = False
+    for old, new in renames:
+        new_key = key(new)
+        if not new or os.sep in new or (os.altsep and os.altsep in new):
+            conflicts.append((old, new, "nama tidak valid"))
+        elif new.startswith(INTERNAL_PREFIX):
+            conflicts.append((old, new, "nama dipakai file internal"))
+        elif new_key in targets:
+            conflicts.append((old, new, f"nama sama dengan hasil '{targets[new_key]}'"))
+        elif new_key in sources:
+            # Rantai/siklus (a->b, b->a): aman, asal lewat nama sementara
+            two_phase = True
+        elif new_key in existing_keys:
+            conflicts.append((old, new, "file dengan nama ini sudah ada"))
+        targets.setdefault(new_key, old)
+
+    return RenamePlan(renames, conflicts, two_phase)
+
+
+def _write_journal(folder, journal):
+    """Tulis journal secara atomik (file sementara + fsync + replace)"""
+    path = os.path.join(folder, JOURNAL_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(journal, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _remove_journal(folder):
+    try:
+        os.remove(os.path.join(folder, JOURNAL_NAME))
+    except FileNotFoundError:
+        pass
+
+
+def execute_plan(folder, plan, history=True):
+    """
+    Jalankan RenamePlan secara transaksional
+
+    Rencana disimpan dulu di journal. Tanpa rantai nama, file langsung
+    di-rename; jika ada rantai/siklus, semua file dipindah ke nama sementara
+    (fase 1) lalu ke nama akhir (fase 2). Jika satu rename gagal, semua
+    rename yang sudah terjadi dikembalikan.
+
+    Args:
+        folder: Folder berisi file
+        plan: RenamePlan dari plan_renames
+        history: Jika True, hasil rename dicatat di riwayat untuk undo
+
+    Returns:
+        True jika semua berhasil
+
+    Raises:
+        ValueError jika plan masih punya konflik
+        OSError asli dari rename yang gagal (setelah rollback)
+    """
+    if plan.conflicts:
+        raise ValueError(f"{len(plan.conflicts)} konflik nama, rename dibatalkan")
+    if not plan.renames:
+        return True
+
+    token = os.urandom(4).hex()
+    entries = [
+        [old, f"{TEMP_PREFIX}{token}_{i}" if plan.two_phase else None, new]
+        for i, (old, new) in enumerate(plan.renames)
+    ]
+    journal = {
+        "phase": PHASE_TEMP if plan.two_phase else PHASE_DIRECT,
+        "renames": entries,
+    }
+    _write_journal(folder, journal)
+
+    join = os.path.join
+    try:
+        if plan.two_phase:
+            for old, tmp, _ in entries:
+                os.rename(join(folder, old), join(folder, tmp))
+
+            journal["phase"] = PHASE_FINAL
+            _write_journal(folder, journal)
+
+            for _, tmp, new in entries:
+                os.rename(join(folder, tmp), join(folder, new))
+        else:
+            for old, _, new in entries:
+                os.rename(join(folder, old), join(folder, new))
+
+        # Riwayat ikut transaksi: jika gagal dicatat, rename juga dibatalkan
+        if history:
+            _append_history(
+                folder,
+                {
+                    "id": f"{time.strftime('%Y%m%d_%H%M%S')}_{token}",
+                    "renames": [
+                        [old, new, os.lstat(join(folder, new)).st_ino]
+                        for old, _, new in entries
+                    ],
+                },
+            )
+    except BaseException:
+        _rollback(folder, journal)
+        raise
+
+    _remove_journal(folder)
+    return True
+
+
+def _rollback(folder, journal):
+    """Kembalikan semua rename dari journal ke nama lama"""
+    join = os.path.join
+    exists = os.path.lexists
+    phase = journal["phase"]
+    entries = journal["renames"]
+
+    if phase == PHASE_DIRECT:
+        # Nama baru tidak pernah bentrok dengan nama lama, jadi bisa langsung
+        for old, _, new in entries:
+            if not exists(join(folder, old)) and exists(join(folder, new)):
+                os.rename(join(folder, new), join(folder, old))
+    else:
+        # Fase 2 dibalik lewat nama sementara agar rantai a->b->c tidak saling timpa
+        if phase == PHASE_FINAL:
+            for _, tmp, new in entries:
+                if not exists(join(folder, tmp)) and exists(join(folder, new)):
+                    os.rename(join(folder, new), join(folder, tmp))
+        for old, tmp, _ in entries:
+            if exists(join(folder, tmp)):
+                os.rename(join(folder, tmp), join(folder, old))
+
+    _remove_journal(folder)
+
+
+def recover(folder):
+    """
+    Rollback rename yang terputus (misal proses mati di tengah jalan)
+
+    Returns:
+        Jumlah entry di journal yang dipulihkan, 0 jika tidak ada journal
+    """
+    try:
+        with open(os.path.join(folder, JOURNAL_NAME), encoding="utf-8") as f:
+            journal = json.load(f)
+    except FileNotFoundError:
+        return 0
+
+    _rollback(folder, journal)
+    return len(journal["renames"])
+
+
+def _append_history(folder, record):
+    """Tambahkan satu baris ke riwayat rename (append-only, satu baris per run)"""
+    with open(os.path.join(folder, HISTORY_NAME), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_history(folder):
+    """
+    Baca riwayat rename folder
+
+    Returns:
+        List run {id, renames: [[lama, baru, inode], ...]} yang belum di-undo,
+        urut dari yang terlama
+    """
+    runs = []
+    undone = set()
+    try:
+        with open(os.path.join(folder, HISTORY_NAME), encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Baris terakhir bisa terpotong jika proses mati saat menulis
+                    continue
+                if "undo" in record:
+                    undone.add(record["undo"])
+                else:
+                    runs.append(record)
+    except FileNotFoundError:
+        return []
+    return [run for run in runs if run["id"] not in undone]
+
+
+def plan_undo(folder):
+    """
+    Susun rencana undo untuk run rename terakhir yang belum di-undo
+
+    Setiap file dicek dengan satu scandir: nama baru harus masih ada dengan
+    inode yang sama, jika tidak file itu dilewati (sudah diubah/diganti).
+
+    Returns:
+        (id run, RenamePlan, list (nama baru, nama lama, alasan) yang dilewati),
+        atau (None, None, []) jika tidak ada riwayat
+    """
+    runs = load_history(folder)
+    if not runs:
+        return None, None, []
+    run = runs[-1]
+
+    inodes = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            inodes[entry.name] = entry.inode()
+
+    mapping = []
+    skipped = []
+    for old, new, inode in run["renames"]:
+        current = inodes.get(new)
+        if current is None:
+            skipped.append((new, old, "file tidak ditemukan"))
+        elif current != inode:
+            skipped.append((new, old, "file sudah diganti (inode berbeda)"))
+        else:
+            mapping.append((new, old))
+
+    return run["id"], plan_renames(folder, mapping, inodes), skipped
+
+
+def mark_undone(folder, run_id):
+    """Catat di riwayat bahwa run sudah di-undo"""
+    _append_history(folder, {"undo": run_id})
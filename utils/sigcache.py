@@ -0,0 +1,79 @@
+import os
+import hashlib
+from utils.manifest import load_manifest, save_manifest
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+SIGCACHE_NAME = ".autofile_sigcache.db"
+
+
+def fast_digest(path, chunk_size=1024 * 1024):
+    """
+    Hitung hash cepat dari isi file
+
+    Memakai xxhash (xxh3_128) jika terinstall, jika tidak BLAKE2b.
+    Nama algoritma disertakan di depan hasil agar cache dari algoritma
+    lain tidak tertukar.
+    """
+    if xxhash is not None:
+        digest, algo = xxhash.xxh3_128(), "xxh3"
+    else:
+        digest, algo = hashlib.blake2b(digest_size=16), "b2"
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return f"{algo}:{digest.hexdigest()}"
+
+
+class SignatureCache:
+    """
+    Cache signature file per folder: relpath -> (size, mtime_ns, inode, digest)
+
+    File hanya di-hash ulang jika ukuran, mtime atau inode-nya berubah sejak
+    cache terakhir disimpan. Entry yang tidak disentuh selama run dibuang saat save.
+
+    Args:
+        folder: Folder yang file-nya di-hash
+        name: Nama file cache
+        store: Folder tempat file cache disimpan (default: folder itu sendiri),
+               misal folder tujuan agar folder sumber tidak ditulisi
+    """
+
+    def __init__(self, folder, name=SIGCACHE_NAME, store=None):
+        self.folder = folder
+        self.name = name
+        self.store = store or folder
+        self.old = load_manifest(self.store, name) or {}
+        self.new = {}
+        self.hashed = 0
+        self.prefix = "xxh3:" if xxhash is not None else "b2:"
+
+    def digest(self, relpath, size, mtime_ns, inode):
+        """Ambil digest file dari cache atau hitung jika metadata berubah"""
+        state = (size, mtime_ns, inode)
+        cached = self.new.get(relpath) or self.old.get(relpath)
+        if cached and cached[:3] == state and cached[3].startswith(self.prefix):
+            self.new[relpath] = cached
+            return cached[3]
+
+        digest = fast_digest(os.path.join(self.folder, relpath))
+        self.hashed += 1
+        self.new[relpath] = (*state, digest)
+        return digest
+
+    def update(self, relpath, size, mtime_ns, inode, digest):
+        """Catat digest yang sudah diketahui (misal setelah file dicopy)"""
+        self.new[relpath] = (size, mtime_ns, inode, digest)
+
+    def forget(self, relpath):
+        """Hapus entry dari cache (misal file dihapus/dipindah)"""
+        self.new.pop(relpath, None)
+        self.old.pop(relpath, None)
+
+    def save(self):
+        """Simpan cache ke folder store"""
+        save_manifest(self.store, self.new, self.name)
@@ -0,0 +1,116 @@
+import os
+from string import Formatter
+from datetime import datetime
+from utils.metadata import EXTRACTORS
+
+# Format default untuk field tanggal
+DATE_FORMAT = "%Y%m%d_%H%M%S"
+
+# Field yang dikenali di template rename
+TEMPLATE_FIELDS = {
+    "name": "nama file tanpa ekstensi",
+    "ext": "ekstensi termasuk titik, misal .jpg",
+    "parent": "nama folder tempat file",
+    "counter": "nomor urut, misal {counter:04}",
+    "size": "ukuran file dalam byte",
+    "mtime": "waktu modifikasi, misal {mtime:%Y-%m-%d}",
+    "exif_date": "tanggal EXIF foto (fallback ke mtime), misal {exif_date:%Y%m%d}",
+    "sha1": "hash SHA-1 isi file, misal {sha1:8} untuk 8 karakter pertama",
+}
+
+# Field yang butuh stat file
+_STAT_FIELDS = {"size", "mtime", "exif_date", "sha1"}
+
+
+class RenameTemplate:
+    """
+    Template nama file hasil kompilasi, misal '{exif_date:%Y%m%d}_{counter:04}{ext}'
+
+    Template di-parse sekali. Saat render, stat dan field mahal (EXIF, hash)
+    hanya dihitung jika dipakai template; field mahal diambil lewat
+    MetadataCache. Jika template tidak memakai {ext}, ekstensi asli
+    ditambahkan di akhir.
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.parts = []
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if field is not None:
+                if field not in TEMPLATE_FIELDS:
+                    raise ValueError(f"Field template tidak dikenal: '{{{field}}}'")
+                if conversion:
+                    raise ValueError(f"Konversi !{conversion} tidak didukung: '{{{field}}}'")
+            self.parts.append((literal, field, spec or ""))
+
+        self.fields = {field for _, field, _ in self.parts if field}
+        self.needs_stat = bool(self.fields & _STAT_FIELDS)
+        self.add_ext = "ext" not in self.fields
+        self.uses_cache = bool(self.fields & set(EXTRACTORS))
+
+        # Validasi format angka sekali di depan, bukan per file
+        for _, field, spec in self.parts:
+            if field in ("counter", "size") and spec:
+                format(1, spec)
+            elif field == "sha1" and spec and not spec.isdigit():
+                raise ValueError(f"Panjang sha1 harus angka: '{{sha1:{spec}}}'")
+
+    def render(self, folder, filename, counter, cache=None):
+        """
+        Hasilkan nama baru satu file
+
+        Args:
+            folder: Folder tempat file
+            filename: Nama file lama
+            counter: Nomor urut file
+            cache: MetadataCache folder (wajib jika template memakai exif_date/sha1)
+        """
+        name, ext = os.path.splitext(filename)
+        st = os.stat(os.path.join(folder, filename)) if self.needs_stat else None
+
+        out = []
+        for literal, field, spec in self.parts:
+            out.append(literal)
+            if field is None:
+                continue
+            if field == "name":
+                out.append(format(name, spec))
+            elif field == "ext":
+                out.append(format(ext, spec))
+            elif field == "parent":
+                out.append(format(os.path.basename(os.path.abspath(folder)), spec))
+            elif field == "counter":
+                out.append(format(counter, spec))
+            elif field == "size":
+                out.append(format(st.st_size, spec))
+            elif field == "mtime":
+                out.append(_format_date(datetime.fromtimestamp(st.st_mtime), spec))
+            elif field == "exif_date":
+                value = cache.get(filename, st, field)
+                date = (
+                    datetime.fromisoformat(value)
+                    if value
+                    else datetime.fromtimestamp(st.st_mtime)
+                )
+                out.append(_format_date(date, spec))
+            elif field == "sha1":
+                digest = cache.get(filename, st, field)
+                out.append(digest[: int(spec)] if spec else digest)
+
+        if self.add_ext:
+            out.append(ext)
+        return "".join(out)
+
+
+def _format_date(date, spec):
+    return date.strftime(spec or DATE_FORMAT)
+
+
+def compile_template(template):
+    """
+    Kompilasi template rename
+
+    Raises:
+        ValueError jika template memakai field/format yang tidak dikenal
+    """
+    return RenameTemplate(template)
@@ -1,4 +1,5 @@
 import os
+import hashlib
 from datetime import datetime
 from colors import Colors
 
@@ -6,6 +7,14 @@ def ensure_folder(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
+def file_digest(path, chunk_size=1024 * 1024):
+    """Hitung hash BLAKE2b dari isi file (hex string)"""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def log(msg):
     timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
     print(timestamp, msg)
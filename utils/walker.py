@@ -0,0 +1,160 @@
+import os
+import re
+import stat
+import fnmatch
+from collections import namedtuple
+from utils.manifest import is_internal
+
+# Record ringkas hasil scan, relpath relatif terhadap root yang di-scan
+FileEntry = namedtuple(
+    "FileEntry", ["relpath", "size", "mtime_ns", "mode", "inode", "atime_ns"], defaults=[0]
+)
+
+
+def is_dir_entry(entry):
+    """Cek apakah FileEntry adalah folder"""
+    return stat.S_ISDIR(entry.mode)
+
+
+def compile_patterns(patterns):
+    """
+    Gabungkan beberapa pola glob menjadi satu regex (dikompilasi sekali)
+
+    Args:
+        patterns: List pola glob, misal ['*.tmp', 'node_modules']
+
+    Returns:
+        Compiled regex atau None jika tidak ada pola
+    """
+    if not patterns:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+def _matches(regex, name, relpath):
+    return bool(regex.match(name) or regex.match(relpath))
+
+
+def scan_tree(
+    root,
+    include=None,
+    exclude=None,
+    follow_symlinks=False,
+    skip_symlinks=False,
+    dirs=False,
+    topdown=True,
+    onerror=None,
+    filters=None,
+):
+    """
+    Scan folder secara rekursif memakai os.scandir dengan satu stat per entry
+
+    Args:
+        root: Folder yang akan di-scan
+        include: Pola glob file yang diambil (opsional, default semua file)
+        exclude: Pola glob file/folder yang dilewati; folder yang cocok
+                 tidak dimasuki sama sekali
+        follow_symlinks: Jika True, masuk ke dalam symlink folder
+        skip_symlinks: Jika True, symlink (file maupun folder) dilewati
+        dirs: Jika True, folder juga ikut di-yield
+        topdown: Jika False, folder di-yield setelah isinya (bottom-up)
+        onerror: Callback onerror(path, exception) saat entry gagal dibaca
+        filters: FileFilter dari utils.filters.compile_filter (opsional);
+                 folder yang ditolak tidak dimasuki, aturan ukuran/umur
+                 dicek dari hasil stat yang sama
+
+    Yields:
+        FileEntry(relpath, size, mtime_ns, mode, inode, atime_ns). Pola glob dicocokkan
+        ke nama file maupun relpath (pemisah '/').
+    """
+    include_re = compile_patterns(include)
+    exclude_re = compile_patterns(exclude)
+
+    def scan(path, rel):
+        try:
+            iterator = os.scandir(path)
+        except OSError as e:
+            if onerror:
+                onerror(path, e)
+            return
+
+        subdirs = []
+        with iterator:
+            for entry in iterator:
+                name = entry.name
+                if is_internal(name):
+                    continue
+
+                rel_path = f"{rel}/{name}" if rel else name
+
+                try:
+                    is_link = entry.is_symlink()
+                    if is_link and skip_symlinks:
+                        continue
+
+                    if entry.is_dir():
+                        # Symlink folder hanya dimasuki jika follow_symlinks
+                        if is_link and not follow_symlinks:
+                            continue
+                        if exclude_re and _matches(exclude_re, name, rel_path):
+                            continue
+                        if filters and not filters.allow_dir(name, rel_path):
+                            continue
+                        subdirs.append((entry, rel_path))
+                        continue
+
+                    if exclude_re and _matches(exclude_re, name, rel_path):
+                        continue
+                    if include_re and not _matches(include_re, name, rel_path):
+                        continue
+                    if filters and not filters.allow_path(name, rel_path):
+                        continue
+
+                    # Satu stat per file (mengikuti symlink file seperti os.walk + getsize)
+                    st = entry.stat()
+                except OSError as e:
+                    if onerror:
+                        onerror(entry.path, e)
+                    continue
+
+                if filters and not filters.allow_stat(st.st_size, st.st_mtime_ns):
+                    continue
+
+                yield FileEntry(
+                    rel_path.replace("/", os.sep),
+                    st.st_size,
+                    st.st_mtime_ns,
+                    st.st_mode,
+                    st.st_ino,
+                    st.st_atime_ns,
+                )
+
+        for entry, rel_path in subdirs:
+            dir_entry = None
+            if dirs:
+                try:
+                    st = entry.stat(follow_symlinks=follow_symlinks)
+                except OSError as e:
+                    if onerror:
+                        onerror(entry.path, e)
+                    continue
+                dir_entry = FileEntry(
+                    rel_path.replace("/", os.sep),
+                    st.st_size,
+                    st.st_mtime_ns,
+                    st.st_mode,
+                    st.st_ino,
+                    st.st_atime_ns,
+                )
+
+            if dir_entry and topdown:
+                yield dir_entry
+
+            yield from scan(entry.path, rel_path)
+
+            if dir_entry and not topdown:
+                yield dir_entry
+
+    yield from scan(root, "")
@@ -0,0 +1,77 @@
+import queue
+import threading
+
+# Jumlah slot queue per worker. Cukup untuk menjaga worker tetap sibuk
+# tanpa membuat producer (scan folder) berlari jauh di depan.
+QUEUE_PER_WORKER = 4
+
+_STOP = object()
+
+
+def run_workers(jobs, handler, workers=1, queue_size=None):
+    """
+    Menjalankan handler(job) untuk setiap job memakai thread pool ukuran tetap
+
+    Job dialirkan lewat queue terbatas, jadi producer (misal scan folder)
+    akan tertahan otomatis saat semua worker masih sibuk.
+
+    Args:
+        jobs: Iterable job (boleh generator)
+        handler: Fungsi yang dipanggil untuk setiap job
+        workers: Jumlah thread worker (<= 1 berarti jalan serial)
+        queue_size: Kapasitas queue (default: workers * QUEUE_PER_WORKER)
+    """
+    if workers <= 1:
+        for job in jobs:
+            handler(job)
+        return
+
+    job_queue = queue.Queue(maxsize=queue_size or workers * QUEUE_PER_WORKER)
+    errors = []
+
+    def worker():
+        while True:
+            job = job_queue.get()
+            if job is _STOP:
+                break
+            try:
+                handler(job)
+            except Exception as e:
+                # Worker tetap hidup supaya queue tidak macet, error dilempar ulang di akhir
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for job in jobs:
+            job_queue.put(job)
+    finally:
+        # Kirim sinyal berhenti ke setiap worker lalu tunggu semuanya selesai
+        for _ in threads:
+            job_queue.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+
+
+def make_counter(stats):
+    """
+    Membuat fungsi penambah statistik yang aman dipakai banyak thread
+
+    Args:
+        stats: Dictionary statistik yang akan diupdate
+
+    Returns:
+        Fungsi add(key, amount=1)
+    """
+    lock = threading.Lock()
+
+    def add(key, amount=1):
+        with lock:
+            stats[key] += amount
+
+    return add